@@ -0,0 +1,322 @@
+"""Columnar snapshot of the calendar data for statistics and analysis.
+
+snapshot() writes reminders, moods, mood notes and birthdays to Parquet
+files in SNAPSHOT_DIR, one typed Arrow table each (dates as date32, times
+as time32, priority, kind and repeat dictionary-encoded). Reminders are
+streamed from storage in batches of BATCH_ROWS, one row group each. Every
+file records the storage.data_signature() of its topic it was built from,
+so load() can tell a stale table from a current one and rebuild only the
+tables whose data changed (saving a mood doesn't rewrite the reminders).
+
+load() memory-maps the files and returns pyarrow Tables; the helpers
+below compute the Stats page figures with pyarrow.compute instead of
+Python loops. For ad-hoc analysis:
+
+    import analytics
+    df = analytics.load()["reminders"].to_pandas()
+
+pyarrow, numpy (and pandas, for per_month) come with Streamlit; the
+desktop app never imports this module.
+"""
+
+import os
+from datetime import date
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import storage
+from atomic_writer import atomic_file
+from models import KIND_JOURNAL, KIND_REGULAR, Priority, Reminder, parse_time
+from recurrence import FREQUENCIES
+from rollups import FIELDS
+
+SNAPSHOT_DIR = "snapshot"
+
+# Reminders per record batch (and Parquet row group) while writing.
+BATCH_ROWS = 64 * 1024
+
+SIGNATURE_KEY = b"calendar.signature"
+
+# The storage topic each table is built from.
+TOPICS = {
+    "reminders": storage.REMINDERS,
+    "moods": storage.MOODS,
+    "mood_notes": storage.NOTES,
+    "birthdays": storage.BIRTHDAYS,
+}
+
+PRIORITIES = tuple(p.value for p in Priority)
+KINDS = (KIND_REGULAR, KIND_JOURNAL)
+
+# Small sets of strings are stored as int8 codes into a dictionary.
+_CATEGORY = pa.dictionary(pa.int8(), pa.string())
+
+SCHEMAS = {
+    "reminders": pa.schema([
+        ("id", pa.string()),
+        ("date", pa.date32()),
+        ("time", pa.time32("ms")),
+        ("priority", _CATEGORY),
+        ("kind", _CATEGORY),
+        ("text", pa.string()),
+        ("repeat", _CATEGORY),
+    ]),
+    "moods": pa.schema([
+        ("date", pa.date32()),
+        ("emoji", pa.string()),
+        ("label", _CATEGORY),
+    ]),
+    "mood_notes": pa.schema([
+        ("date", pa.date32()),
+        ("note", pa.string()),
+    ]),
+    "birthdays": pa.schema([
+        ("name", pa.string()),
+        ("date", pa.date32()),
+    ]),
+}
+
+def path(name):
+    return os.path.join(SNAPSHOT_DIR, name + ".parquet")
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+def _encode(values, categories):
+    """A dictionary array over the fixed categories (None stays null), so
+    every batch shares one dictionary."""
+    index = {c: i for i, c in enumerate(categories)}
+    return pa.DictionaryArray.from_arrays(
+        pa.array([index.get(v) for v in values], pa.int8()),
+        pa.array(categories, pa.string()),
+    )
+
+# ── Writing ─────────────────────────────────────────────
+
+def _reminder_batch(rows):
+    ids, days, times, priorities, kinds, texts, repeats = zip(*rows)
+    return pa.RecordBatch.from_arrays([
+        pa.array(ids, pa.string()),
+        pa.array(days, pa.date32()),
+        pa.array(times, pa.time32("ms")),
+        _encode(priorities, PRIORITIES),
+        _encode(kinds, KINDS),
+        pa.array(texts, pa.string()),
+        _encode(repeats, FREQUENCIES),
+    ], schema=SCHEMAS["reminders"])
+
+def _reminder_batches():
+    rows = []
+    for date_str, items in storage.iter_reminders():
+        day = _parse_date(date_str)
+        for r in items:
+            rows.append((
+                r.id, day,
+                (r.time.hour * 60 + r.time.minute) * 60000 if r.time else None,
+                r.priority.value if r.priority else None,
+                r.kind, r.text,
+                r.rule.freq if r.rule else None,
+            ))
+        if len(rows) >= BATCH_ROWS:
+            yield _reminder_batch(rows)
+            rows = []
+    if rows:
+        yield _reminder_batch(rows)
+
+def _mood_batches():
+    moods = sorted(storage.load_moods().items())
+    labels = sorted({m["label"] for _, m in moods})
+    yield pa.RecordBatch.from_arrays([
+        pa.array([_parse_date(d) for d, _ in moods], pa.date32()),
+        pa.array([m["emoji"] for _, m in moods], pa.string()),
+        _encode([m["label"] for _, m in moods], labels),
+    ], schema=SCHEMAS["moods"])
+
+def _note_batches():
+    notes = sorted(storage.load_mood_notes().items())
+    yield pa.RecordBatch.from_arrays([
+        pa.array([_parse_date(d) for d, _ in notes], pa.date32()),
+        pa.array([n for _, n in notes], pa.string()),
+    ], schema=SCHEMAS["mood_notes"])
+
+def _birthday_batches():
+    birthdays = sorted(storage.load_birthdays().items())
+    yield pa.RecordBatch.from_arrays([
+        pa.array([n for n, _ in birthdays], pa.string()),
+        pa.array([_parse_date(d) for _, d in birthdays], pa.date32()),
+    ], schema=SCHEMAS["birthdays"])
+
+_BATCHES = {
+    "reminders": _reminder_batches,
+    "moods": _mood_batches,
+    "mood_notes": _note_batches,
+    "birthdays": _birthday_batches,
+}
+
+def snapshot(names=None):
+    """Write the named tables (default: all) to SNAPSHOT_DIR; returns
+    {name: rows written}.
+
+    Each file is written to a uniquely named temp file and renamed into
+    place, so readers (and other writers) never see half a file.
+    """
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    rows = {}
+    for name in names or SCHEMAS:
+        signature = storage.data_signature(TOPICS[name])
+        schema = SCHEMAS[name].with_metadata({SIGNATURE_KEY: signature.encode()})
+        rows[name] = 0
+        with atomic_file(path(name)) as f, pq.ParquetWriter(f, schema) as writer:
+            for batch in _BATCHES[name]():
+                writer.write_batch(batch)
+                rows[name] += batch.num_rows
+    return rows
+
+# ── Reading ─────────────────────────────────────────────
+
+def stale():
+    """Names of the tables whose file is missing or was built from data
+    that has changed since."""
+    names = []
+    for name in SCHEMAS:
+        signature = storage.data_signature(TOPICS[name]).encode()
+        try:
+            metadata = pq.read_schema(path(name)).metadata or {}
+        except (FileNotFoundError, pa.ArrowInvalid):
+            metadata = {}
+        if metadata.get(SIGNATURE_KEY) != signature:
+            names.append(name)
+    return names
+
+def is_current():
+    """True if every snapshot file was built from the data as it is now."""
+    return not stale()
+
+def load(rebuild=True):
+    """{name: pyarrow.Table} for every table, memory-mapped from the
+    snapshot files. With rebuild, missing or stale tables are rebuilt
+    first."""
+    if rebuild:
+        names = stale()
+        if names:
+            snapshot(names)
+    return {name: pq.read_table(path(name), memory_map=True) for name in SCHEMAS}
+
+# ── Figures ─────────────────────────────────────────────
+
+def month_mask(table, month):
+    """Boolean mask of the rows whose date is in month ("YYYY-MM")."""
+    year, m = int(month[:4]), int(month[5:7])
+    start = pa.scalar(date(year, m, 1), pa.date32())
+    end = pa.scalar(date(year + m // 12, m % 12 + 1, 1), pa.date32())
+    return pc.and_(pc.greater_equal(table["date"], start), pc.less(table["date"], end))
+
+def counts(reminders, month=None):
+    """Reminder counts keyed like rollups.FIELDS, for one month or all."""
+    if month is not None:
+        reminders = reminders.filter(month_mask(reminders, month))
+    result = dict.fromkeys(FIELDS, 0)
+    result["total"] = reminders.num_rows
+    for column in ("priority", "kind"):
+        values = reminders[column].combine_chunks().dictionary_decode()
+        for pair in pc.value_counts(values):
+            key = pair["values"].as_py() or "none"
+            result[key] += pair["counts"].as_py()
+    return result
+
+def per_month(reminders, months=12):
+    """pandas DataFrame of reminder counts per month (rows, "YYYY-MM") and
+    priority (columns), for the last `months` months that have any."""
+    # Group on year * 100 + month and format the few keys afterwards;
+    # strftime on every row would dominate.
+    dates = reminders["date"]
+    table = pa.table({
+        "month": pc.add(pc.multiply(pc.year(dates), 100), pc.month(dates)),
+        "priority": pc.fill_null(
+            reminders["priority"].combine_chunks().dictionary_decode(), "none"
+        ),
+    })
+    table = table.drop_null()
+    grouped = table.group_by(["month", "priority"]).aggregate([([], "count_all")])
+    frame = grouped.to_pandas().pivot(
+        index="month", columns="priority", values="count_all"
+    ).fillna(0).astype(int)
+    frame = frame.reindex(columns=[c for c in PRIORITIES + ("none",) if c in frame])
+    frame = frame.sort_index().tail(months)
+    frame.index = [f"{key // 100}-{key % 100:02d}" for key in frame.index]
+    frame.index.name = "month"
+    return frame
+
+def latest(table, n, column="date"):
+    """The n rows of table with the latest column values, newest first."""
+    return table.sort_by([(column, "descending")]).slice(0, n)
+
+def recent_reminders(reminders, days=5):
+    """[(date, [Reminder])] for the `days` latest dates with reminders."""
+    dates = pc.unique(reminders["date"])
+    newest = pc.array_sort_indices(dates, order="descending")[:days]
+    wanted = pc.take(dates, newest)
+    rows = reminders.filter(pc.is_in(reminders["date"], value_set=wanted)).to_pylist()
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(row["date"], []).append(Reminder(
+            row["text"], id=row["id"], kind=row["kind"],
+            time=parse_time(f"{row['time']:%H:%M}") if row["time"] else None,
+            priority=Priority(row["priority"]) if row["priority"] else None,
+        ))
+    return sorted(grouped.items(), reverse=True)
+
+# ── Year overview ───────────────────────────────────────
+
+EPOCH = date(1970, 1, 1)  # date32 values count days from here
+
+def day_activity(reminders, moods):
+    """Per-day arrays over the whole history, for year_activity().
+
+    {"origin": first day (days since EPOCH), "counts": one-off reminders
+    per day, "moods": index into "labels" per day (-1 for none), "labels":
+    mood labels}. One bincount over the date column; repeating reminders
+    are only stored on their first date and are added per year instead.
+    """
+    one_off = reminders.filter(pc.is_null(reminders["repeat"]))
+    days = pc.cast(one_off["date"].drop_null(), pa.int32()).to_numpy()
+    moods = moods.filter(pc.is_valid(moods["date"]))
+    mood_days = pc.cast(moods["date"], pa.int32()).to_numpy()
+    labels = pc.dictionary_encode(
+        moods["label"].combine_chunks().dictionary_decode()
+    )
+    everything = np.concatenate([days, mood_days])
+    if not len(everything):
+        return {"origin": 0, "counts": np.zeros(0, np.int32),
+                "moods": np.zeros(0, np.int8), "labels": []}
+    origin = int(everything.min())
+    size = int(everything.max()) - origin + 1
+    counts = np.bincount(days - origin, minlength=size).astype(np.int32)
+    mood_codes = np.full(size, -1, np.int8)
+    mood_codes[mood_days - origin] = labels.indices.to_numpy(zero_copy_only=False)
+    return {"origin": origin, "counts": counts, "moods": mood_codes,
+            "labels": labels.dictionary.to_pylist()}
+
+def year_activity(activity, year):
+    """(reminders per day, mood index per day) for every day of year, with
+    repeating reminders expanded into the counts."""
+    first = date(year, 1, 1)
+    start = (first - EPOCH).days
+    size = (date(year + 1, 1, 1) - first).days
+    counts = np.zeros(size, np.int32)
+    moods = np.full(size, -1, np.int8)
+    origin = activity["origin"]
+    lo = max(start, origin)
+    hi = min(start + size, origin + len(activity["counts"]))
+    if lo < hi:
+        counts[lo - start:hi - start] = activity["counts"][lo - origin:hi - origin]
+        moods[lo - start:hi - start] = activity["moods"][lo - origin:hi - origin]
+    repeats = [(day - first).days for day, _ in
+               storage.series_occurrences(first, date(year + 1, 1, 1))]
+    if repeats:
+        counts += np.bincount(repeats, minlength=size).astype(np.int32)
+    return counts, moods
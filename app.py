@@ -1,17 +1,29 @@
 import tkinter as tk
-from tkinter import messagebox
-import csv
+from tkinter import filedialog, messagebox, simpledialog
 import os
+import threading
 from datetime import datetime
 from calendar_view import CalendarView
 from reminder_manager import ReminderManager
 from notifier import start_notifier
-from storage import load_reminders
+from storage import get_total_stats
+import exporter
+import importer
 from quotes import get_quote_of_the_day
 from mood_tracker import MoodTracker, get_mood
 from birthday import BirthdayManager, get_upcoming_birthdays
 from countdown import CountdownWidget
 from weather_widget import WeatherWidget
+import search_index
+from query import QueryError
+
+# Wait this long after the last keystroke before searching.
+SEARCH_DELAY_MS = 150
+# Shorter queries match too much to be useful.
+SEARCH_MIN_CHARS = 2
+SEARCH_ROWS = 8
+# How often to check whether a background import has finished.
+IMPORT_POLL_MS = 100
 
 THEMES = {
     "dark": {
@@ -89,6 +101,10 @@ class App(tk.Tk):
         self.resizable(False, False)
         self.current_theme = "dark"
         self.selected_date = datetime.today().strftime("%Y-%m-%d")
+        self._search_job = None
+        self._search_hits = []
+        self._import_thread = None
+        self.search_index = search_index.get_index()
         self._build_ui()
         self.apply_theme()
         self._check_birthdays()
@@ -122,14 +138,24 @@ class App(tk.Tk):
 
         tk.Button(
             self.header,
-            text="📤 Export CSV",
-            command=self.export_csv,
+            text="📤 Export",
+            command=self.export_reminders,
             bg="#1dd1a1", fg="white",
             font=("Helvetica", 9, "bold"),
             relief="flat", padx=10, pady=5,
             cursor="hand2"
         ).pack(side="right", padx=5, pady=12)
 
+        tk.Button(
+            self.header,
+            text="📥 Import",
+            command=self.import_reminders,
+            bg="#48dbfb", fg="white",
+            font=("Helvetica", 9, "bold"),
+            relief="flat", padx=10, pady=5,
+            cursor="hand2"
+        ).pack(side="right", padx=5, pady=12)
+
         tk.Button(
             self.header,
             text="🎂 Birthdays",
@@ -186,6 +212,9 @@ class App(tk.Tk):
             relief="flat", bd=2
         )
         self.search_entry.pack(side="left", padx=5, pady=8, ipady=3)
+        self.search_entry.bind("<Down>", self.focus_search_results)
+        self.search_entry.bind("<Return>", self.focus_search_results)
+        self.search_entry.bind("<Escape>", lambda e: self.hide_search_results())
 
         self.search_result_label = tk.Label(
             self.search_frame,
@@ -194,6 +223,22 @@ class App(tk.Tk):
         )
         self.search_result_label.pack(side="left", padx=10)
 
+        # Results dropdown, shown under the search box while there are hits
+        self.search_popup = tk.Toplevel(self)
+        self.search_popup.withdraw()
+        self.search_popup.overrideredirect(True)
+        self.search_results = tk.Listbox(
+            self.search_popup,
+            height=SEARCH_ROWS,
+            font=("Helvetica", 10),
+            relief="flat",
+            activestyle="none"
+        )
+        self.search_results.pack(fill="both", expand=True)
+        self.search_results.bind("<ButtonRelease-1>", self.open_search_result)
+        self.search_results.bind("<Return>", self.open_search_result)
+        self.search_results.bind("<Escape>", lambda e: self.hide_search_results())
+
         # ── Main content ─────────────────────────────────
         self.content = tk.Frame(self)
         self.content.pack(fill="both", expand=True, padx=15, pady=8)
@@ -279,6 +324,10 @@ class App(tk.Tk):
             insertbackground=th["fg"]
         )
         self.search_result_label.configure(bg=th["search_bg"])
+        self.search_results.configure(
+            bg=th["listbox_bg"], fg=th["listbox_fg"],
+            selectbackground=th["accent"]
+        )
 
         self.content.configure(bg=th["bg"])
         self.divider.configure(bg=th["divider"])
@@ -390,35 +439,159 @@ class App(tk.Tk):
                 )
 
     def on_search(self, *args):
-        query = self.search_var.get().strip().lower()
-        if not query:
+        """Search once typing pauses, not on every keystroke."""
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(SEARCH_DELAY_MS, self.run_search)
+
+    def run_search(self):
+        self._search_job = None
+        query = self.search_var.get().strip()
+        if len(query) < SEARCH_MIN_CHARS:
             self.search_result_label.config(text="")
+            self.hide_search_results()
+            return
+        try:
+            result = self.search_index.search(query, limit=search_index.MAX_RESULTS)
+        except QueryError as e:
+            self.search_result_label.config(text=f"⚠️ {e}", fg="#feca57")
+            self.hide_search_results()
             return
-        data = load_reminders()
-        count = sum(1 for reminders in data.values()
-                    for r in reminders if query in r.lower())
+        if result is None:
+            # Still indexing; try again shortly.
+            self.search_result_label.config(text="⏳ Indexing...", fg="#feca57")
+            self._search_job = self.after(200, self.run_search)
+            return
+        count, hits = result
         if count:
             self.search_result_label.config(
                 text=f"✅ {count} found", fg="#1dd1a1"
             )
+            self.show_search_results(hits)
         else:
             self.search_result_label.config(
                 text="❌ Not found", fg="#ff6b6b"
             )
+            self.hide_search_results()
+
+    def show_search_results(self, hits):
+        self._search_hits = hits
+        self.search_results.delete(0, tk.END)
+        for hit in hits:
+            try:
+                shown = datetime.strptime(hit.date, "%Y-%m-%d").strftime("%d %b %Y")
+            except ValueError:
+                shown = hit.date
+            self.search_results.insert(tk.END, f"{shown}   {hit.text}")
+        self.search_results.configure(height=min(len(hits), SEARCH_ROWS))
+        x = self.search_entry.winfo_rootx()
+        y = self.search_entry.winfo_rooty() + self.search_entry.winfo_height()
+        self.search_popup.geometry(f"520x{self.search_results.winfo_reqheight()}+{x}+{y}")
+        self.search_popup.deiconify()
+        self.search_popup.lift()
+
+    def hide_search_results(self):
+        self._search_hits = []
+        self.search_popup.withdraw()
+
+    def focus_search_results(self, event=None):
+        if self._search_hits:
+            self.search_results.focus_set()
+            self.search_results.selection_clear(0, tk.END)
+            self.search_results.selection_set(0)
+            self.search_results.activate(0)
+        return "break"
+
+    def open_search_result(self, event=None):
+        """Jump to the date of the chosen hit."""
+        selection = self.search_results.curselection()
+        if not selection or selection[0] >= len(self._search_hits):
+            return
+        hit = self._search_hits[selection[0]]
+        self.hide_search_results()
+        try:
+            self.cal_view.go_to_date(hit.date)
+        except ValueError:
+            pass
+
+    def import_reminders(self):
+        """Add the reminders from an .ics, .csv or .jsonl file, skipping
+        ones already in the calendar."""
+        filename = filedialog.askopenfilename(
+            parent=self,
+            title="Import reminders",
+            filetypes=[
+                ("Calendars and exports", "*.ics *.csv *.jsonl *.gz"),
+                ("All files", "*.*"),
+            ]
+        )
+        if not filename or self._import_thread is not None:
+            return
+        outcome = {}
+
+        def run():
+            # One worker, in this process: a process pool would start
+            # copies of the app on spawn platforms (and frozen builds).
+            try:
+                outcome["report"] = importer.import_file(filename, workers=1)
+            except Exception as e:
+                outcome["error"] = e
+
+        self.configure(cursor="watch")
+        self._import_thread = threading.Thread(target=run, name="import", daemon=True)
+        self._import_thread.start()
+        self.after(IMPORT_POLL_MS, self._finish_import, outcome)
+
+    def _finish_import(self, outcome):
+        """Report the background import once it's done; the window stays
+        responsive meanwhile."""
+        if self._import_thread.is_alive():
+            self.after(IMPORT_POLL_MS, self._finish_import, outcome)
+            return
+        self._import_thread = None
+        self.configure(cursor="")
+        if "error" in outcome:
+            messagebox.showerror("Import", str(outcome["error"]))
+            return
+        # Listeners were told from the import thread; redraw here.
+        self.on_date_select(self.selected_date)
+        messagebox.showinfo("📥 Imported", importer.summary(outcome["report"]))
 
-    def export_csv(self):
-        data = load_reminders()
-        if not data:
+    def export_reminders(self):
+        """Stream reminders to a CSV, JSONL or ICS file (optionally .gz)."""
+        if not get_total_stats()["total"]:
             messagebox.showinfo("Export", "No reminders to export!")
             return
-        filename = "reminders_export.csv"
-        with open(filename, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(["Date", "Reminder"])
-            for date, reminders in sorted(data.items()):
-                for r in reminders:
-                    writer.writerow([date, r])
+        filename = filedialog.asksaveasfilename(
+            parent=self,
+            title="Export reminders",
+            initialfile=exporter.file_name(exporter.CSV),
+            defaultextension=".csv",
+            filetypes=[
+                ("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("iCalendar", "*.ics"),
+                ("Compressed", "*.gz"), ("All files", "*.*"),
+            ]
+        )
+        if not filename:
+            return
+        query = simpledialog.askstring(
+            "Export filter",
+            "Only export matching reminders (optional), e.g.\n"
+            "after:2026-01-01 before:2027-01-01 priority:high",
+            parent=self
+        )
+        if query is None:
+            return
+        self.configure(cursor="watch")
+        self.update_idletasks()
+        try:
+            count = exporter.export_to(filename, query)
+        except (ValueError, OSError) as e:
+            messagebox.showerror("Export", str(e))
+            return
+        finally:
+            self.configure(cursor="")
         messagebox.showinfo(
             "✅ Exported!",
-            f"Saved to:\n{os.path.abspath(filename)}"
+            f"{count} reminder(s) saved to:\n{os.path.abspath(filename)}"
         )
\ No newline at end of file
@@ -0,0 +1,246 @@
+"""Crash-safe file writes shared by the storage backends.
+
+Files are written to a temp file in the same directory, fsynced and then
+renamed over the target, so readers (the notifier thread, the Streamlit
+app in another process) always see either the old or the new complete
+file. GroupCommitter coalesces bursts of writes to the same file into a
+single commit, and FileLock lets processes sharing the data directory take
+turns in the short window where they check and commit a file.
+"""
+
+import atexit
+import contextlib
+import json
+import logging
+import os
+import stat
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+# Writes submitted within this many seconds of each other share one commit.
+COMMIT_WINDOW = 0.05
+# A write that failed on the timer thread is retried after a backoff that
+# doubles per consecutive failure, up to this many seconds.
+MAX_RETRY_DELAY = 5.0
+
+log = logging.getLogger("calendar.storage")
+
+# os.umask() can only be read by setting it, which isn't thread-safe, so
+# it is read once at import, before any writer threads exist.
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+def write_temp(path, raw):
+    """Write raw bytes to a fsynced temp file next to path; return its name."""
+    return _write_temp(path, [raw])
+
+def _open_temp(path):
+    """(binary file, name) of a new, uniquely named temp file next to path."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        # mkstemp makes the file 0600; the rename would carry that over.
+        os.chmod(tmp, _target_mode(path))
+        return os.fdopen(fd, "wb"), tmp
+    except BaseException:
+        os.close(fd)
+        os.remove(tmp)
+        raise
+
+def _write_temp(path, chunks):
+    f, tmp = _open_temp(path)
+    try:
+        with f:
+            for chunk in chunks:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        os.remove(tmp)
+        raise
+    return tmp
+
+def _target_mode(path):
+    """The permissions of path, or those a new file gets under the umask."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+def fsync_dir(path):
+    """fsync the directory containing path so a rename survives a crash."""
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def atomic_write(path, raw):
+    """Replace path with raw bytes atomically."""
+    atomic_write_chunks(path, [raw])
+
+def atomic_write_chunks(path, chunks):
+    """Replace path atomically with the bytes chunks yields, written as
+    they come, so the content never has to fit in memory."""
+    tmp = _write_temp(path, chunks)
+    try:
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    fsync_dir(path)
+
+@contextlib.contextmanager
+def atomic_file(path):
+    """Yield a binary file to write; when the block finishes without an
+    error it replaces path atomically, otherwise it is thrown away. For
+    writers that want a file object, such as pyarrow's."""
+    f, tmp = _open_temp(path)
+    try:
+        with f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    fsync_dir(path)
+
+def atomic_write_json(path, data):
+    atomic_write(path, json.dumps(data, indent=2).encode())
+
+class FileLock:
+    """Exclusive advisory lock (fcntl.flock) on path + ".lock".
+
+    Re-entrant within a thread and shared by the threads of one process,
+    so code holding it can call helpers that take it again. Only writers
+    take it; readers rely on the atomic renames above.
+    """
+
+    def __init__(self, path):
+        self.path = path + ".lock"
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+        self.waits = 0
+
+    def __enter__(self):
+        self._lock.acquire()
+        if self._depth == 0:
+            try:
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            except BaseException:
+                self._lock.release()
+                raise
+            if fcntl is not None:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    self.waits += 1
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+            self._fd = fd
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0:
+            os.close(self._fd)  # releases the flock
+            self._fd = None
+        self._lock.release()
+
+class GroupCommitter:
+    """Delay writes by a short window and run only the latest one per key.
+
+    submit(key, write) replaces any write still pending for key, so ten
+    quick saves of the same file within the window cost one fsync. Pending
+    writes are flushed by a timer thread, by flush(), and at exit. A write
+    that fails on the timer thread is logged and retried with a backoff;
+    flush() raises instead, so explicit callers see the error.
+    """
+
+    def __init__(self, window=COMMIT_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}
+        self._timer = None
+        self._failures = 0
+        self.submitted = 0
+        self.committed = 0
+        atexit.register(self.flush)
+
+    def submit(self, key, write):
+        with self._lock:
+            self._pending[key] = write
+            self.submitted += 1
+            if self._timer is None:
+                self._arm(self.window)
+
+    def _arm(self, delay):
+        # Caller holds self._lock.
+        self._timer = threading.Timer(delay, self._flush_on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """Run every pending write now; re-raise the first failure."""
+        failed = self._run()
+        if failed:
+            raise next(iter(failed.values()))[1]
+
+    def _flush_on_timer(self):
+        """Timer path: log failed writes and queue them for a retry."""
+        failed = self._run()
+        if not failed:
+            self._failures = 0
+            return
+        for key, (write, error) in failed.items():
+            log.error("delayed write of %s failed", key,
+                      exc_info=(type(error), error, error.__traceback__))
+        with self._lock:
+            for key, (write, _) in failed.items():
+                # A newer write submitted meanwhile supersedes the failed one.
+                self._pending.setdefault(key, write)
+            self._failures += 1
+            if self._timer is None:
+                self._arm(min(self.window * 2 ** self._failures, MAX_RETRY_DELAY))
+
+    def _run(self):
+        """Run the pending writes; return {key: (write, error)} of failures."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            failed = {}
+            for key, write in pending.items():
+                try:
+                    write()
+                    self.committed += 1
+                except Exception as e:
+                    failed[key] = (write, e)
+            return failed
+
+    def stats(self):
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "committed": self.committed,
+                "pending": len(self._pending),
+            }
+
+committer = GroupCommitter()
@@ -0,0 +1,142 @@
+"""Background autosave for the Quick Notes pads.
+
+Typing used to rewrite quick_notes.txt on the Tk thread after every key.
+Autosaver.save() only records the latest text; a background thread writes
+it once typing has paused for DEBOUNCE_SECONDS, atomically, and skips the
+write entirely if the text hashes the same as what is already on disk.
+flush() (called when the window closes, and at exit) writes anything still
+pending right away.
+
+The default pad keeps living in quick_notes.txt. Other pads are files in
+NOTES_DIR, listed by name and only read when opened.
+"""
+
+import atexit
+import hashlib
+import os
+import re
+import threading
+import time
+from atomic_writer import atomic_write
+
+DEFAULT_PAD = "Quick Notes"
+DEFAULT_FILE = "quick_notes.txt"
+NOTES_DIR = "notes"
+
+# Write once the text has been left alone this long.
+DEBOUNCE_SECONDS = 1.0
+
+def _digest(text):
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+def pad_file_name(name):
+    """Safe file name for a pad name."""
+    return re.sub(r"[^\w\- ]", "_", name).strip() or "_"
+
+class Autosaver:
+    def __init__(self, notes_dir=NOTES_DIR, default_file=DEFAULT_FILE,
+                 delay=DEBOUNCE_SECONDS):
+        self.notes_dir = notes_dir
+        self.default_file = default_file
+        self.delay = delay
+        self._cond = threading.Condition()
+        # Held while taking and writing pending text, so flush() and the
+        # worker never write an older version after a newer one.
+        self._write_lock = threading.Lock()
+        self._pending = {}  # pad -> (text, due time)
+        self._saved = {}    # pad -> digest of the text on disk
+        self._thread = None
+        self.writes = 0
+        self.skipped = 0
+        atexit.register(self.flush)
+
+    def path(self, pad):
+        if pad == DEFAULT_PAD:
+            return self.default_file
+        return os.path.join(self.notes_dir, pad_file_name(pad) + ".txt")
+
+    def list_pads(self):
+        """Pad names, default first. Only lists the directory."""
+        try:
+            names = sorted(
+                f[:-4] for f in os.listdir(self.notes_dir) if f.endswith(".txt")
+            )
+        except FileNotFoundError:
+            names = []
+        return [DEFAULT_PAD] + [n for n in names if n != DEFAULT_PAD]
+
+    def load(self, pad):
+        """Text of one pad: the pending edit if any, else the file."""
+        with self._cond:
+            pending = self._pending.get(pad)
+        if pending is not None:
+            return pending[0]
+        try:
+            with open(self.path(pad), "r", encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            return ""
+        with self._cond:
+            self._saved[pad] = _digest(text)
+        return text
+
+    def save(self, pad, text):
+        """Remember text as the latest content of pad; write it later."""
+        with self._cond:
+            self._pending[pad] = (text, time.monotonic() + self.delay)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="autosave", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+
+    def flush(self):
+        """Write every pending pad now."""
+        with self._write_lock:
+            with self._cond:
+                pending, self._pending = self._pending, {}
+            for pad, (text, _) in pending.items():
+                self._write(pad, text)
+
+    def stats(self):
+        with self._cond:
+            return {"writes": self.writes, "skipped": self.skipped,
+                    "pending": len(self._pending)}
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                now = time.monotonic()
+                due = min(d for _, d in self._pending.values())
+                if due > now:
+                    self._cond.wait(due - now)
+                    continue
+            with self._write_lock:
+                with self._cond:
+                    now = time.monotonic()
+                    ready = {p: t for p, (t, d) in self._pending.items() if d <= now}
+                    for pad in ready:
+                        del self._pending[pad]
+                for pad, text in ready.items():
+                    try:
+                        self._write(pad, text)
+                    except OSError:
+                        pass
+
+    def _write(self, pad, text):
+        digest = _digest(text)
+        with self._cond:
+            if self._saved.get(pad) == digest:
+                self.skipped += 1
+                return
+        path = self.path(pad)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        atomic_write(path, text.encode())
+        with self._cond:
+            self._saved[pad] = digest
+            self.writes += 1
@@ -1,29 +1,7 @@
 import tkinter as tk
 from tkinter import messagebox
-import json
-import os
 from datetime import datetime
-
-BIRTHDAY_FILE = "birthdays.json"
-
-def load_birthdays():
-    if not os.path.exists(BIRTHDAY_FILE):
-        return {}
-    with open(BIRTHDAY_FILE, "r") as f:
-        return json.load(f)
-
-def save_birthday(name, date_str):
-    data = load_birthdays()
-    data[name] = date_str
-    with open(BIRTHDAY_FILE, "w") as f:
-        json.dump(data, f, indent=2)
-
-def delete_birthday(name):
-    data = load_birthdays()
-    if name in data:
-        del data[name]
-        with open(BIRTHDAY_FILE, "w") as f:
-            json.dump(data, f, indent=2)
+from storage import load_birthdays, save_birthday, delete_birthday
 
 def get_upcoming_birthdays(days=30):
     data = load_birthdays()
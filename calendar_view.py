@@ -1,12 +1,60 @@
+import threading
 import tkinter as tk
 from tkcalendar import Calendar
-from datetime import datetime
-from storage import get_all_dates_with_reminders
+from datetime import date, datetime, timedelta
+import storage
+from models import Priority
+
+# Days are shaded by how many reminders they hold: 1, 2-3, 4-6, 7+.
+DENSITY_LEVELS = (1, 2, 4, 7)
+DENSITY_STRENGTH = (0.35, 0.55, 0.78, 1.0)
+CELL_BG = "#2b2b2b"
+NO_PRIORITY_COLOR = "#ff9f43"
+PRIORITY_NAMES = {p.rank: p.label for p in Priority}
+
+def _blend(color, strength, base=CELL_BG):
+    mix = [
+        round(int(base[i:i + 2], 16) * (1 - strength) + int(color[i:i + 2], 16) * strength)
+        for i in (1, 3, 5)
+    ]
+    return "#%02x%02x%02x" % tuple(mix)
+
+def _density_level(count):
+    level = 0
+    for i, threshold in enumerate(DENSITY_LEVELS):
+        if count >= threshold:
+            level = i
+    return level
+
+def _heat_tag(count, rank):
+    """Tag for a day: shade from the count, hue from the top priority."""
+    return f"heat{_density_level(count)}_{rank}"
+
+def _heat_text(count, rank):
+    text = f"{count} reminder" + ("s" if count != 1 else "")
+    if rank:
+        text += f" (top: {PRIORITY_NAMES[rank]})"
+    return text
+
+def _month_key(date_str):
+    return int(date_str[:4]), int(date_str[5:7])
+
+def _add_months(key, n):
+    year, month = key
+    index = year * 12 + month - 1 + n
+    return index // 12, index % 12 + 1
 
 class CalendarView(tk.Frame):
     def __init__(self, parent, on_date_select):
         super().__init__(parent, bg="#2b2b2b")
         self.on_date_select = on_date_select
+        # date string -> (calevent id, (count, rank)) of the days shown
+        self._highlighted = {}
+        # (year, month) -> {date string: (count, top priority rank)}
+        self._month_days = {}
+        self._stale_days = set()
+        self._reload_all = False
+        self._refresh_pending = False
 
         self.title_lbl = tk.Label(
             self,
@@ -42,7 +90,10 @@ class CalendarView(tk.Frame):
         )
         self.cal.pack(padx=10, pady=5)
         self.cal.bind("<<CalendarSelected>>", self._on_date_click)
+        self.cal.bind("<<CalendarMonthChanged>>", lambda e: self.highlight_reminder_dates())
+        self._configure_heat_tags()
         self.highlight_reminder_dates()
+        storage.subscribe(self._on_change)
 
         self.today_btn = tk.Button(
             self,
@@ -63,22 +114,125 @@ class CalendarView(tk.Frame):
         date_str = date_obj.strftime("%Y-%m-%d")
         self.on_date_select(date_str)
 
+    def destroy(self):
+        storage.unsubscribe(self._on_change)
+        super().destroy()
+
+    def _on_change(self, event):
+        """Storage listener: note which days need recounting.
+
+        May run on another thread (the notifier reports external changes),
+        so it only records what changed; the redraw happens on the Tk
+        thread.
+        """
+        changed = event.get("reminders") or [event.get("reminder")]
+        if event["op"] == "reset" or any(r is None or r.rule for r in changed):
+            self._reload_all = True
+        else:
+            for date_str in (event.get("date"), event.get("to")):
+                if date_str:
+                    self._stale_days.add(date_str)
+        if threading.current_thread() is threading.main_thread() and not self._refresh_pending:
+            self._refresh_pending = True
+            self.after_idle(self.refresh_highlights)
+
+    def _configure_heat_tags(self):
+        colors = {p.rank: p.color for p in Priority}
+        colors[0] = NO_PRIORITY_COLOR
+        for rank, color in colors.items():
+            for level, strength in enumerate(DENSITY_STRENGTH):
+                self.cal.tag_config(
+                    f"heat{level}_{rank}",
+                    background=_blend(color, strength),
+                    foreground="white"
+                )
+
+    def _days_in(self, key):
+        """Per-day counts for one month, aggregated once and then cached."""
+        days = self._month_days.get(key)
+        if days is None:
+            first = date(key[0], key[1], 1)
+            nxt = _add_months(key, 1)
+            days = storage.day_summaries(first, date(nxt[0], nxt[1], 1))
+            self._month_days[key] = days
+        return days
+
+    def _displayed_range(self):
+        """First and last+1 day of the 6-week grid tkcalendar is showing."""
+        month, year = self.cal.get_displayed_month()
+        first = date(year, month, 1)
+        start = first - timedelta(days=first.weekday())
+        return start, start + timedelta(weeks=6)
+
     def highlight_reminder_dates(self):
-        dates = get_all_dates_with_reminders()
-        for date_str in dates:
+        """Shade the reminder days of the displayed grid by density.
+
+        Only the difference to what is already shown is applied, and only
+        the visible month and its neighbours are ever looked up.
+        """
+        month, year = self.cal.get_displayed_month()
+        start, end = (d.isoformat() for d in self._displayed_range())
+        wanted = {}
+        for n in (-1, 0, 1):
+            for date_str, summary in self._days_in(_add_months((year, month), n)).items():
+                if start <= date_str < end:
+                    wanted[date_str] = summary
+        for date_str in self._highlighted.keys() - wanted.keys():
+            self.cal.calevent_remove(self._highlighted.pop(date_str)[0])
+        for date_str, summary in wanted.items():
+            shown = self._highlighted.get(date_str)
+            if shown is not None and shown[1] == summary:
+                continue
+            if shown is not None:
+                self.cal.calevent_configure(
+                    shown[0], text=_heat_text(*summary), tags=[_heat_tag(*summary)]
+                )
+                self._highlighted[date_str] = (shown[0], summary)
+                continue
             try:
-                date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-                self.cal.calevent_create(date_obj, "Reminder", "reminder")
-            except Exception:
-                pass
-        self.cal.tag_config("reminder", background="#ff9f43", foreground="white")
+                ev_id = self.cal.calevent_create(
+                    date.fromisoformat(date_str), _heat_text(*summary), _heat_tag(*summary)
+                )
+            except ValueError:
+                continue
+            self._highlighted[date_str] = (ev_id, summary)
+        self.after_idle(self._prefetch, (year, month))
+
+    def _prefetch(self, key):
+        """Load the months one step beyond the visible grid in advance."""
+        for n in (-2, 2):
+            self._days_in(_add_months(key, n))
+
+    def _recount_day(self, date_str):
+        """Refresh one day's entry in its cached month, if that month is cached."""
+        try:
+            day = date.fromisoformat(date_str)
+        except ValueError:
+            return
+        days = self._month_days.get(_month_key(date_str))
+        if days is None:
+            return
+        summary = storage.day_summaries(day, day + timedelta(days=1)).get(date_str)
+        if summary is None:
+            days.pop(date_str, None)
+        else:
+            days[date_str] = summary
 
     def refresh_highlights(self):
-        self.cal.calevent_remove("all")
+        """Apply reminder changes made since the last refresh."""
+        self._refresh_pending = False
+        if self._reload_all:
+            self._reload_all = False
+            self._stale_days.clear()
+            self._month_days.clear()
+        while self._stale_days:
+            self._recount_day(self._stale_days.pop())
         self.highlight_reminder_dates()
 
     def go_to_today(self):
-        today = datetime.today()
-        self.cal.selection_set(today)
-        date_str = today.strftime("%Y-%m-%d")
+        self.go_to_date(datetime.today().strftime("%Y-%m-%d"))
+
+    def go_to_date(self, date_str):
+        """Show and select date_str, as if it had been clicked."""
+        self.cal.selection_set(datetime.strptime(date_str, "%Y-%m-%d"))
         self.on_date_select(date_str)
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""Command-line maintenance tasks for the calendar data.
+
+    python cli.py migrate        # import the JSON files into calendar.db
+    python cli.py find "priority:low before:2025"
+    python cli.py delete "priority:low before:2025"   # asks first; --yes to skip
+    python cli.py import calendar.ics        # also .csv, .jsonl, and .gz of each
+    python cli.py snapshot                   # Parquet tables for analysis, see analytics.py
+
+Queries use the search bar syntax, see query.py.
+"""
+
+import argparse
+import sys
+import time
+import storage
+import importer
+import sqlite_store
+
+def cmd_migrate(args):
+    sqlite_store.DB_FILE = args.db
+    counts = storage.migrate_to_sqlite()
+    print(f"✅ Migrated into {args.db}: "
+          + ", ".join(f"{n} {kind}" for kind, n in counts.items()))
+    print("Set CALENDAR_STORAGE=sqlite to use the database.")
+
+def _print_matches(found, limit=None):
+    for date_str, r in found[:limit]:
+        print(f"{date_str}  {'🔁 ' if r.is_recurring else ''}{r.display()}")
+    if limit is not None and len(found) > limit:
+        print(f"... and {len(found) - limit} more")
+
+def cmd_find(args):
+    found = storage.find_reminders(args.query)
+    _print_matches(found)
+    print(f"{len(found)} reminder(s) match.")
+
+def cmd_delete(args):
+    found = storage.find_reminders(args.query)
+    if not found:
+        print("Nothing matches.")
+        return
+    if not args.yes:
+        _print_matches(found, limit=20)
+        answer = input(f"Delete {len(found)} reminder(s)? [y/N] ")
+        if answer.strip().lower() not in ("y", "yes"):
+            print("Cancelled.")
+            return
+    deleted = storage.delete_matching(args.query)
+    storage.compact()
+    print(f"🗑 Deleted {len(deleted)} reminder(s).")
+
+def cmd_import(args):
+    report = importer.import_file(args.file, workers=args.workers, dry_run=args.dry_run)
+    storage.compact()
+    print(("🔎 Dry run: " if args.dry_run else "✅ ") + importer.summary(report)
+          + f" ({report['workers']} worker(s))")
+
+def cmd_snapshot(args):
+    import analytics  # needs pyarrow
+    if args.dir:
+        analytics.SNAPSHOT_DIR = args.dir
+    started = time.perf_counter()
+    rows = analytics.snapshot()
+    print(f"✅ Snapshot written to {analytics.SNAPSHOT_DIR}/ in {time.perf_counter() - started:.2f}s: "
+          + ", ".join(f"{n} {name.replace('_', ' ')}" for name, n in rows.items()))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calendar & Reminder App tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("migrate", help="import the JSON files into SQLite")
+    p.add_argument("--db", default=sqlite_store.DB_FILE, help="database file")
+    p.set_defaults(func=cmd_migrate)
+
+    p = sub.add_parser("find", help="list the reminders matching a query")
+    p.add_argument("query", help='e.g. "priority:high after:2026-01-01 meeting"')
+    p.set_defaults(func=cmd_find)
+
+    p = sub.add_parser("delete", help="delete the reminders matching a query")
+    p.add_argument("query", help='e.g. "priority:low before:2025"')
+    p.add_argument("--yes", action="store_true", help="do not ask for confirmation")
+    p.set_defaults(func=cmd_delete)
+
+    p = sub.add_parser("import", help="import reminders from .ics, .csv or .jsonl")
+    p.add_argument("file", help="file to import; .gz files are decompressed")
+    p.add_argument("--workers", type=int, default=None,
+                   help="parser processes (default: one per CPU for large files)")
+    p.add_argument("--dry-run", action="store_true", help="count, but do not save")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("snapshot", help="write Parquet tables of all data for analysis")
+    p.add_argument("--dir", help="output directory (default: snapshot)")
+    p.set_defaults(func=cmd_snapshot)
+
+    args = parser.parse_args(argv)
+    try:
+        args.func(args)
+    except (ValueError, OSError) as e:  # QueryError is a ValueError
+        sys.exit(f"❌ {e}")
+
+if __name__ == "__main__":
+    main()
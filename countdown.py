@@ -1,30 +1,120 @@
+import bisect
+import threading
 import tkinter as tk
-from datetime import datetime
-from storage import load_reminders
+from datetime import date, datetime, time
+from operator import itemgetter
+import storage
+
+# How many upcoming fire times to keep ready; more are loaded on demand.
+CAPACITY = 32
+
+class UpcomingIndex:
+    """The next upcoming reminder occurrences, sorted by fire time.
+
+    Built once from storage.occurrences() and then patched from storage
+    change events (add/delete/update/move of one-off reminders), so asking
+    for the next reminder is a peek at the front of a short sorted list.
+    Changes involving repeating reminders, or made by another process,
+    mark the index dirty and it is rebuilt on the next query.
+    """
+
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        # (due, reminder_id, reminder), ascending
+        self._entries = []
+        # Every occurrence due before this is in _entries; None means
+        # _entries holds all upcoming occurrences.
+        self._boundary = None
+        self._dirty = True
+        self._subscribed = False
+        self.rebuilds = 0
+
+    def _on_change(self, event):
+        with self._lock:
+            if self._dirty:
+                return
+            op = event["op"]
+            changed = event.get("reminders") or [event.get("reminder")]
+            if event.get("old") is not None:
+                changed.append(event["old"])
+            if op == "reset" or any(r is None or r.rule for r in changed):
+                self._dirty = True
+                return
+            for r in changed:
+                self._remove(r.id)
+            if op in ("add", "update"):
+                self._insert(event["date"], event["reminder"])
+            elif op == "move":
+                self._insert(event["to"], event["reminder"])
+            if not self._entries and self._boundary is not None:
+                self._dirty = True
+
+    def _remove(self, reminder_id):
+        self._entries = [e for e in self._entries if e[1] != reminder_id]
+
+    def _insert(self, date_str, reminder):
+        if not reminder.time:
+            return
+        try:
+            due = datetime.combine(date.fromisoformat(date_str), reminder.time)
+        except ValueError:
+            return
+        if due <= datetime.now():
+            return
+        if self._boundary is None or due < self._boundary:
+            # (due, id) is unique, so the Reminder itself is never compared.
+            bisect.insort(self._entries, (due, reminder.id, reminder))
+
+    def _rebuild(self, now):
+        entries = []
+        boundary = None
+        for day, r in storage.occurrences(now.date(), where=lambda r: r.time):
+            if len(entries) >= self.capacity and day > entries[-1][0].date():
+                boundary = datetime.combine(day, time.min)
+                break
+            due = datetime.combine(day, r.time)
+            if due > now:
+                entries.append((due, r.id, r))
+        entries.sort(key=itemgetter(0, 1))
+        self._entries = entries
+        self._boundary = boundary
+        self._dirty = False
+        self.rebuilds += 1
+
+    def upcoming(self, n=1, now=None):
+        """The next n (due, Reminder) pairs after now, soonest first."""
+        now = now or datetime.now()
+        with self._lock:
+            if not self._subscribed:
+                storage.subscribe(self._on_change)
+                self._subscribed = True
+            if n > self.capacity:
+                self.capacity = n
+                self._dirty = True
+            if not self._dirty:
+                past = 0
+                while past < len(self._entries) and self._entries[past][0] <= now:
+                    past += 1
+                del self._entries[:past]
+                if len(self._entries) < n and self._boundary is not None:
+                    self._dirty = True
+            if self._dirty:
+                self._rebuild(now)
+            return [(due, r) for due, _, r in self._entries[:n]]
+
+_index = UpcomingIndex()
+
+def get_upcoming(n=5):
+    """The next n upcoming reminders as (datetime, Reminder), soonest first."""
+    return _index.upcoming(n)
 
 def get_next_reminder():
     """Find the next upcoming reminder."""
-    now = datetime.now()
-    data = load_reminders()
-    upcoming = []
-
-    for date_str, reminders in data.items():
-        for reminder in reminders:
-            try:
-                parts = reminder.split("|")
-                if len(parts) >= 1:
-                    time_part = parts[0].strip()
-                    if ":" in time_part and len(time_part) == 5:
-                        dt_str = f"{date_str} {time_part}"
-                        dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
-                        if dt > now:
-                            upcoming.append((dt, reminder.strip()))
-            except:
-                pass
-
+    upcoming = _index.upcoming(1)
     if upcoming:
-        upcoming.sort(key=lambda x: x[0])
-        return upcoming[0]
+        dt, reminder = upcoming[0]
+        return dt, reminder.display()
     return None
 
 class CountdownWidget(tk.Frame):
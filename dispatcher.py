@@ -0,0 +1,304 @@
+"""Non-blocking notification delivery.
+
+The scheduler hands each due reminder to Dispatcher.submit(), which only
+puts it on a bounded queue. A small pool of worker threads delivers it to
+every configured backend, each with its own timeout and retries, so a slow
+desktop notification never delays the next reminder. A backend whose call
+timed out is skipped until that call returns, so a hung notifier costs one
+stuck thread rather than one per reminder.
+"""
+
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections import namedtuple
+
+APP_NAME = "Calendar & Reminder App"
+
+QUEUE_SIZE = 256
+WORKERS = 4
+
+log = logging.getLogger("calendar.notify")
+
+Notification = namedtuple("Notification", "title message due queued_at")
+
+class Backend:
+    """One way of telling the user. Subclasses implement deliver()."""
+    name = "backend"
+    timeout = 5.0
+    retries = 1
+
+    def available(self):
+        return True
+
+    def deliver(self, note):
+        raise NotImplementedError
+
+class PlyerBackend(Backend):
+    name = "plyer"
+    timeout = 10.0
+
+    def available(self):
+        try:
+            import plyer  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def deliver(self, note):
+        from plyer import notification
+        notification.notify(
+            title=note.title,
+            message=note.message,
+            app_name=APP_NAME,
+            timeout=10
+        )
+
+class WinsoundBackend(Backend):
+    """Play a beep sound on Windows."""
+    name = "winsound"
+    timeout = 2.0
+    retries = 0
+
+    def available(self):
+        return sys.platform == "win32"
+
+    def deliver(self, note):
+        import winsound
+        winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
+
+class LinuxDesktopBackend(Backend):
+    """Desktop notification through notify-send (libnotify)."""
+    name = "linux"
+
+    def available(self):
+        return shutil.which("notify-send") is not None
+
+    def deliver(self, note):
+        subprocess.run(
+            ["notify-send", "--app-name", APP_NAME, note.title, note.message],
+            check=True, timeout=self.timeout,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+class LogBackend(Backend):
+    """Log through the "calendar.notify" logger; main.py sends it to stderr."""
+    name = "log"
+    retries = 0
+
+    def deliver(self, note):
+        log.info("%s %s (due %s)", note.title, note.message, note.due)
+
+class FileBackend(Backend):
+    """Append one line per notification to a file, or print to stdout.
+
+    Handy in tests and headless setups.
+    """
+    name = "file"
+    retries = 0
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def available(self):
+        # A windowed (PyInstaller) build has no stdout.
+        return self.path is not None or sys.stdout is not None
+
+    def deliver(self, note):
+        line = f"{note.due:%Y-%m-%d %H:%M}\t{note.title}\t{note.message}\n"
+        with self._lock:
+            if self.path is None:
+                sys.stdout.write(line)
+                sys.stdout.flush()
+            else:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+
+BACKEND_TYPES = {
+    "plyer": PlyerBackend,
+    "winsound": WinsoundBackend,
+    "linux": LinuxDesktopBackend,
+    "log": LogBackend,
+    "stdout": FileBackend,
+}
+
+def default_backends():
+    """Backends for this platform, or the comma-separated list in
+    CALENDAR_NOTIFIERS (e.g. "stdout,log").
+
+    If nothing here can show a desktop notification, reminders are
+    printed to stdout (or, without one, logged) rather than dropped.
+    """
+    names = os.environ.get("CALENDAR_NOTIFIERS")
+    if names:
+        return [BACKEND_TYPES[n.strip()]() for n in names.split(",") if n.strip()]
+    if sys.platform == "win32":
+        candidates = [WinsoundBackend(), PlyerBackend()]
+    elif sys.platform.startswith("linux"):
+        # notify-send if installed, else plyer (which talks to D-Bus).
+        candidates = [LinuxDesktopBackend()]
+        if not candidates[0].available():
+            candidates = [PlyerBackend()]
+    else:
+        candidates = [PlyerBackend()]
+    backends = [b for b in candidates if b.available()]
+    if not backends:
+        backends = [b for b in (FileBackend(), LogBackend()) if b.available()][:1]
+    return backends
+
+class CallTimeout(TimeoutError):
+    """A backend call given up on; thread is still running it."""
+
+    def __init__(self, thread):
+        super().__init__(f"{thread.name} still running")
+        self.thread = thread
+
+def _call_with_timeout(fn, arg, timeout):
+    """Run fn(arg) in a daemon thread; give up on it after timeout seconds.
+
+    A hung backend call is abandoned rather than joined, so it can neither
+    block a worker forever nor keep the app from exiting. The CallTimeout
+    raised then carries the thread, so the caller can tell when it ends.
+    """
+    outcome = {}
+
+    def run():
+        try:
+            fn(arg)
+        except BaseException as e:
+            outcome["error"] = e
+
+    t = threading.Thread(target=run, daemon=True)
+    t.start()
+    t.join(timeout)
+    if t.is_alive():
+        raise CallTimeout(t)
+    if "error" in outcome:
+        raise outcome["error"]
+
+class Dispatcher:
+    def __init__(self, backends=None, workers=WORKERS, queue_size=QUEUE_SIZE):
+        self.backends = default_backends() if backends is None else backends
+        self.workers = workers
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stats = {
+            "submitted": 0, "delivered": 0, "failed": 0, "dropped": 0,
+            "retries": 0, "timeouts": 0,
+            "latency_total": 0.0, "latency_max": 0.0, "latency_last": None,
+        }
+        self._backend_stats = {
+            b.name: {"ok": 0, "failed": 0, "skipped": 0} for b in self.backends
+        }
+        # Threads still running a timed-out call, per backend name.
+        self._hung = {b.name: [] for b in self.backends}
+
+    def start(self):
+        for i in range(self.workers):
+            t = threading.Thread(target=self._work, name=f"notify-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def submit(self, title, message, due):
+        """Queue a notification. Never blocks; returns False if the queue is full."""
+        note = Notification(title, message, due, time.monotonic())
+        try:
+            self._queue.put_nowait(note)
+        except queue.Full:
+            with self._lock:
+                self._stats["dropped"] += 1
+            log.warning("Notification queue full, dropped: %s", message)
+            return False
+        with self._lock:
+            self._stats["submitted"] += 1
+        return True
+
+    def notify_reminder(self, reminder, due):
+        """on_fire callback for ReminderScheduler."""
+        self.submit("🔔 Reminder!", reminder.display(), due)
+
+    def join(self, timeout=None):
+        """Wait until every queued notification has been handled."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _work(self):
+        while True:
+            note = self._queue.get()
+            try:
+                ok = all([self._deliver(backend, note) for backend in self.backends])
+                latency = time.monotonic() - note.queued_at
+                with self._lock:
+                    self._stats["delivered" if ok else "failed"] += 1
+                    self._stats["latency_total"] += latency
+                    self._stats["latency_max"] = max(self._stats["latency_max"], latency)
+                    self._stats["latency_last"] = latency
+            finally:
+                self._queue.task_done()
+
+    def _hung_calls(self, name):
+        """Prune finished threads from _hung[name]; return how many remain.
+        Caller holds self._lock."""
+        alive = [t for t in self._hung[name] if t.is_alive()]
+        self._hung[name] = alive
+        return len(alive)
+
+    def _deliver(self, backend, note):
+        with self._lock:
+            if self._hung_calls(backend.name):
+                self._backend_stats[backend.name]["skipped"] += 1
+                self._backend_stats[backend.name]["failed"] += 1
+                log.warning("%s backend skipped: an earlier call is still running",
+                            backend.name)
+                return False
+        for attempt in range(backend.retries + 1):
+            if attempt:
+                with self._lock:
+                    self._stats["retries"] += 1
+                time.sleep(0.2 * attempt)
+            try:
+                _call_with_timeout(backend.deliver, note, backend.timeout)
+            except CallTimeout as e:
+                with self._lock:
+                    self._stats["timeouts"] += 1
+                    self._hung[backend.name].append(e.thread)
+                log.warning("%s backend timed out", backend.name)
+                # Retrying now would only strand another thread behind it.
+                break
+            except Exception as e:
+                log.warning("%s backend failed: %s", backend.name, e)
+                continue
+            with self._lock:
+                self._backend_stats[backend.name]["ok"] += 1
+            return True
+        with self._lock:
+            self._backend_stats[backend.name]["failed"] += 1
+        return False
+
+    def stats(self):
+        """Queue depth, delivery counts and latency (seconds) for monitoring.
+
+        "hung" counts backend calls that timed out and are still running.
+        """
+        with self._lock:
+            s = dict(self._stats)
+            finished = s["delivered"] + s["failed"]
+            s["latency_avg"] = s.pop("latency_total") / finished if finished else None
+            s["queue_depth"] = self._queue.qsize()
+            s["backends"] = {k: dict(v) for k, v in self._backend_stats.items()}
+            for name, counts in s["backends"].items():
+                counts["hung"] = self._hung_calls(name)
+            s["hung"] = sum(counts["hung"] for counts in s["backends"].values())
+            return s
@@ -0,0 +1,173 @@
+"""Streaming export of reminders as CSV, JSON Lines or iCalendar.
+
+Rows are generated one reminder at a time from storage.iter_matching() and
+handed out in chunks of CHUNK_ROWS, optionally through a streaming gzip
+compressor, so an export of a million reminders needs no more memory than
+one chunk. Any search query (see query.py) can narrow the export, e.g.
+"after:2026-01-01 before:2027-01-01 priority:high".
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, timedelta, timezone
+import storage
+from atomic_writer import atomic_write_chunks
+from models import KIND_JOURNAL
+
+CSV, JSONL, ICS = "csv", "jsonl", "ics"
+
+# format -> (file extension, MIME type)
+FORMATS = {
+    CSV: (".csv", "text/csv"),
+    JSONL: (".jsonl", "application/x-ndjson"),
+    ICS: (".ics", "text/calendar"),
+}
+
+CSV_HEADER = ["Date", "Time", "Priority", "Kind", "Text", "Repeat", "Except", "Reminder", "ID"]
+
+# Rows per chunk handed to the caller (and per write).
+CHUNK_ROWS = 1000
+
+ICS_PRIORITIES = {"high": 1, "medium": 5, "low": 9}
+
+def file_name(fmt, compress=False, stem="reminders_export"):
+    return stem + FORMATS[fmt][0] + (".gz" if compress else "")
+
+def mime_type(fmt, compress=False):
+    return "application/gzip" if compress else FORMATS[fmt][1]
+
+def format_for(path):
+    """(format, compressed) from a file name such as "out.ics.gz"."""
+    name = path.lower()
+    compress = name.endswith(".gz")
+    if compress:
+        name = name[:-3]
+    for fmt, (ext, _) in FORMATS.items():
+        if name.endswith(ext):
+            return fmt, compress
+    raise ValueError(f"Unknown export format: {path!r} (use .csv, .jsonl or .ics, optionally .gz)")
+
+# ── Rows ────────────────────────────────────────────────
+
+def _csv_rows(rows):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(CSV_HEADER)
+    for date_str, r in rows:
+        writer.writerow([
+            date_str, r.time_str, r.priority.value if r.priority else "", r.kind,
+            r.text, r.rule.to_rrule(bool(r.time)) if r.rule else "",
+            ";".join(d.isoformat() for d in sorted(r.rule.exceptions)) if r.rule else "",
+            r.display(), r.id,
+        ])
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+
+def _jsonl_rows(rows):
+    for date_str, r in rows:
+        yield json.dumps({"date": date_str, **r.to_dict()}, ensure_ascii=False) + "\n"
+
+def _ics_text(value):
+    return (value.replace("\\", "\\\\").replace(";", "\\;")
+            .replace(",", "\\,").replace("\n", "\\n"))
+
+def _ics_fold(line):
+    """Fold a content line at 75 octets, as RFC 5545 requires."""
+    raw = line.encode()
+    if len(raw) <= 75:
+        return line + "\r\n"
+    parts = []
+    while raw:
+        limit = 75 if not parts else 74
+        cut = min(limit, len(raw))
+        while cut < len(raw) and (raw[cut] & 0xC0) == 0x80:
+            cut -= 1  # don't split a UTF-8 sequence
+        parts.append(raw[:cut].decode())
+        raw = raw[cut:]
+    return "\r\n ".join(parts) + "\r\n"
+
+def _ics_rows(rows):
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    yield ("BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"
+           "PRODID:-//Calendar & Reminder App//EN\r\nCALSCALE:GREGORIAN\r\n")
+    for date_str, r in rows:
+        day = datetime.strptime(date_str, "%Y-%m-%d")
+        lines = ["BEGIN:VEVENT", f"UID:{r.id}@calendar-reminder-app", f"DTSTAMP:{stamp}"]
+        if r.time:
+            start = day.replace(hour=r.time.hour, minute=r.time.minute)
+            lines.append(f"DTSTART:{start:%Y%m%dT%H%M%S}")
+        else:
+            lines.append(f"DTSTART;VALUE=DATE:{day:%Y%m%d}")
+            lines.append(f"DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}")
+        lines.append("SUMMARY:" + _ics_text(r.text))
+        if r.priority:
+            lines.append(f"PRIORITY:{ICS_PRIORITIES[r.priority.value]}")
+        if r.kind == KIND_JOURNAL:
+            lines.append("CATEGORIES:Journal")
+        if r.rule:
+            lines.append("RRULE:" + r.rule.to_rrule(timed=bool(r.time)))
+            if r.rule.exceptions:
+                if r.time:
+                    skipped = (f"{d:%Y%m%d}T{r.time:%H%M%S}" for d in sorted(r.rule.exceptions))
+                    lines.append("EXDATE:" + ",".join(skipped))
+                else:
+                    skipped = (f"{d:%Y%m%d}" for d in sorted(r.rule.exceptions))
+                    lines.append("EXDATE;VALUE=DATE:" + ",".join(skipped))
+        lines.append("END:VEVENT")
+        yield "".join(_ics_fold(line) for line in lines)
+    yield "END:VCALENDAR\r\n"
+
+_WRITERS = {CSV: _csv_rows, JSONL: _jsonl_rows, ICS: _ics_rows}
+
+# ── Streams ─────────────────────────────────────────────
+
+def iter_text(fmt, query=None, stats=None):
+    """Yield the export as text chunks. stats, if given, is a dict whose
+    "reminders" entry counts the reminders written."""
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unknown export format: {fmt!r}")
+    rows = storage.iter_matching(query)
+    if stats is not None:
+        stats["reminders"] = 0
+        rows = _counted(rows, stats)
+    chunk = []
+    for piece in _WRITERS[fmt](rows):
+        chunk.append(piece)
+        if len(chunk) >= CHUNK_ROWS:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+def _counted(rows, stats):
+    for row in rows:
+        stats["reminders"] += 1
+        yield row
+
+def iter_bytes(fmt, query=None, compress=False, stats=None):
+    """Yield the export as UTF-8 bytes, gzip-compressed on the fly if asked."""
+    chunks = (text.encode() for text in iter_text(fmt, query, stats))
+    if not compress:
+        yield from chunks
+        return
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31: gzip container
+    for chunk in chunks:
+        out = gz.compress(chunk)
+        if out:
+            yield out
+    yield gz.flush()
+
+def export_to(path, query=None, fmt=None, compress=None):
+    """Write an export to path, replacing it atomically; the format and
+    compression default to what the file name says. Returns the number
+    of reminders written."""
+    if fmt is None or compress is None:
+        guessed_fmt, guessed_compress = format_for(path)
+        fmt = fmt or guessed_fmt
+        compress = guessed_compress if compress is None else compress
+    stats = {}
+    atomic_write_chunks(path, iter_bytes(fmt, query, compress, stats))
+    return stats["reminders"]
@@ -0,0 +1,394 @@
+"""Import reminders from iCalendar, CSV or JSON Lines files.
+
+The file is read as a stream of records (one CSV row, JSON line or
+VEVENT/VTODO at a time, through gzip if the name ends in .gz) and mapped
+to reminders in batches of BATCH_RECORDS. Large files spread the batches
+over a process pool, with at most a few batches in flight so memory stays
+bounded. Each reminder is keyed by a hash of its content, so anything
+already stored (or repeated within the file) is skipped, and everything
+new is committed with a single storage.add_reminders() call.
+
+CSV files may be the app's own exports (reminders_export.csv, old or new
+layout) or any sheet with a date column and a text/title/summary column;
+time, priority, repeat (an RRULE) and except (the dates a repeating
+reminder skips, separated by ";") columns are picked up when present.
+"""
+
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timezone
+import storage
+from exporter import CSV, ICS, JSONL, format_for
+from models import KIND_JOURNAL, KIND_REGULAR, Priority, Reminder, parse_time
+from recurrence import Recurrence
+
+# Records handed to a worker at a time.
+BATCH_RECORDS = 2000
+# Files smaller than this are parsed in this process; a pool costs more
+# to start than it saves.
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+
+# CSV column names (lowercase) understood for each field.
+CSV_COLUMNS = {
+    "date": ("date", "start date", "start", "dtstart", "day"),
+    "time": ("time", "start time"),
+    "priority": ("priority",),
+    "kind": ("kind",),
+    "text": ("text", "title", "summary", "subject", "event", "name"),
+    "repeat": ("repeat", "rrule"),
+    "except": ("except", "exdate"),
+    "reminder": ("reminder",),
+}
+
+_PRIORITY_NAMES = {p.value: p for p in Priority}
+
+def content_key(date_str, reminder):
+    """Hash of what a reminder says (not its id), for spotting duplicates."""
+    parts = [date_str, reminder.time_str, reminder.priority.value if reminder.priority else "",
+             reminder.kind, reminder.text.strip(),
+             json.dumps(reminder.rule.to_dict(), sort_keys=True) if reminder.rule else ""]
+    return hashlib.blake2b("\0".join(parts).encode(), digest_size=16).digest()
+
+# ── Field parsing ───────────────────────────────────────
+
+def _parse_date(value):
+    """Date string "YYYY-MM-DD" (also YYYY/MM/DD or YYYYMMDD) and the time
+    if one follows it, or (None, None)."""
+    value = value.strip()
+    day, _, rest = value.replace("T", " ", 1).partition(" ")
+    try:
+        if len(day) == 8 and day.isdigit():
+            d = date(int(day[:4]), int(day[4:6]), int(day[6:]))
+        else:
+            d = date.fromisoformat(day.replace("/", "-"))
+    except ValueError:
+        return None, None
+    return d.isoformat(), parse_time(rest[:5]) if rest else None
+
+def _parse_dates(value):
+    """Dates from a ";" or "," separated list; unreadable ones are skipped."""
+    days = []
+    for part in value.replace(",", ";").split(";"):
+        date_str, _ = _parse_date(part)
+        if date_str:
+            days.append(date.fromisoformat(date_str))
+    return days
+
+def _parse_priority(value):
+    value = value.strip()
+    if not value:
+        return None
+    p = _PRIORITY_NAMES.get(value.lower()) or Priority.from_label(value)
+    if p is not None:
+        return p
+    if value.isdigit():
+        return _ics_priority(int(value))
+    return None
+
+def _ics_priority(n):
+    """RFC 5545: 1-4 high, 5 medium, 6-9 low, 0 undefined."""
+    if 1 <= n <= 4:
+        return Priority.HIGH
+    if n == 5:
+        return Priority.MEDIUM
+    if 6 <= n <= 9:
+        return Priority.LOW
+    return None
+
+def _parse_rule(value, exceptions=()):
+    """(Recurrence or None, whether a rule was given but could not be kept)."""
+    if not value:
+        return None, False
+    try:
+        return Recurrence.from_rrule(value, exceptions), False
+    except (ValueError, IndexError):
+        return None, True
+
+# ── CSV ─────────────────────────────────────────────────
+
+def _csv_fields(header):
+    """{field: column index} for the columns of header we understand."""
+    names = [h.strip().lower() for h in header]
+    fields = {}
+    for field, aliases in CSV_COLUMNS.items():
+        for alias in aliases:
+            if alias in names:
+                fields[field] = names.index(alias)
+                break
+    return fields
+
+def _csv_record(fields, row):
+    def get(field):
+        i = fields.get(field)
+        return row[i] if i is not None and i < len(row) else ""
+
+    date_str, t = _parse_date(get("date"))
+    if date_str is None:
+        return None
+    text = get("text").strip()
+    if not text and get("reminder").strip():
+        # The old two-column export: the legacy display string.
+        return date_str, Reminder.parse(get("reminder").strip()), False
+    if not text:
+        return None
+    rule, dropped = _parse_rule(get("repeat").strip(), _parse_dates(get("except")))
+    kind = KIND_JOURNAL if get("kind").strip().lower() == KIND_JOURNAL else KIND_REGULAR
+    return date_str, Reminder(
+        text, time=parse_time(get("time")) or t, priority=_parse_priority(get("priority")),
+        kind=kind, rule=rule,
+    ), dropped
+
+# ── JSON Lines ──────────────────────────────────────────
+
+def _jsonl_record(_, line):
+    try:
+        d = json.loads(line)
+        date_str, _ = _parse_date(d.pop("date"))
+        d.pop("id", None)
+        return (date_str, Reminder.from_dict(d), False) if date_str else None
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+# ── iCalendar ───────────────────────────────────────────
+
+def _ics_split(line):
+    """"NAME;PARAM=x:value" -> (NAME, {PARAM: x}, value)."""
+    head, sep, value = line.partition(":")
+    if not sep:
+        return line.upper(), {}, ""
+    if ";" not in head:
+        return head.upper(), {}, value
+    if '"' in head:
+        # A quoted parameter value may hold the colon.
+        quoted = False
+        for i, ch in enumerate(line):
+            if ch == '"':
+                quoted = not quoted
+            elif ch == ":" and not quoted:
+                head, value = line[:i], line[i + 1:]
+                break
+    name, *params = head.split(";")
+    params = dict(p.partition("=")[::2] for p in params)
+    return name.upper(), {k.upper(): v.strip('"') for k, v in params.items()}, value
+
+def _ics_unescape(value):
+    if "\\" not in value:
+        return value.strip()
+    out = []
+    chars = iter(value)
+    for ch in chars:
+        if ch == "\\":
+            ch = next(chars, "")
+            ch = " " if ch in "nN" else ch
+        out.append(ch)
+    return "".join(out).strip()
+
+def _ics_datetime(value, params):
+    """(date, time or None) in local time for a DTSTART/DUE/EXDATE value."""
+    value = value.strip()
+    if len(value) == 8 or params.get("VALUE") == "DATE":
+        return date(int(value[:4]), int(value[4:6]), int(value[6:8])), None
+    dt = datetime(int(value[:4]), int(value[4:6]), int(value[6:8]),
+                  int(value[9:11]), int(value[11:13]))
+    if value.endswith("Z"):
+        dt = dt.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    elif "TZID" in params:
+        try:
+            from zoneinfo import ZoneInfo
+            dt = dt.replace(tzinfo=ZoneInfo(params["TZID"])).astimezone().replace(tzinfo=None)
+        except (ImportError, ValueError, KeyError):
+            pass  # unknown zone: keep the wall-clock time
+    return dt.date(), dt.time()
+
+def _ics_record(_, lines):
+    props = {}
+    exdates = []
+    depth = 0
+    for line in lines[1:-1]:
+        name, params, value = _ics_split(line)
+        if name in ("BEGIN", "END"):
+            depth += 1 if name == "BEGIN" else -1
+            continue
+        if depth:
+            continue  # a nested VALARM's properties
+        if name == "EXDATE":
+            for v in value.split(","):
+                try:
+                    exdates.append(_ics_datetime(v, params)[0])
+                except (ValueError, IndexError):
+                    pass
+        elif name not in props:
+            props[name] = (params, value)
+    start = props.get("DTSTART") or props.get("DUE")
+    if start is None or "SUMMARY" not in props:
+        return None
+    try:
+        day, t = _ics_datetime(start[1], start[0])
+    except (ValueError, IndexError):
+        return None
+    text = _ics_unescape(props["SUMMARY"][1])
+    if not text:
+        return None
+    priority = None
+    if "PRIORITY" in props and props["PRIORITY"][1].strip().isdigit():
+        priority = _ics_priority(int(props["PRIORITY"][1]))
+    categories = _ics_unescape(props.get("CATEGORIES", ({}, ""))[1]).lower().split(",")
+    kind = KIND_JOURNAL if "journal" in categories else KIND_REGULAR
+    rule, dropped = _parse_rule(props.get("RRULE", ({}, ""))[1], exdates)
+    r = Reminder(text, time=parse_time(f"{t:%H:%M}") if t else None,
+                 priority=priority, kind=kind, rule=rule)
+    return day.isoformat(), r, dropped
+
+def _unfold(text):
+    """Yield content lines with folded continuations joined back on."""
+    line = None
+    for raw in text:
+        raw = raw.rstrip("\r\n")
+        if raw[:1] in (" ", "\t") and line is not None:
+            line += raw[1:]
+            continue
+        if line is not None:
+            yield line
+        line = raw
+    if line is not None:
+        yield line
+
+def _ics_components(text):
+    """Yield the lines of each VEVENT/VTODO, BEGIN to END."""
+    component = None
+    depth = 0
+    for line in _unfold(text):
+        upper = line.upper()
+        if component is None:
+            if upper in ("BEGIN:VEVENT", "BEGIN:VTODO"):
+                component = [line]
+                depth = 1
+            continue
+        component.append(line)
+        if upper.startswith("BEGIN:"):
+            depth += 1
+        elif upper.startswith("END:"):
+            depth -= 1
+            if depth == 0:
+                yield component
+                component = None
+
+# ── Pipeline ────────────────────────────────────────────
+
+_PARSERS = {CSV: _csv_record, JSONL: _jsonl_record, ICS: _ics_record}
+
+def _records(fmt, text):
+    """(context, iterator of raw records) for a text stream."""
+    if fmt == CSV:
+        reader = csv.reader(text)
+        header = next(reader, [])
+        fields = _csv_fields(header)
+        if "date" not in fields or not {"text", "reminder"} & set(fields):
+            raise ValueError("CSV needs a Date column and a Text, Title or Summary column")
+        return fields, reader
+    if fmt == JSONL:
+        return None, (line for line in text if line.strip())
+    return None, _ics_components(text)
+
+def _batches(records, size):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _parse_batch(fmt, context, batch):
+    """Map raw records to (date, Reminder, key) triples; runs in workers.
+    Returns (triples, records skipped, repeat rules dropped)."""
+    parse = _PARSERS[fmt]
+    out = []
+    skipped = dropped = 0
+    for record in batch:
+        try:
+            parsed = parse(context, record)
+        except (ValueError, IndexError):
+            parsed = None
+        if parsed is None:
+            skipped += 1
+            continue
+        date_str, r, rule_dropped = parsed
+        dropped += rule_dropped
+        out.append((date_str, r, content_key(date_str, r)))
+    return out, skipped, dropped
+
+def _parsed_batches(fmt, context, batches, workers):
+    if workers <= 1:
+        for batch in batches:
+            yield _parse_batch(fmt, context, batch)
+        return
+    with ProcessPoolExecutor(workers) as pool:
+        in_flight = deque()
+        for batch in batches:
+            in_flight.append(pool.submit(_parse_batch, fmt, context, batch))
+            if len(in_flight) >= workers * 2:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+def import_stream(stream, fmt, workers=1, dry_run=False):
+    """Import from a binary file object in format fmt (csv, jsonl or ics).
+
+    Returns a report dict: read, added, duplicates, skipped (records that
+    could not be read), rules_dropped (repeat rules kept as one-offs
+    because a Recurrence can't express them), seconds, per_second and
+    workers. With dry_run nothing is written.
+    """
+    started = time.perf_counter()
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    context, records = _records(fmt, text)
+    seen = {content_key(d, r) for d, items in storage.iter_reminders() for r in items}
+    new = []
+    report = {"read": 0, "added": 0, "duplicates": 0, "skipped": 0, "rules_dropped": 0}
+    for parsed, skipped, dropped in _parsed_batches(
+            fmt, context, _batches(records, BATCH_RECORDS), workers):
+        report["read"] += len(parsed) + skipped
+        report["skipped"] += skipped
+        report["rules_dropped"] += dropped
+        for date_str, r, key in parsed:
+            if key in seen:
+                report["duplicates"] += 1
+                continue
+            seen.add(key)
+            new.append((date_str, r))
+    if not dry_run and new:
+        storage.add_reminders(new)
+    report["added"] = len(new)
+    report["seconds"] = time.perf_counter() - started
+    report["per_second"] = report["read"] / report["seconds"] if report["seconds"] else 0
+    report["workers"] = workers
+    return report
+
+def import_file(path, workers=None, dry_run=False):
+    """Import a .ics, .csv or .jsonl file (optionally .gz); the format comes
+    from the name. workers defaults to one per CPU for large files and 1
+    (no pool) below PARALLEL_MIN_BYTES. Returns import_stream()'s report."""
+    fmt, compressed = format_for(path)
+    if workers is None:
+        large = os.path.getsize(path) >= PARALLEL_MIN_BYTES
+        workers = (os.cpu_count() or 1) if large else 1
+    with (gzip.open if compressed else open)(path, "rb") as f:
+        return import_stream(f, fmt, workers, dry_run)
+
+def summary(report):
+    """One-line description of an import report."""
+    text = (f"Imported {report['added']} of {report['read']} reminder(s) "
+            f"({report['duplicates']} duplicate(s), {report['skipped']} unreadable) "
+            f"in {report['seconds']:.2f}s, {report['per_second']:,.0f} records/s")
+    if report["rules_dropped"]:
+        text += f"; {report['rules_dropped']} repeat rule(s) kept as one-off"
+    return text
@@ -0,0 +1,914 @@
+"""JSON-file storage backend: reminders.json + operation log, plus the
+moods, mood notes and birthdays JSON files."""
+
+import atexit
+import bisect
+import hashlib
+import json
+import os
+import threading
+from atomic_writer import FileLock, atomic_write, committer, fsync_dir, write_temp
+from models import Reminder, legacy_id
+from rollups import Rollups
+
+FILE = "reminders.json"
+OPLOG_FILE = "reminders.oplog"
+ROLLUP_FILE = "reminders.stats.json"
+MOOD_NOTES_FILE = "mood_notes.json"
+MOOD_FILE = "moods.json"
+BIRTHDAY_FILE = "birthdays.json"
+
+# Fold the operation log back into a fresh snapshot after this many appends.
+COMPACT_EVERY = 500
+
+# Process-wide cache of parsed JSON files, keyed by path. Each entry holds
+# the file signature it was parsed from, so a changed mtime/size/inode
+# (e.g. the Streamlit app or another process saving) triggers a re-read.
+_cache = {}
+_cache_lock = threading.RLock()
+_cache_stats = {"hits": 0, "misses": 0}
+
+# Several processes (the desktop app, Streamlit, the CLI) may write the same
+# files. Edits are made optimistically in memory; at commit time, under an
+# advisory lock on the file, the version on disk is compared with the one
+# the edits were based on. If another process committed in between, its
+# changes are merged in first: "merges" counts those commits, "conflicts"
+# the records both sides changed (the later commit wins).
+_commit_stats = {"merges": 0, "conflicts": 0}
+_file_locks = {}
+
+# Reminders are stored as a snapshot (reminders.json) plus an append-only
+# log of add/delete/update operations. The log's first line names the hash
+# of the snapshot it applies to, so a log that was already folded into a
+# newer snapshot is recognised as stale and ignored on replay. (base, size)
+# is the log's version: it only grows until the next snapshot replaces it.
+# "merged" is set when another process's changes reached the cache.
+_oplog = {"base": None, "ops": 0, "size": 0, "fresh": False, "merged": False}
+
+# id -> date of every cached reminder, so delete/update/move by id only
+# touch the one day that holds the reminder.
+_ids = {}
+
+# Ops already applied in memory but not yet appended to the log; the group
+# committer writes them out together with a single fsync.
+_op_buffer = []
+# "from" is the log version a running compaction's snapshot covers.
+_compaction = {"thread": None, "from": None}
+
+# Repeating reminders, as (anchor date, Reminder). Rebuilt lazily when the
+# cached reminders have changed since it was last built.
+_series = {"version": 0, "built": None, "items": []}
+# Sorted stored dates, for range lookups; rebuilt when the version moves.
+_dates = {"built": None, "items": []}
+
+# Per-day/month counts, updated by _apply_op alongside _ids. They are saved
+# to ROLLUP_FILE only when a snapshot is written (save or compaction),
+# tagged with the snapshot hash and number of log ops they cover; a load
+# replays the ops after those on top, so an append stays one log line.
+_rollups = Rollups()
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+def _file_lock(path):
+    with _cache_lock:
+        lock = _file_locks.get(path)
+        if lock is None:
+            lock = _file_locks[path] = FileLock(path)
+        return lock
+
+# Moods, mood notes and birthdays are small {key: value} files rewritten
+# whole. Edits not yet committed are kept per file as {key: value}, with
+# _DELETED for a removal, and applied to whatever is on disk at commit
+# time. _bases holds (content hash, contents) of each file as last read
+# or written, so a commit can tell which keys another process changed.
+_DELETED = object()
+_edits = {}
+_bases = {}
+
+# Changes made in this process per file (FILE for reminders), so
+# signature() moves as soon as an edit is made, before it is written.
+_versions = {}
+
+def _read_json(path):
+    """(raw bytes or None if missing, parsed dict) of a JSON file."""
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return None, {}
+    return raw, json.loads(raw) if raw.strip() else {}
+
+def _apply_edits(data, edits):
+    for key, value in edits.items():
+        if value is _DELETED:
+            data.pop(key, None)
+        else:
+            data[key] = value
+
+def _load_cached(path):
+    """Return the parsed contents of a JSON file, re-reading only on change.
+
+    Our uncommitted edits are re-applied to a fresh read, so a write by
+    another process doesn't hide them.
+    """
+    with _cache_lock:
+        sig = _file_signature(path)
+        entry = _cache.get(path)
+        if entry is not None and entry[0] == sig:
+            _cache_stats["hits"] += 1
+            return entry[1]
+        _cache_stats["misses"] += 1
+        raw, data = _read_json(path)
+        _bases[path] = (_content_hash(raw), dict(data))
+        _apply_edits(data, _edits.get(path, {}))
+        _cache[path] = (sig, data)
+        return data
+
+def _store_edit(path, key, value):
+    """Set key (or delete it, with _DELETED) in the cached copy of path now
+    and commit the edit shortly after.
+
+    Repeated edits of the same file within the commit window are coalesced
+    into one atomic write.
+    """
+    with _cache_lock:
+        _apply_edits(_load_cached(path), {key: value})
+        _edits.setdefault(path, {})[key] = value
+        _versions[path] = _versions.get(path, 0) + 1
+    committer.submit(path, lambda: _commit_edits(path))
+
+def _commit_edits(path):
+    """Write our pending edits of path on top of its current contents."""
+    with _cache_lock, _file_lock(path):
+        edits = _edits.get(path)
+        if not edits:
+            return
+        raw, data = _read_json(path)
+        version, base = _bases.get(path, (None, {}))
+        if _content_hash(raw) != version:
+            _commit_stats["merges"] += 1
+            for key, value in edits.items():
+                theirs = data.get(key, _DELETED)
+                if theirs != base.get(key, _DELETED) and theirs != value:
+                    _commit_stats["conflicts"] += 1
+        _apply_edits(data, edits)
+        raw = json.dumps(data, indent=2).encode()
+        atomic_write(path, raw)
+        del _edits[path]
+        _bases[path] = (_content_hash(raw), dict(data))
+        _cache[path] = (_file_signature(path), data)
+
+def flush():
+    """Write out everything still waiting in the commit window."""
+    committer.flush()
+
+def invalidate(path=None):
+    """Drop cached data for one file, or for every file if path is None."""
+    with _cache_lock:
+        if path is None:
+            _cache.clear()
+        else:
+            _cache.pop(path, None)
+
+def _topic_files(topic):
+    """The files holding one storage topic, or every file for None."""
+    files = {
+        "reminders": (FILE, OPLOG_FILE),
+        "notes": (MOOD_NOTES_FILE,),
+        "moods": (MOOD_FILE,),
+        "birthdays": (BIRTHDAY_FILE,),
+    }
+    if topic is None:
+        return [path for paths in files.values() for path in paths]
+    return files[topic]
+
+def _pending(path):
+    """True while this process has changes to path not yet written."""
+    if path in (FILE, OPLOG_FILE):
+        return bool(_op_buffer)
+    return bool(_edits.get(path))
+
+def signature(topic=None):
+    """Changes whenever the files of topic (or of any store) change on
+    disk, or this process edits them.
+
+    Nothing is flushed: while edits wait for the group committer, this
+    process's edit counter stands in for them. Once everything is
+    written, processes looking at the same files agree on it.
+    """
+    sigs = []
+    for path in _topic_files(topic):
+        # Pending first: a commit clears it only after writing the file.
+        version = _versions.get(FILE if path == OPLOG_FILE else path, 0) if _pending(path) else 0
+        sigs.append((_file_signature(path), version))
+    return repr(sigs)
+
+def get_stats():
+    """Return cache hit/miss and commit merge/conflict counters for monitoring."""
+    with _cache_lock:
+        total = _cache_stats["hits"] + _cache_stats["misses"]
+        return {
+            "backend": "json",
+            "hits": _cache_stats["hits"],
+            "misses": _cache_stats["misses"],
+            "hit_rate": _cache_stats["hits"] / total if total else 0.0,
+            "files": len(_cache),
+            "oplog_ops": _oplog["ops"],
+            "commits": committer.stats(),
+            "merges": _commit_stats["merges"],
+            "conflicts": _commit_stats["conflicts"],
+            "lock_waits": sum(lock.waits for lock in _file_locks.values()),
+        }
+
+# ── Reminders: snapshot + operation log ─────────────────
+
+def _reminders_signature():
+    return (_file_signature(FILE), _file_signature(OPLOG_FILE))
+
+def _snapshot_hash(raw):
+    return hashlib.blake2b(raw, digest_size=8).hexdigest()
+
+def _content_hash(raw):
+    return _snapshot_hash(raw) if raw is not None else None
+
+def _position(items, reminder_id):
+    for i, r in enumerate(items):
+        if r.id == reminder_id:
+            return i
+    return None
+
+class _NoRollups:
+    """Stands in for Rollups when replaying ops already counted."""
+    def add(self, date_str, reminder):
+        pass
+
+    def remove(self, date_str, reminder):
+        pass
+
+_NO_ROLLUPS = _NoRollups()
+
+def _apply_op(data, ids, rollups, op, seq=0):
+    """Apply one log entry to data, keeping the id -> date index and the
+    rollups (if given) in step."""
+    if rollups is None:
+        rollups = _NO_ROLLUPS
+    kind = op.get("op")
+    if kind == "add" and "reminder" in op:
+        r = Reminder.from_dict(op["reminder"])
+        data.setdefault(op["date"], []).append(r)
+        ids[r.id] = op["date"]
+        rollups.add(op["date"], r)
+    elif kind == "delete" and "ids" in op:
+        for reminder_id in op["ids"]:
+            _apply_op(data, ids, rollups, {"op": "delete", "id": reminder_id})
+    elif kind in ("delete", "update", "move") and ("id" in op or "reminder" in op):
+        reminder_id = op["id"] if "id" in op else op["reminder"]["id"]
+        date_str = ids.get(reminder_id)
+        if date_str is None:
+            return
+        items = data[date_str]
+        i = _position(items, reminder_id)
+        if kind == "update":
+            rollups.remove(date_str, items[i])
+            items[i] = Reminder.from_dict(op["reminder"])
+            rollups.add(date_str, items[i])
+            return
+        r = items.pop(i)
+        rollups.remove(date_str, r)
+        if not items:
+            del data[date_str]
+        if kind == "move":
+            data.setdefault(op["to"], []).append(r)
+            ids[reminder_id] = op["to"]
+            rollups.add(op["to"], r)
+        else:
+            del ids[reminder_id]
+    elif kind == "clear":
+        items = data.pop(op["date"], [])
+        if "ids" in op:
+            # Only the reminders the day held when it was cleared: one
+            # added meanwhile by another process stays.
+            cleared = set(op["ids"])
+            kept = [r for r in items if r.id not in cleared]
+            items = [r for r in items if r.id in cleared]
+            if kept:
+                data[op["date"]] = kept
+        for r in items:
+            ids.pop(r.id, None)
+            rollups.remove(op["date"], r)
+    else:
+        _apply_legacy_op(data, ids, rollups, op, seq)
+
+def _op_ids(op):
+    """Ids of the existing reminders an op changes (none for an add)."""
+    kind = op.get("op")
+    if kind == "update" and "reminder" in op:
+        return {op["reminder"]["id"]}
+    if kind in ("delete", "move") and "id" in op:
+        return {op["id"]}
+    if kind in ("clear", "delete"):
+        return set(op.get("ids", ()))
+    return set()
+
+def _apply_legacy_op(data, ids, rollups, op, seq):
+    """Ops logged before reminders became records carry display strings."""
+    kind = op.get("op")
+    date_str = op.get("date")
+    items = data.get(date_str, [])
+    if kind == "add":
+        r = Reminder.parse(op["text"], id=legacy_id(date_str, "log", seq, op["text"]))
+        data.setdefault(date_str, []).append(r)
+        ids[r.id] = date_str
+        rollups.add(date_str, r)
+    elif kind == "delete":
+        for r in items:
+            if r.display() == op["text"]:
+                ids.pop(r.id, None)
+                rollups.remove(date_str, r)
+        items = [r for r in items if r.display() != op["text"]]
+        if items:
+            data[date_str] = items
+        else:
+            data.pop(date_str, None)
+    elif kind == "update":
+        for i, r in enumerate(items):
+            if r.display() == op["old"]:
+                items[i] = Reminder.parse(op["new"], id=r.id)
+                rollups.remove(date_str, r)
+                rollups.add(date_str, items[i])
+                break
+
+def _encode(data):
+    """Serialise {date: [Reminder]} as the native JSON snapshot."""
+    native = {d: [r.to_dict() for r in items] for d, items in data.items()}
+    return json.dumps(native, indent=2).encode()
+
+def _decode(raw):
+    data = {}
+    for date_str, items in json.loads(raw).items():
+        data[date_str] = [
+            Reminder.load(entry, id=legacy_id(date_str, i, entry))
+            for i, entry in enumerate(items)
+        ]
+    return data
+
+def _replay_log(path, data, ids, base, rollups=None, rollups_from=0):
+    """Apply the ops in path to data if its header matches base.
+
+    Ops before rollups_from are already counted in rollups and are only
+    applied to data. Returns (ops applied, log length read), or None if
+    the log is missing or belongs to another snapshot. A torn last line
+    (crash mid-append) is cut off so later appends start on a clean line.
+    """
+    try:
+        f = open(path, "rb+")
+    except FileNotFoundError:
+        return None
+    with f:
+        try:
+            header = json.loads(f.readline())
+        except ValueError:
+            return None
+        if header.get("base") != base:
+            return None
+        ops = 0
+        good_end = f.tell()
+        for line in iter(f.readline, b""):
+            if not line.endswith(b"\n"):
+                break
+            try:
+                op = json.loads(line)
+            except ValueError:
+                break
+            _apply_op(data, ids, rollups if ops >= rollups_from else None, op, seq=ops)
+            ops += 1
+            good_end = f.tell()
+        if good_end != f.seek(0, os.SEEK_END):
+            # Another process may be appending right now: only cut the
+            # line if it is still torn once we hold the lock.
+            with _file_lock(FILE):
+                f.seek(good_end)
+                if not f.read().endswith(b"\n"):
+                    f.truncate(good_end)
+    return ops, good_end
+
+def _load_saved_rollups(base):
+    """Return (Rollups, ops covered) from ROLLUP_FILE if it matches base."""
+    try:
+        with open(ROLLUP_FILE, "r") as f:
+            saved = json.load(f)
+        if saved.get("base") != base:
+            return None
+        return Rollups.from_dict(saved["days"]), saved["ops"]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+def _save_rollups():
+    """Queue a write of the current rollups, tagged with what they cover."""
+    def write():
+        with _cache_lock, _file_lock(FILE):
+            _flush_ops()
+            if _log_version() != (_oplog["base"], _oplog["size"]):
+                return  # another process is ahead of us; it saves its own
+            raw = json.dumps({
+                "base": _oplog["base"],
+                "ops": _oplog["ops"],
+                "days": _rollups.to_dict(),
+            }).encode()
+        atomic_write(ROLLUP_FILE, raw)
+
+    committer.submit(ROLLUP_FILE, write)
+
+def _read_reminders():
+    global _ids, _rollups
+    try:
+        with open(FILE, "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        raw = None
+    data = _decode(raw) if raw and raw.strip() else {}
+    base = _snapshot_hash(raw) if raw is not None else None
+    ids = {r.id: d for d, items in data.items() for r in items}
+
+    saved = _load_saved_rollups(base)
+    if saved is not None:
+        rollups, counted = saved
+    else:
+        rollups, counted = Rollups.build(data), 0
+    replayed = _replay_log(OPLOG_FILE, data, ids, base, rollups, counted)
+    if replayed is None:
+        # A compaction may have been interrupted after the new snapshot
+        # was renamed into place but before its log was. Under the lock,
+        # so that it isn't one still running in another process.
+        with _file_lock(FILE):
+            next_log = OPLOG_FILE + ".next"
+            replayed = _replay_log(next_log, data, ids, base, rollups, counted)
+            if replayed is not None:
+                os.replace(next_log, OPLOG_FILE)
+    ops, size = replayed or (None, 0)
+    if (ops or 0) < counted:
+        # The saved rollups are ahead of the log (crash before the log
+        # was flushed): count from scratch.
+        rollups = Rollups.build(data)
+        saved = None
+    _oplog["base"] = base
+    _oplog["ops"] = ops or 0
+    _oplog["size"] = size
+    _oplog["fresh"] = ops is not None
+    _ids = ids
+    _rollups = rollups
+    _series["version"] += 1
+    if saved is None:
+        _save_rollups()  # missing or stale file, e.g. after a crash
+    return data
+
+def _write_log(path, base, ops):
+    """Write a fresh log; returns its length."""
+    lines = [json.dumps({"base": base})]
+    lines.extend(json.dumps(op) for op in ops)
+    raw = ("\n".join(lines) + "\n").encode()
+    atomic_write(path, raw)
+    return len(raw)
+
+def _log_version():
+    """(base, size) of the log on disk, after cutting off a torn last line
+    left by a crashed append. Call with the file lock held."""
+    try:
+        f = open(OPLOG_FILE, "rb+")
+    except FileNotFoundError:
+        return None, 0
+    with f:
+        try:
+            base = json.loads(f.readline()).get("base")
+        except (ValueError, AttributeError):
+            return None, 0
+        size = f.seek(0, os.SEEK_END)
+        f.seek(size - 1)
+        if f.read(1) != b"\n":
+            f.seek(0)
+            size = 0
+            for line in iter(f.readline, b""):
+                if line.endswith(b"\n"):
+                    size = f.tell()
+            f.truncate(size)
+    return base, size
+
+def _read_ops(base, offset):
+    """(ops, end) for the complete lines of the log from offset on, or None
+    if the log on disk is no longer the one we read up to offset."""
+    try:
+        f = open(OPLOG_FILE, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        try:
+            if json.loads(f.readline()).get("base") != base:
+                return None
+        except (ValueError, AttributeError):
+            return None
+        if not f.tell() <= offset <= f.seek(0, os.SEEK_END):
+            return None
+        f.seek(offset)
+        ops = []
+        end = offset
+        for line in iter(f.readline, b""):
+            if not line.endswith(b"\n"):
+                break
+            try:
+                ops.append(json.loads(line))
+            except ValueError:
+                break
+            end = f.tell()
+    return ops, end
+
+def _apply_foreign(data, ops, end):
+    """Apply ops another process appended, up to end, to the cached data."""
+    for op in ops:
+        _apply_op(data, _ids, _rollups, op)
+    _oplog["ops"] += len(ops)
+    _oplog["size"] = end
+    _oplog["merged"] = True
+    _series["version"] += 1
+
+def load_reminders():
+    """Return all reminders. The dict is shared: don't mutate it without saving."""
+    with _cache_lock:
+        sig = _reminders_signature()
+        entry = _cache.get(FILE)
+        if entry is not None and entry[0] == sig:
+            _cache_stats["hits"] += 1
+            return entry[1]
+        _cache_stats["misses"] += 1
+        # Someone else changed the files: get our buffered ops on disk
+        # first (merging what they wrote), then catch up on the ops they
+        # appended since, or re-read everything after a new snapshot.
+        _flush_ops()
+        sig = _reminders_signature()
+        entry = _cache.get(FILE)
+        if entry is not None:
+            if entry[0] == sig:
+                return entry[1]
+            tail = _read_ops(_oplog["base"], _oplog["size"]) if entry[0][0] == sig[0] else None
+            if tail is not None:
+                _apply_foreign(entry[1], *tail)
+                _cache[FILE] = (sig, entry[1])
+                return entry[1]
+            _oplog["merged"] = True
+        data = _read_reminders()
+        if not _oplog["fresh"]:
+            # Snapshot and log didn't match; we may have read between
+            # another process's two renames, so read again under the lock.
+            with _file_lock(FILE):
+                sig = _reminders_signature()
+                data = _read_reminders()
+        _cache[FILE] = (sig, data)
+        return data
+
+def has_external_changes():
+    """True if another process changed the reminders since the last call:
+    the files on disk no longer match the cache, or its changes were
+    merged in."""
+    with _cache_lock:
+        entry = _cache.get(FILE)
+        merged, _oplog["merged"] = _oplog["merged"], False
+        return merged or (entry is not None and entry[0] != _reminders_signature())
+
+def _append_op(op):
+    """Apply one op to the cached data and queue it for the log."""
+    with _cache_lock:
+        data = load_reminders()
+        if not _oplog["fresh"]:
+            with _file_lock(FILE):
+                data = load_reminders()
+                if not _oplog["fresh"]:
+                    _oplog["size"] = _write_log(OPLOG_FILE, _oplog["base"], [])
+                    _oplog["fresh"] = True
+                    _oplog["ops"] = 0
+                    _cache[FILE] = (_reminders_signature(), data)
+        _apply_op(data, _ids, _rollups, op)
+        _series["version"] += 1
+        _versions[FILE] = _versions.get(FILE, 0) + 1
+        _op_buffer.append(op)
+        _oplog["ops"] += 1
+        committer.submit(OPLOG_FILE, _flush_ops)
+        if _oplog["ops"] >= COMPACT_EVERY:
+            compact(background=True)
+
+def _flush_ops():
+    """Append every buffered op to the log with one write and one fsync.
+
+    This is the commit point. Under the file lock, the log version on disk
+    is checked against the one the cache was built from; if another
+    process committed in between, its changes are merged in first.
+    """
+    with _cache_lock:
+        if not _op_buffer:
+            return
+        raw = "".join(json.dumps(op) + "\n" for op in _op_buffer).encode()
+        with _file_lock(FILE):
+            version = _log_version()
+            if version != (_oplog["base"], _oplog["size"]):
+                _merge_foreign()
+            with open(OPLOG_FILE, "ab") as f:
+                f.write(raw)
+                f.flush()
+                os.fsync(f.fileno())
+            _op_buffer.clear()
+            _oplog["size"] += len(raw)
+            entry = _cache.get(FILE)
+            if entry is not None:
+                _cache[FILE] = (_reminders_signature(), entry[1])
+
+def _merge_foreign():
+    """Bring the cache up to date with the log another process wrote to,
+    keeping our buffered (already applied) ops on top.
+
+    Ops they appended that touch other reminders than ours commute with
+    ours and are applied in place. Otherwise everything is re-read and our
+    ops re-applied after theirs, which is also their order in the log: the
+    later edit wins, and an edit of a reminder deleted meanwhile is
+    dropped. Call with the file lock held.
+    """
+    _commit_stats["merges"] += 1
+    _oplog["merged"] = True
+    ours = set().union(*map(_op_ids, _op_buffer))
+    added = {op["reminder"]["id"] for op in _op_buffer if op.get("op") == "add"}
+    entry = _cache.get(FILE)
+    tail = None
+    if entry is not None and entry[0] and entry[0][0] == _file_signature(FILE):
+        tail = _read_ops(_oplog["base"], _oplog["size"])
+    if tail is not None:
+        clashes = ours & set().union(*map(_op_ids, tail[0]))
+        if not clashes:
+            _apply_foreign(entry[1], *tail)
+            return
+        _commit_stats["conflicts"] += len(clashes)
+        ours = set()  # counted
+    data = _read_reminders()
+    if not _oplog["fresh"]:
+        _oplog["size"] = _write_log(OPLOG_FILE, _oplog["base"], [])
+        _oplog["fresh"] = True
+        _oplog["ops"] = 0
+    _commit_stats["conflicts"] += len(ours - added - _ids.keys())
+    for op in _op_buffer:
+        _apply_op(data, _ids, _rollups, op)
+    _oplog["ops"] += len(_op_buffer)
+    _cache[FILE] = (None, data)
+
+def compact(background=False):
+    """Fold the operation log into a fresh reminders.json snapshot.
+
+    The snapshot is serialised and written outside the lock; ops appended
+    to the log meanwhile, by us or by another process, are carried over
+    into the new log.
+    """
+    with _cache_lock:
+        if _compaction["from"] is not None:
+            return
+        _flush_ops()
+        data = load_reminders()
+        snapshot = {d: list(items) for d, items in data.items()}
+        _compaction["from"] = (_oplog["base"], _oplog["size"])
+    if background:
+        thread = threading.Thread(
+            target=_finish_compaction, args=(snapshot,), daemon=True
+        )
+        _compaction["thread"] = thread
+        thread.start()
+    else:
+        _finish_compaction(snapshot)
+
+@atexit.register
+def _wait_for_compaction():
+    thread = _compaction["thread"]
+    if thread is not None:
+        thread.join()
+
+def _finish_compaction(snapshot):
+    try:
+        raw = _encode(snapshot)
+        base = _snapshot_hash(raw)
+        tmp = write_temp(FILE, raw)
+        with _cache_lock, _file_lock(FILE):
+            _flush_ops()
+            load_reminders()
+            old_base, start = _compaction["from"]
+            if _oplog["base"] != old_base:
+                # Someone saved a newer snapshot in the meantime.
+                os.remove(tmp)
+                return
+            with open(OPLOG_FILE, "rb") as f:
+                f.seek(start)
+                tail = f.read(_oplog["size"] - start)
+            header = (json.dumps({"base": base}) + "\n").encode()
+            # Write the follow-up log first: if we crash between the two
+            # renames, _read_reminders() picks up the .next log instead.
+            next_log = OPLOG_FILE + ".next"
+            atomic_write(next_log, header + tail)
+            os.replace(tmp, FILE)
+            os.replace(next_log, OPLOG_FILE)
+            fsync_dir(FILE)
+            _oplog["base"] = base
+            _oplog["ops"] = tail.count(b"\n")
+            _oplog["size"] = len(header) + len(tail)
+            _oplog["fresh"] = True
+            _save_rollups()
+            entry = _cache.get(FILE)
+            if entry is not None:
+                _cache[FILE] = (_reminders_signature(), entry[1])
+    finally:
+        with _cache_lock:
+            _compaction["from"] = None
+
+def save_reminders(data):
+    """Replace all reminders with data ({date: [Reminder]}), writing a new snapshot."""
+    global _ids, _rollups
+    with _cache_lock, _file_lock(FILE):
+        raw = _encode(data)
+        base = _snapshot_hash(raw)
+        _op_buffer.clear()
+        size = _write_log(OPLOG_FILE + ".next", base, [])
+        atomic_write(FILE, raw)
+        os.replace(OPLOG_FILE + ".next", OPLOG_FILE)
+        _oplog["base"] = base
+        _oplog["ops"] = 0
+        _oplog["size"] = size
+        _oplog["fresh"] = True
+        _ids = {r.id: d for d, items in data.items() for r in items}
+        _rollups = Rollups.build(data)
+        _series["version"] += 1
+        _cache[FILE] = (_reminders_signature(), data)
+        _save_rollups()
+
+def add_reminder(date_str, reminder):
+    _append_op({"op": "add", "date": date_str, "reminder": reminder.to_dict()})
+
+def add_reminders(items):
+    """Add many (date, Reminder) pairs with one snapshot write instead of
+    one logged op each; returns how many were added."""
+    _wait_for_compaction()
+    with _cache_lock, _file_lock(FILE):
+        # Under the lock, so nothing another process commits between
+        # reading and writing the snapshot is lost.
+        data = {d: list(rs) for d, rs in load_reminders().items()}
+        count = 0
+        for date_str, reminder in items:
+            data.setdefault(date_str, []).append(reminder)
+            count += 1
+        if count:
+            save_reminders(data)
+        return count
+
+def find_reminder(reminder_id):
+    """Return (date, Reminder) for reminder_id, or None."""
+    with _cache_lock:
+        data = load_reminders()
+        date_str = _ids.get(reminder_id)
+        if date_str is None:
+            return None
+        items = data[date_str]
+        return date_str, items[_position(items, reminder_id)]
+
+def delete_reminder(reminder_id):
+    with _cache_lock:
+        load_reminders()
+        if reminder_id not in _ids:
+            return False
+        _append_op({"op": "delete", "id": reminder_id})
+        return True
+
+def delete_reminders(reminder_ids):
+    """Delete every listed reminder with one logged op; returns how many
+    existed."""
+    with _cache_lock:
+        load_reminders()
+        found = [i for i in dict.fromkeys(reminder_ids) if i in _ids]
+        if found:
+            _append_op({"op": "delete", "ids": found})
+        return len(found)
+
+def update_reminder(reminder):
+    with _cache_lock:
+        load_reminders()
+        if reminder.id not in _ids:
+            return False
+        _append_op({"op": "update", "reminder": reminder.to_dict()})
+        return True
+
+def move_reminder(reminder_id, new_date):
+    with _cache_lock:
+        load_reminders()
+        if reminder_id not in _ids:
+            return False
+        _append_op({"op": "move", "id": reminder_id, "to": new_date})
+        return True
+
+def clear_day(date_str, reminder_ids):
+    """Delete the listed reminders from date_str; returns the count.
+
+    Ids no longer on the day are skipped, and a reminder added since the
+    caller read the day is kept.
+    """
+    wanted = set(reminder_ids)
+    with _cache_lock:
+        ids = [r.id for r in load_reminders().get(date_str, []) if r.id in wanted]
+        if ids:
+            _append_op({"op": "clear", "date": date_str, "ids": ids})
+        return len(ids)
+
+def get_reminders(date_str):
+    data = load_reminders()
+    return list(data.get(date_str, []))
+
+def get_reminders_between(start, end=None):
+    """Yield (date, [Reminder]) for stored dates in [start, end), in order.
+
+    Days are copied one at a time, so a long range is never duplicated
+    in memory as a whole.
+    """
+    with _cache_lock:
+        data = load_reminders()
+        if _dates["built"] != _series["version"]:
+            _dates["items"] = sorted(data)
+            _dates["built"] = _series["version"]
+        days = _dates["items"]
+        i = bisect.bisect_left(days, start)
+        j = len(days) if end is None else bisect.bisect_left(days, end)
+        days = days[i:j]
+    for d in days:
+        with _cache_lock:
+            items = load_reminders().get(d)
+            items = list(items) if items else None
+        if items:
+            yield d, items
+
+def get_recurring():
+    """Return (anchor date, Reminder) for every repeating reminder."""
+    with _cache_lock:
+        data = load_reminders()
+        if _series["built"] != _series["version"]:
+            _series["items"] = [
+                (d, r) for d, items in data.items() for r in items if r.rule is not None
+            ]
+            _series["built"] = _series["version"]
+        return list(_series["items"])
+
+def get_all_dates_with_reminders():
+    data = load_reminders()
+    return list(data.keys())
+
+def count_reminders_in_month(month):
+    return get_rollups().month(month)["total"]
+
+def get_rollups():
+    """The live Rollups for the current reminders. Treat it as read-only."""
+    with _cache_lock:
+        load_reminders()
+        return _rollups
+
+def get_month_stats(month):
+    return get_rollups().month(month)
+
+def get_total_stats():
+    return dict(get_rollups().totals)
+
+def get_day_counts(month=None):
+    return get_rollups().day_counts(month)
+
+# ── Moods, mood notes, birthdays ────────────────────────
+
+def load_mood_notes():
+    return _load_cached(MOOD_NOTES_FILE)
+
+def set_mood_note(date_str, note):
+    _store_edit(MOOD_NOTES_FILE, date_str, note)
+
+def get_mood_note(date_str):
+    data = load_mood_notes()
+    return data.get(date_str, "")
+
+def load_moods():
+    return _load_cached(MOOD_FILE)
+
+def save_mood(date_str, mood_emoji, mood_label):
+    _store_edit(MOOD_FILE, date_str, {"emoji": mood_emoji, "label": mood_label})
+
+def get_mood(date_str):
+    data = load_moods()
+    return data.get(date_str, None)
+
+def load_birthdays():
+    return _load_cached(BIRTHDAY_FILE)
+
+def save_birthday(name, date_str):
+    _store_edit(BIRTHDAY_FILE, name, date_str)
+
+def delete_birthday(name):
+    with _cache_lock:
+        if name in load_birthdays():
+            _store_edit(BIRTHDAY_FILE, name, _DELETED)
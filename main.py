@@ -1,8 +1,14 @@
+import logging
+import multiprocessing
 import tkinter as tk
 from splash import SplashScreen
 from app import App
 
 def main():
+    # So the notifier's log fallback and backend warnings reach stderr.
+    logging.basicConfig(level=logging.INFO,
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
     # Show splash screen first
     splash_root = tk.Tk()
     splash = SplashScreen(splash_root)
@@ -13,4 +19,7 @@ def main():
     app.mainloop()
 
 if __name__ == "__main__":
+    # In a frozen build, worker processes (an import's process pool)
+    # start from this script too; this makes them workers, not GUIs.
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
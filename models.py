@@ -0,0 +1,186 @@
+"""Structured reminder record shared by storage, the Tk app and Streamlit.
+
+Reminders used to be stored as "HH:MM | 🟡 Medium | text" strings that every
+consumer re-parsed. A Reminder is parsed once at load time and keeps the
+time, priority, text and kind as separate slots; Reminder.parse() reads the
+legacy strings and display() renders them back unchanged. A repeating
+reminder also carries a Recurrence rule (see recurrence.py).
+"""
+
+import enum
+import hashlib
+import uuid
+from datetime import time
+from recurrence import Recurrence
+
+JOURNAL_PREFIX = "📓 Journal:"
+
+KIND_REGULAR = "regular"
+KIND_JOURNAL = "journal"
+
+class Priority(enum.Enum):
+    HIGH = "high"
+    MEDIUM = "medium"
+    LOW = "low"
+
+    @property
+    def label(self):
+        return _PRIORITY_LABELS[self]
+
+    @property
+    def color(self):
+        return _PRIORITY_COLORS[self]
+
+    @property
+    def rank(self):
+        """3 for high, 2 for medium, 1 for low."""
+        return _PRIORITY_RANKS[self]
+
+    @classmethod
+    def from_label(cls, label):
+        return _LABEL_PRIORITIES.get(label.strip())
+
+_PRIORITY_LABELS = {
+    Priority.HIGH: "🔴 High",
+    Priority.MEDIUM: "🟡 Medium",
+    Priority.LOW: "🟢 Low",
+}
+_PRIORITY_COLORS = {
+    Priority.HIGH: "#ff6b6b",
+    Priority.MEDIUM: "#ff9f43",
+    Priority.LOW: "#1dd1a1",
+}
+_PRIORITY_RANKS = {Priority.HIGH: 3, Priority.MEDIUM: 2, Priority.LOW: 1}
+_LABEL_PRIORITIES = {label: p for p, label in _PRIORITY_LABELS.items()}
+
+# There are only 1440 distinct minutes, so every Reminder shares these.
+_TIMES = {}
+
+def parse_time(value):
+    """Parse "HH:MM" into a shared datetime.time, or return None."""
+    value = value.strip()
+    cached = _TIMES.get(value)
+    if cached is not None:
+        return cached
+    if len(value) != 5 or value[2] != ":":
+        return None
+    try:
+        t = time(int(value[:2]), int(value[3:]))
+    except ValueError:
+        return None
+    _TIMES[value] = t
+    return t
+
+def new_id():
+    return uuid.uuid4().hex[:12]
+
+def legacy_id(*parts):
+    """Deterministic id for a legacy entry, so every process agrees on it."""
+    key = "\0".join(str(p) for p in parts).encode()
+    return hashlib.blake2b(key, digest_size=6).hexdigest()
+
+class Reminder:
+    __slots__ = ("id", "time", "priority", "text", "kind", "rule")
+
+    def __init__(self, text, time=None, priority=None, kind=KIND_REGULAR, id=None,
+                 rule=None):
+        self.id = id or new_id()
+        self.time = time
+        self.priority = priority
+        self.text = text
+        self.kind = kind
+        self.rule = rule
+
+    @property
+    def time_str(self):
+        return self.time.strftime("%H:%M") if self.time else ""
+
+    @property
+    def is_journal(self):
+        return self.kind == KIND_JOURNAL
+
+    @property
+    def is_recurring(self):
+        return self.rule is not None
+
+    def display(self):
+        """Render in the legacy "HH:MM | 🟡 Medium | text" form."""
+        if self.kind == KIND_JOURNAL:
+            return f"{JOURNAL_PREFIX} {self.text}"
+        parts = []
+        if self.time:
+            parts.append(self.time_str)
+        if self.priority:
+            parts.append(self.priority.label)
+        parts.append(self.text)
+        return " | ".join(parts)
+
+    def __str__(self):
+        return self.display()
+
+    def __repr__(self):
+        return f"Reminder({self.display()!r}, id={self.id!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Reminder):
+            return NotImplemented
+        return (self.id, self.time, self.priority, self.text, self.kind, self.rule) == \
+            (other.id, other.time, other.priority, other.text, other.kind, other.rule)
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def to_dict(self):
+        d = {"id": self.id, "text": self.text}
+        if self.time:
+            d["time"] = self.time_str
+        if self.priority:
+            d["priority"] = self.priority.value
+        if self.kind != KIND_REGULAR:
+            d["kind"] = self.kind
+        if self.rule:
+            d["repeat"] = self.rule.to_dict()
+        return d
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(
+            d["text"],
+            time=parse_time(d["time"]) if d.get("time") else None,
+            priority=Priority(d["priority"]) if d.get("priority") else None,
+            kind=d.get("kind", KIND_REGULAR),
+            id=d.get("id"),
+            rule=Recurrence.from_dict(d["repeat"]) if d.get("repeat") else None,
+        )
+
+    @classmethod
+    def parse(cls, value, id=None):
+        """Read a legacy reminder string without losing anything.
+
+        Strings that don't follow the "HH:MM | priority | text" layout are
+        kept verbatim as the text, so display() always gives back the input.
+        """
+        if value.startswith(JOURNAL_PREFIX + " "):
+            return cls(value[len(JOURNAL_PREFIX) + 1:], kind=KIND_JOURNAL, id=id)
+        parts = value.split(" | ")
+        t = parse_time(parts[0]) if len(parts) > 1 else None
+        if t is not None:
+            parts = parts[1:]
+        priority = Priority.from_label(parts[0]) if len(parts) > 1 else None
+        if priority is not None:
+            parts = parts[1:]
+        r = cls(" | ".join(parts), time=t, priority=priority, id=id)
+        if r.display() != value:
+            r = cls(value, id=id)
+        return r
+
+    @classmethod
+    def load(cls, entry, id=None):
+        """Build a Reminder from a stored entry: native dict or legacy string."""
+        if isinstance(entry, dict):
+            return cls.from_dict(entry)
+        return cls.parse(entry, id=id)
+
+def coerce(value):
+    """Accept a Reminder or a legacy string wherever a reminder is expected."""
+    return value if isinstance(value, Reminder) else Reminder.parse(value)
@@ -1,12 +1,8 @@
 import tkinter as tk
 from tkinter import scrolledtext
-import json
-import os
 import random
 from datetime import datetime
-from storage import save_mood_note, get_mood_note
-
-MOOD_FILE = "moods.json"
+from storage import save_mood_note, get_mood_note, save_mood, get_mood
 
 MOODS = [
     ("😄", "Happy",   "#f9ca24"),
@@ -42,23 +38,6 @@ MOOD_MESSAGES = {
                  "Love that excitement! 🚀 Go conquer the world today!"],
 }
 
-def load_moods():
-    if not os.path.exists(MOOD_FILE):
-        return {}
-    with open(MOOD_FILE, "r") as f:
-        return json.load(f)
-
-def save_mood(date_str, mood_emoji, mood_label):
-    data = load_moods()
-    data[date_str] = {"emoji": mood_emoji, "label": mood_label}
-    with open(MOOD_FILE, "w") as f:
-        json.dump(data, f, indent=2)
-
-def get_mood(date_str):
-    data = load_moods()
-    return data.get(date_str, None)
-
-
 class MoodTracker(tk.Toplevel):
     def __init__(self, parent, date_str, theme, on_save=None):
         super().__init__(parent)
@@ -1,39 +1,129 @@
+import heapq
 import threading
 import time
-import winsound
-from datetime import datetime
-from plyer import notification
-from storage import load_reminders
-
-def play_sound():
-    """Play a beep sound on Windows."""
-    try:
-        winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
-    except Exception:
-        pass
-
-def check_reminders():
-    """Background thread that checks reminders every 60 seconds."""
-    while True:
-        now = datetime.now()
-        date_key = now.strftime("%Y-%m-%d")
-        current_time = now.strftime("%H:%M")
-
-        reminders = load_reminders()
-        for reminder in reminders.get(date_key, []):
-            if reminder.startswith(current_time):
-                # Play sound
-                play_sound()
-                # Show notification
-                notification.notify(
-                    title="🔔 Reminder!",
-                    message=reminder,
-                    app_name="Calendar & Reminder App",
-                    timeout=10
-                )
-        time.sleep(60)
-
-def start_notifier():
-    """Start the background reminder checker thread."""
-    t = threading.Thread(target=check_reminders, daemon=True)
-    t.start()
\ No newline at end of file
+from datetime import date, datetime, timedelta
+import storage
+from dispatcher import Dispatcher
+
+# Reminders whose time passed less than this long ago (app was closed, the
+# machine slept, ...) still fire once when the scheduler notices them.
+CATCH_UP_WINDOW = timedelta(minutes=5)
+
+# How often to stat() the data files for changes made by another process.
+EXTERNAL_CHECK_INTERVAL = 5.0
+
+class ReminderScheduler:
+    """Fires each timed reminder at its due instant.
+
+    Upcoming reminders for today and tomorrow sit in a min-heap keyed by
+    fire time. The worker thread sleeps on a condition variable until the
+    earliest one is due; storage changes wake it early so the heap can be
+    updated. Nothing is polled except a periodic stat() for changes made
+    by other processes. on_fire(reminder, due) must not block; normally it
+    is Dispatcher.notify_reminder, which only queues the notification.
+    """
+
+    def __init__(self, on_fire, catch_up=CATCH_UP_WINDOW):
+        self.on_fire = on_fire
+        self.catch_up = catch_up
+        self._cond = threading.Condition()
+        self._heap = []
+        self._horizon = None
+        self._dirty = True
+        self._fired = set()
+        self._stopped = False
+        self._thread = None
+        self.dispatcher = None
+        self.fired_count = 0
+        self.last_lag = None
+
+    def start(self):
+        storage.subscribe(self._on_change)
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        storage.unsubscribe(self._on_change)
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def _on_change(self, event):
+        with self._cond:
+            reminder = event.get("reminder")
+            if (event["op"] == "add" and not self._dirty and reminder.time
+                    and reminder.rule is None):
+                try:
+                    self._push(date.fromisoformat(event["date"]), reminder)
+                except ValueError:
+                    pass
+            else:
+                self._dirty = True
+            self._cond.notify()
+
+    def _push(self, day, reminder):
+        due = datetime.combine(day, reminder.time)
+        if self._horizon[0] <= due < self._horizon[1]:
+            heapq.heappush(self._heap, (due, reminder.id, reminder))
+
+    def _rebuild(self, now):
+        """Load the reminders due between now - catch_up and tomorrow's end,
+        including occurrences of repeating reminders."""
+        start = now - self.catch_up
+        end = datetime.combine(now.date() + timedelta(days=2), datetime.min.time())
+        self._horizon = (start, end)
+        self._heap = []
+        for day, r in storage.occurrences(start.date(), end.date(), where=lambda r: r.time):
+            self._push(day, r)
+        self._fired = {key for key in self._fired if key[0] >= start}
+        self._dirty = False
+
+    def _take_due(self, now):
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            when, reminder_id, reminder = heapq.heappop(self._heap)
+            key = (when, reminder_id)
+            if key in self._fired or now - when > self.catch_up:
+                continue
+            self._fired.add(key)
+            due.append((when, reminder))
+        return due
+
+    def _timeout(self, now):
+        timeout = EXTERNAL_CHECK_INTERVAL
+        if self._heap:
+            timeout = min(timeout, (self._heap[0][0] - now).total_seconds())
+        timeout = min(timeout, (self._horizon[1] - now).total_seconds())
+        return max(timeout, 0)
+
+    def run(self):
+        next_external_check = time.monotonic() + EXTERNAL_CHECK_INTERVAL
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                now = datetime.now()
+                if self._dirty or now >= self._horizon[1]:
+                    self._rebuild(now)
+                due = self._take_due(now)
+            for when, reminder in due:
+                self.fired_count += 1
+                self.last_lag = (datetime.now() - when).total_seconds()
+                try:
+                    self.on_fire(reminder, when)
+                except Exception:
+                    pass
+            with self._cond:
+                if not self._dirty and not self._stopped:
+                    self._cond.wait(self._timeout(datetime.now()))
+            if time.monotonic() >= next_external_check:
+                next_external_check = time.monotonic() + EXTERNAL_CHECK_INTERVAL
+                storage.poll_changes()
+
+def start_notifier(backends=None):
+    """Start the notification workers and the reminder scheduler thread."""
+    dispatcher = Dispatcher(backends).start()
+    scheduler = ReminderScheduler(on_fire=dispatcher.notify_reminder).start()
+    scheduler.dispatcher = dispatcher
+    return scheduler
@@ -0,0 +1,179 @@
+"""Search query syntax shared by the search bar, Streamlit and the CLI.
+
+A query is free text plus any number of key:value filters:
+
+    priority:high after:2026-01-01 before:2026-03-01 time:09:00-12:00 journal:no meeting
+
+    priority:  high, medium, low or none; several as high,medium
+    after:     on or after a date (YYYY-MM-DD, YYYY-MM or YYYY)
+    before:    strictly before a date
+    on:        within a day, month or year
+    time:      HH:MM, HH:MM-HH:MM (inclusive) or none
+    journal:   yes (journal entries only) or no (leave them out)
+    repeat:    yes or no
+
+Every word of the free text must appear in the reminder: whole, at the
+start of a word, or (for 3+ letters) anywhere inside one. Unknown keys are
+treated as text.
+"""
+
+import re
+from datetime import date
+from models import KIND_JOURNAL, Priority, parse_time
+
+_WORD = re.compile(r"\w+")
+
+_YES = {"yes": True, "y": True, "true": True, "only": True,
+        "no": False, "n": False, "false": False}
+
+class QueryError(ValueError):
+    pass
+
+def tokenize(text):
+    """The set of lowercase words in text."""
+    return set(_WORD.findall(text.lower()))
+
+def term_matches(term, words):
+    """True if term is one of words, starts one, or (3+ letters) is inside one."""
+    if len(term) >= 3:
+        return any(term in w for w in words)
+    return any(w.startswith(term) for w in words)
+
+def _parse_date(value, key):
+    """Start of the period "YYYY", "YYYY-MM" or "YYYY-MM-DD", and the start
+    of the next one."""
+    try:
+        parts = [int(p) for p in value.split("-")]
+        if len(parts) == 1:
+            start, end = date(parts[0], 1, 1), date(parts[0] + 1, 1, 1)
+        elif len(parts) == 2:
+            start = date(parts[0], parts[1], 1)
+            end = date(parts[0] + parts[1] // 12, parts[1] % 12 + 1, 1)
+        elif len(parts) == 3:
+            start = date(*parts)
+            end = date.fromordinal(start.toordinal() + 1)
+        else:
+            raise ValueError
+    except ValueError:
+        raise QueryError(f"{key}: expects YYYY, YYYY-MM or YYYY-MM-DD, not {value!r}")
+    return start.isoformat(), end.isoformat()
+
+def _parse_yes(value, key):
+    if value not in _YES:
+        raise QueryError(f"{key}: expects yes or no, not {value!r}")
+    return _YES[value]
+
+class Query:
+    """A parsed query. Filters left as None match everything."""
+    __slots__ = ("terms", "priorities", "start", "end", "times", "untimed",
+                 "journal", "repeat")
+
+    def __init__(self, terms=(), priorities=None, start=None, end=None,
+                 times=None, untimed=False, journal=None, repeat=None):
+        self.terms = tuple(terms)
+        self.priorities = priorities    # set of Priority values, "none" for no priority
+        self.start = start              # inclusive date string
+        self.end = end                  # exclusive date string
+        self.times = times              # (first, last) datetime.time, inclusive
+        self.untimed = untimed          # only reminders without a time
+        self.journal = journal
+        self.repeat = repeat
+
+    @classmethod
+    def parse(cls, text):
+        q = cls()
+        words = []
+        for token in text.split():
+            key, sep, value = token.partition(":")
+            key, value = key.lower(), value.lower()
+            if not sep or not value or key not in _FILTERS:
+                words.append(token)
+                continue
+            _FILTERS[key](q, key, value)
+        q.terms = tuple(sorted(tokenize(" ".join(words))))
+        return q
+
+    @property
+    def has_filters(self):
+        return any(v is not None for v in (
+            self.priorities, self.start, self.end, self.times, self.journal, self.repeat
+        )) or self.untimed
+
+    @property
+    def is_empty(self):
+        return not self.terms and not self.has_filters
+
+    def matches(self, date_str, reminder):
+        """True if the stored reminder on date_str passes every filter."""
+        if self.start is not None and date_str < self.start:
+            return False
+        if self.end is not None and date_str >= self.end:
+            return False
+        if self.journal is not None and (reminder.kind == KIND_JOURNAL) != self.journal:
+            return False
+        if self.repeat is not None and reminder.is_recurring != self.repeat:
+            return False
+        if self.priorities is not None:
+            value = reminder.priority.value if reminder.priority else "none"
+            if value not in self.priorities:
+                return False
+        if self.untimed and reminder.time is not None:
+            return False
+        if self.times is not None:
+            if reminder.time is None or not self.times[0] <= reminder.time <= self.times[1]:
+                return False
+        if self.terms:
+            words = tokenize(reminder.text)
+            return all(term_matches(t, words) for t in self.terms)
+        return True
+
+    # ── Filter parsers ──────────────────────────────────
+
+    def _priority(self, key, value):
+        names = set(value.split(","))
+        valid = {p.value for p in Priority} | {"none"}
+        if not names <= valid:
+            raise QueryError(f"priority: expects high, medium, low or none, not {value!r}")
+        self.priorities = names
+
+    def _after(self, key, value):
+        self.start = max(self.start or "", _parse_date(value, key)[0])
+
+    def _before(self, key, value):
+        start = _parse_date(value, key)[0]
+        self.end = min(self.end, start) if self.end else start
+
+    def _on(self, key, value):
+        start, end = _parse_date(value, key)
+        self.start = max(self.start or "", start)
+        self.end = min(self.end, end) if self.end else end
+
+    def _time(self, key, value):
+        if value == "none":
+            self.untimed = True
+            return
+        first, _, last = value.partition("-")
+        first = parse_time(first)
+        last = parse_time(last) if last else first
+        if first is None or last is None:
+            raise QueryError(f"time: expects HH:MM, HH:MM-HH:MM or none, not {value!r}")
+        self.times = (first, last)
+
+    def _journal(self, key, value):
+        self.journal = _parse_yes(value, key)
+
+    def _repeat(self, key, value):
+        self.repeat = _parse_yes(value, key)
+
+_FILTERS = {
+    "priority": Query._priority,
+    "after": Query._after,
+    "before": Query._before,
+    "on": Query._on,
+    "time": Query._time,
+    "journal": Query._journal,
+    "repeat": Query._repeat,
+}
+
+def parse(text):
+    return Query.parse(text)
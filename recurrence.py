@@ -0,0 +1,222 @@
+"""Recurrence rules for repeating reminders.
+
+A repeating reminder is stored once, on the date of its first occurrence
+(the anchor), together with a Recurrence. Occurrences are never stored:
+Recurrence.occurrences() generates the dates that fall inside a requested
+window and skips straight to the window's start, so asking about next
+month costs the same for a series started yesterday or ten years ago.
+"""
+
+import calendar
+from datetime import MAXYEAR, date, timedelta
+
+DAILY = "daily"
+WEEKLY = "weekly"
+MONTHLY = "monthly"
+YEARLY = "yearly"
+
+FREQUENCIES = (DAILY, WEEKLY, MONTHLY, YEARLY)
+
+WEEKDAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+ICAL_WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+class Recurrence:
+    """Daily, weekly (on given weekdays), monthly (by day of month) or
+    yearly repetition, optionally ending at until (a date, inclusive) or
+    after count occurrences, minus the dates listed in exceptions.
+
+    As in iCalendar, skipped dates still count towards count, and a
+    monthly rule anchored on the 31st skips months without one.
+    """
+    __slots__ = ("freq", "interval", "weekdays", "until", "count", "exceptions")
+
+    def __init__(self, freq, interval=1, weekdays=(), until=None, count=None,
+                 exceptions=()):
+        if freq not in FREQUENCIES:
+            raise ValueError(f"Unknown frequency: {freq!r}")
+        if interval < 1:
+            raise ValueError("interval must be at least 1")
+        self.freq = freq
+        self.interval = interval
+        self.weekdays = tuple(sorted(set(weekdays)))
+        self.until = until
+        self.count = count
+        self.exceptions = frozenset(exceptions)
+
+    def describe(self):
+        """Short human-readable form, e.g. "every 2 weeks on Mon, Thu"."""
+        unit = {DAILY: "day", WEEKLY: "week", MONTHLY: "month", YEARLY: "year"}[self.freq]
+        text = f"every {unit}" if self.interval == 1 else f"every {self.interval} {unit}s"
+        if self.weekdays:
+            text += " on " + ", ".join(WEEKDAY_NAMES[d] for d in self.weekdays)
+        if self.until:
+            text += f" until {self.until.isoformat()}"
+        if self.count:
+            text += f", {self.count} times"
+        return text
+
+    def skipping(self, day):
+        """A copy of this rule with day added to the exceptions."""
+        return Recurrence(self.freq, self.interval, self.weekdays, self.until,
+                          self.count, self.exceptions | {day})
+
+    def occurrences(self, anchor, start=None, end=None):
+        """Yield the occurrence dates in [start, end), in order.
+
+        anchor is the date of the first occurrence. Without an end (and
+        without until/count) the generator is infinite, so consume it
+        lazily.
+        """
+        skip = 0
+        if start is not None and self.count is None and start > anchor:
+            skip = self._periods_before(anchor, start)
+        n = 0
+        for day in self._candidates(anchor, skip):
+            if self.count is not None and n >= self.count:
+                return
+            n += 1
+            if self.until is not None and day > self.until:
+                return
+            if end is not None and day >= end:
+                return
+            if (start is None or day >= start) and day not in self.exceptions:
+                yield day
+
+    def _periods_before(self, anchor, start):
+        """Number of whole periods that end before start (safe to skip)."""
+        if self.freq == DAILY:
+            periods = (start - anchor).days
+        elif self.freq == WEEKLY:
+            periods = (start - _week_start(anchor)).days // 7
+        elif self.freq == MONTHLY:
+            periods = (start.year - anchor.year) * 12 + start.month - anchor.month
+        else:
+            periods = start.year - anchor.year
+        return max(periods // self.interval, 0)
+
+    def _candidates(self, anchor, k):
+        """Every date the rule produces from period k on, ignoring limits."""
+        try:
+            if self.freq == DAILY:
+                step = timedelta(days=self.interval)
+                day = anchor + step * k
+                while True:
+                    yield day
+                    day += step
+            elif self.freq == WEEKLY:
+                weekdays = self.weekdays or (anchor.weekday(),)
+                monday = _week_start(anchor) + timedelta(weeks=self.interval * k)
+                step = timedelta(weeks=self.interval)
+                while True:
+                    for wd in weekdays:
+                        day = monday + timedelta(days=wd)
+                        if day >= anchor:
+                            yield day
+                    monday += step
+            elif self.freq == MONTHLY:
+                while True:
+                    n = anchor.month - 1 + self.interval * k
+                    year, month = anchor.year + n // 12, n % 12 + 1
+                    if year > MAXYEAR:
+                        return
+                    if anchor.day <= calendar.monthrange(year, month)[1]:
+                        yield date(year, month, anchor.day)
+                    k += 1
+            else:
+                while True:
+                    year = anchor.year + self.interval * k
+                    if year > MAXYEAR:
+                        return
+                    if anchor.month != 2 or anchor.day != 29 or calendar.isleap(year):
+                        yield date(year, anchor.month, anchor.day)
+                    k += 1
+        except OverflowError:
+            return
+
+    def to_rrule(self, timed=False):
+        """The iCalendar RRULE value, e.g. "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH".
+
+        timed must say whether the event's DTSTART has a time, since
+        UNTIL has to match it. Exceptions go in EXDATE, not here.
+        """
+        parts = [f"FREQ={self.freq.upper()}"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.weekdays:
+            parts.append("BYDAY=" + ",".join(ICAL_WEEKDAYS[d] for d in self.weekdays))
+        if self.until:
+            parts.append(f"UNTIL={self.until:%Y%m%d}" + ("T235959" if timed else ""))
+        if self.count is not None:
+            parts.append(f"COUNT={self.count}")
+        return ";".join(parts)
+
+    @classmethod
+    def from_rrule(cls, value, exceptions=()):
+        """Parse an RRULE value written by to_rrule() or another calendar.
+
+        Only the parts a Recurrence can express are accepted (FREQ,
+        INTERVAL, BYDAY with plain weekdays on weekly rules, UNTIL, COUNT);
+        anything else raises ValueError.
+        """
+        parts = {}
+        for part in value.strip().split(";"):
+            key, sep, val = part.partition("=")
+            if not sep:
+                raise ValueError(f"Bad RRULE part: {part!r}")
+            parts[key.strip().upper()] = val.strip().upper()
+        parts.pop("WKST", None)
+        freq = parts.pop("FREQ", "").lower()
+        weekdays = ()
+        if "BYDAY" in parts:
+            codes = parts.pop("BYDAY").split(",")
+            if freq != WEEKLY or not set(codes) <= set(ICAL_WEEKDAYS):
+                raise ValueError(f"Unsupported BYDAY in {value!r}")
+            weekdays = [ICAL_WEEKDAYS.index(c) for c in codes]
+        until = parts.pop("UNTIL", None)
+        if until:
+            until = date(int(until[:4]), int(until[4:6]), int(until[6:8]))
+        count = parts.pop("COUNT", None)
+        interval = int(parts.pop("INTERVAL", 1))
+        if parts:
+            raise ValueError(f"Unsupported RRULE parts: {', '.join(sorted(parts))}")
+        return cls(freq, interval=interval, weekdays=weekdays, until=until,
+                   count=int(count) if count else None, exceptions=exceptions)
+
+    def to_dict(self):
+        d = {"freq": self.freq}
+        if self.interval != 1:
+            d["interval"] = self.interval
+        if self.weekdays:
+            d["weekdays"] = list(self.weekdays)
+        if self.until:
+            d["until"] = self.until.isoformat()
+        if self.count is not None:
+            d["count"] = self.count
+        if self.exceptions:
+            d["except"] = sorted(day.isoformat() for day in self.exceptions)
+        return d
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(
+            d["freq"],
+            interval=d.get("interval", 1),
+            weekdays=d.get("weekdays", ()),
+            until=date.fromisoformat(d["until"]) if d.get("until") else None,
+            count=d.get("count"),
+            exceptions=[date.fromisoformat(day) for day in d.get("except", ())],
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, Recurrence):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        return hash((self.freq, self.interval, self.weekdays))
+
+    def __repr__(self):
+        return f"Recurrence({self.describe()!r})"
+
+def _week_start(day):
+    return day - timedelta(days=day.weekday())
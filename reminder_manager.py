@@ -1,13 +1,31 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
-from storage import get_reminders, add_reminder, delete_reminder, load_reminders
-
-PRIORITY_COLORS = {
-    "🔴 High":   "#ff6b6b",
-    "🟡 Medium": "#ff9f43",
-    "🟢 Low":    "#1dd1a1"
+from storage import (get_occurrences, add_reminder, delete_reminder_by_id,
+                     skip_occurrence, clear_day, get_month_stats)
+from datetime import time
+from models import Priority, Reminder, parse_time
+from recurrence import DAILY, MONTHLY, WEEKLY, YEARLY, Recurrence
+from virtual_list import VirtualList
+from autosave import DEFAULT_PAD, Autosaver
+
+PRIORITY_COLORS = {p.label: p.color for p in Priority}
+
+REPEAT_CHOICES = {
+    "Never": None,
+    "Daily": DAILY,
+    "Weekly": WEEKLY,
+    "Monthly": MONTHLY,
+    "Yearly": YEARLY,
 }
 
+def reminder_sort_key(r):
+    """Timed reminders first, by time; untimed ones after, in added order."""
+    return (r.time is None, r.time or time.min)
+
+def reminder_row_text(r):
+    prefix = "🔁 " if r.is_recurring else ""
+    return f"  {prefix}{r.display()}"
+
 class ReminderManager(tk.Frame):
     def __init__(self, parent):
         super().__init__(parent, bg="#2b2b2b")
@@ -45,28 +63,26 @@ class ReminderManager(tk.Frame):
         )
         self.stats_label.pack(fill="x", padx=10)
 
-        # Listbox frame
+        # Reminder list: only the visible rows are drawn, so days with
+        # hundreds of imported reminders stay fast.
         list_frame = tk.Frame(self, bg="#2b2b2b")
         list_frame.pack(padx=10, pady=5)
 
-        scrollbar = tk.Scrollbar(list_frame)
-        scrollbar.pack(side="right", fill="y")
-
-        self.listbox = tk.Listbox(
+        self.listbox = VirtualList(
             list_frame,
+            key=reminder_sort_key,
+            text=reminder_row_text,
+            color=lambda r: r.priority.color if r.priority else None,
+            item_id=lambda r: r.id,
             width=38,
             height=8,
-            yscrollcommand=scrollbar.set,
             bg="#1e1e1e",
             fg="white",
             selectbackground="#4a9eff",
-            selectforeground="white",
             font=("Helvetica", 11),
-            relief="flat",
-            borderwidth=0
+            placeholder="  No reminders for this day"
         )
         self.listbox.pack(side="left", fill="both")
-        scrollbar.config(command=self.listbox.yview)
 
         # Priority selector
         priority_frame = tk.Frame(self, bg="#2b2b2b")
@@ -119,6 +135,23 @@ class ReminderManager(tk.Frame):
         self.time_entry.insert(0, "HH:MM")
         self.time_entry.pack(side="left", padx=5)
 
+        tk.Label(
+            time_frame,
+            text="🔁",
+            bg="#2b2b2b",
+            fg="white",
+            font=("Helvetica", 10)
+        ).pack(side="left", padx=(10, 2))
+
+        self.repeat_var = tk.StringVar(value="Never")
+        ttk.Combobox(
+            time_frame,
+            textvariable=self.repeat_var,
+            values=list(REPEAT_CHOICES),
+            width=8,
+            state="readonly"
+        ).pack(side="left")
+
         # Note entry
         note_frame = tk.Frame(self, bg="#2b2b2b")
         note_frame.pack(pady=5)
@@ -182,14 +215,31 @@ class ReminderManager(tk.Frame):
             cursor="hand2"
         ).pack(side="left", padx=5)
 
-        # Quick notes panel
+        # Quick notes panel: several named pads, saved in the background
+        self.notes_saver = Autosaver()
+        self.current_pad = DEFAULT_PAD
+
+        notes_header = tk.Frame(self, bg="#2b2b2b")
+        notes_header.pack(pady=(8, 2))
+
         tk.Label(
-            self,
-            text="🗒️ Quick Notes (auto-saved)",
+            notes_header,
+            text="🗒️ Notes (auto-saved):",
             font=("Helvetica", 10, "bold"),
             bg="#2b2b2b",
             fg="#aaaaaa"
-        ).pack(pady=(8, 2))
+        ).pack(side="left", padx=5)
+
+        self.pad_var = tk.StringVar(value=DEFAULT_PAD)
+        self.pad_box = ttk.Combobox(
+            notes_header,
+            textvariable=self.pad_var,
+            values=self.notes_saver.list_pads(),
+            width=16
+        )
+        self.pad_box.pack(side="left")
+        self.pad_box.bind("<<ComboboxSelected>>", self.switch_pad)
+        self.pad_box.bind("<Return>", self.switch_pad)
 
         self.quick_notes = tk.Text(
             self,
@@ -212,31 +262,26 @@ class ReminderManager(tk.Frame):
         self.refresh_list()
         self.update_stats()
 
+    @property
+    def day_reminders(self):
+        return self.listbox.items()
+
     def refresh_list(self):
-        self.listbox.delete(0, tk.END)
         if self.selected_date:
-            reminders = get_reminders(self.selected_date)
-            if reminders:
-                for r in reminders:
-                    self.listbox.insert(tk.END, f"  {r}")
-                    # Color code by priority
-                    idx = self.listbox.size() - 1
-                    if "🔴 High" in r:
-                        self.listbox.itemconfig(idx, fg="#ff6b6b")
-                    elif "🟡 Medium" in r:
-                        self.listbox.itemconfig(idx, fg="#ff9f43")
-                    elif "🟢 Low" in r:
-                        self.listbox.itemconfig(idx, fg="#1dd1a1")
-            else:
-                self.listbox.insert(tk.END, "  No reminders for this day")
+            self.listbox.set_items(get_occurrences(self.selected_date))
+        else:
+            self.listbox.set_items([])
 
     def update_stats(self):
         if not self.selected_date:
             return
         month = self.selected_date[:7]  # YYYY-MM
-        data = load_reminders()
-        count = sum(len(v) for k, v in data.items() if k.startswith(month))
-        self.stats_label.config(text=f"📊 Total reminders this month: {count}")
+        stats = get_month_stats(month)
+        text = f"📊 Total reminders this month: {stats['total']}"
+        if stats["total"]:
+            text += f"  (🔴 {stats['high']} 🟡 {stats['medium']} 🟢 {stats['low']}"
+            text += f" 📓 {stats['journal']})"
+        self.stats_label.config(text=text)
 
     def add(self):
         if not self.selected_date:
@@ -250,28 +295,49 @@ class ReminderManager(tk.Frame):
             messagebox.showwarning("Warning", "Please enter a reminder note!")
             return
 
+        reminder_time = None
         if time_val and time_val != "HH:MM":
-            reminder_text = f"{time_val} | {priority} | {note_val}"
-        else:
-            reminder_text = f"{priority} | {note_val}"
-
-        add_reminder(self.selected_date, reminder_text)
+            reminder_time = parse_time(time_val)
+            if reminder_time is None:
+                messagebox.showwarning("Warning", "Time must be in HH:MM format!")
+                return
+
+        freq = REPEAT_CHOICES.get(self.repeat_var.get())
+        reminder = add_reminder(self.selected_date, Reminder(
+            note_val,
+            time=reminder_time,
+            priority=Priority.from_label(priority),
+            rule=Recurrence(freq) if freq else None
+        ))
         self.note_entry.delete(0, tk.END)
+        self.repeat_var.set("Never")
         self.time_entry.delete(0, tk.END)
         self.time_entry.insert(0, "HH:MM")
-        self.refresh_list()
+        self.listbox.insert(reminder)
         self.update_stats()
 
     def delete(self):
         if not self.selected_date:
             return
-        selected = self.listbox.curselection()
-        if not selected:
+        reminder = self.listbox.selected()
+        if reminder is None:
             messagebox.showwarning("Warning", "Please select a reminder to delete!")
             return
-        reminder_text = self.listbox.get(selected[0]).strip()
-        delete_reminder(self.selected_date, reminder_text)
-        self.refresh_list()
+        if reminder.is_recurring:
+            answer = messagebox.askyesnocancel(
+                "Repeating reminder",
+                f"\"{reminder.text}\" repeats {reminder.rule.describe()}.\n\n"
+                "Yes: delete every occurrence\nNo: skip only this day"
+            )
+            if answer is None:
+                return
+            if answer:
+                delete_reminder_by_id(reminder.id)
+            else:
+                skip_occurrence(reminder.id, self.selected_date)
+        else:
+            delete_reminder_by_id(reminder.id)
+        self.listbox.remove(reminder.id)
         self.update_stats()
 
     def clear_all(self):
@@ -279,21 +345,37 @@ class ReminderManager(tk.Frame):
             return
         confirm = messagebox.askyesno("Confirm", f"Delete all reminders for {self.selected_date}?")
         if confirm:
-            reminders = get_reminders(self.selected_date)
-            for r in reminders:
-                delete_reminder(self.selected_date, r)
+            # Repeating reminders only skip this day. One stored here whose
+            # first occurrence is already skipped isn't shown, so it stays.
+            for r in self.day_reminders:
+                if r.is_recurring:
+                    skip_occurrence(r.id, self.selected_date)
+            clear_day(self.selected_date, series=False)
             self.refresh_list()
             self.update_stats()
 
     def save_quick_notes(self, event=None):
+        """Hand the text to the autosaver; it is written once typing pauses."""
         notes = self.quick_notes.get("1.0", tk.END).strip()
-        with open("quick_notes.txt", "w") as f:
-            f.write(notes)
+        self.notes_saver.save(self.current_pad, notes)
 
     def load_quick_notes(self):
-        try:
-            with open("quick_notes.txt", "r") as f:
-                notes = f.read()
-            self.quick_notes.insert("1.0", notes)
-        except FileNotFoundError:
-            pass
\ No newline at end of file
+        self.quick_notes.delete("1.0", tk.END)
+        self.quick_notes.insert("1.0", self.notes_saver.load(self.current_pad))
+
+    def switch_pad(self, event=None):
+        """Open the pad named in the box, creating it if it is new."""
+        name = self.pad_var.get().strip()
+        if not name or name == self.current_pad:
+            return
+        self.save_quick_notes()
+        self.current_pad = name
+        self.load_quick_notes()
+        if name not in self.pad_box["values"]:
+            self.notes_saver.save(name, "")
+            self.pad_box["values"] = (*self.pad_box["values"], name)
+
+    def destroy(self):
+        self.save_quick_notes()
+        self.notes_saver.flush()
+        super().destroy()
\ No newline at end of file
@@ -0,0 +1,104 @@
+"""Running reminder counts per day and per month.
+
+The stats bar and the Streamlit analytics page used to count reminders by
+walking every stored date. A Rollups object is updated by one add() or
+remove() per mutation, so any total is a dictionary lookup. Counts are of
+stored reminders: a repeating reminder counts once, on its first date.
+"""
+
+from models import KIND_JOURNAL
+
+# Buckets counted for every day, month and the grand total.
+FIELDS = ("total", "journal", "regular", "high", "medium", "low", "none")
+
+def _empty():
+    return dict.fromkeys(FIELDS, 0)
+
+def buckets(reminder):
+    """The FIELDS a reminder is counted in."""
+    return (
+        "total",
+        "journal" if reminder.kind == KIND_JOURNAL else "regular",
+        reminder.priority.value if reminder.priority else "none",
+    )
+
+def tally(groups):
+    """Counts dict from (priority value or None, kind, n) groups."""
+    counts = _empty()
+    for priority, kind, n in groups:
+        counts["total"] += n
+        counts["journal" if kind == KIND_JOURNAL else "regular"] += n
+        counts[priority or "none"] += n
+    return counts
+
+class Rollups:
+    def __init__(self):
+        # "YYYY-MM" -> {"YYYY-MM-DD": counts}, so one month's days are
+        # found without looking at the others.
+        self.days = {}
+        self.months = {}
+        self.totals = _empty()
+
+    @classmethod
+    def build(cls, data):
+        """Count every reminder in {date: [Reminder]}."""
+        rollups = cls()
+        for date_str, items in data.items():
+            for r in items:
+                rollups.add(date_str, r)
+        return rollups
+
+    def _bump(self, date_str, reminder, delta):
+        key = date_str[:7]
+        month_days = self.days.setdefault(key, {})
+        day = month_days.get(date_str)
+        if day is None:
+            day = month_days[date_str] = _empty()
+        month = self.months.get(key)
+        if month is None:
+            month = self.months[key] = _empty()
+        for field in buckets(reminder):
+            day[field] += delta
+            month[field] += delta
+            self.totals[field] += delta
+        if not day["total"]:
+            del month_days[date_str]
+        if not month["total"]:
+            del self.months[key]
+            del self.days[key]
+
+    def add(self, date_str, reminder):
+        self._bump(date_str, reminder, 1)
+
+    def remove(self, date_str, reminder):
+        self._bump(date_str, reminder, -1)
+
+    def month(self, month):
+        """Counts for "YYYY-MM" (all zero if the month is empty)."""
+        return dict(self.months.get(month) or _empty())
+
+    def day(self, date_str):
+        return dict(self.days.get(date_str[:7], {}).get(date_str) or _empty())
+
+    def day_counts(self, month=None):
+        """{date: reminder count}, for one month or for every day."""
+        months = [self.days.get(month, {})] if month else self.days.values()
+        return {d: counts["total"] for days in months for d, counts in days.items()}
+
+    def to_dict(self):
+        return {d: counts for days in self.days.values() for d, counts in days.items()}
+
+    @classmethod
+    def from_dict(cls, d):
+        rollups = cls()
+        for date_str, counts in d.items():
+            key = date_str[:7]
+            day = _empty()
+            rollups.days.setdefault(key, {})[date_str] = day
+            month = rollups.months.setdefault(key, _empty())
+            for field in FIELDS:
+                n = counts.get(field, 0)
+                day[field] = n
+                month[field] += n
+                rollups.totals[field] += n
+        return rollups
@@ -0,0 +1,523 @@
+"""In-memory search over reminders, journal notes and birthdays.
+
+The search box used to load every reminder and substring-scan its text on
+each keystroke. SearchIndex keeps an inverted index instead: word ->
+documents containing it, plus trigram -> words so that partial words
+("meet" in "meeting", "ting" in "meeting") are found without scanning the
+vocabulary. It subscribes to storage and patches itself on every change;
+only a backend switch or an external edit triggers a full rebuild, which
+runs on a background thread.
+
+Queries may carry filters (see query.py). They are answered from
+secondary indexes kept alongside the words: documents by priority, by hour
+of the day, by kind and in date order, so "priority:high before:2025" is a
+few set intersections and a bisect.
+
+Hits are ranked by how well the words match (whole word, then start of a
+word, then inside a word), then by date: upcoming soonest first, then the
+most recent past.
+"""
+
+import bisect
+import itertools
+import threading
+from collections import namedtuple
+from datetime import date
+import storage
+from models import KIND_JOURNAL
+from query import Query, tokenize
+
+REMINDER = "reminder"
+NOTE = "note"
+BIRTHDAY = "birthday"
+
+EXACT, PREFIX, INFIX = range(3)
+
+MAX_RESULTS = 20
+
+# Below this many candidates per indexed document, hits are sorted
+# directly; above it they are found by walking the date order outwards
+# from today, which stops as soon as enough hits are collected.
+_SORT_RATIO = 64
+
+Hit = namedtuple("Hit", "date text kind key")
+
+def _trigrams(word):
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+def _union(sets):
+    """Union of a list of sets, without copying when there is just one.
+    The result may be one of the index's own sets: do not modify it."""
+    if len(sets) == 1:
+        return sets[0]
+    return set().union(*sets)
+
+def _minute(t):
+    return t.hour * 60 + t.minute
+
+def _intersect_tiers(tiers, other):
+    # Tiers often share a set; intersect each pair only once.
+    done = {}
+    for a, b in zip(tiers, other):
+        if (id(a), id(b)) not in done:
+            done[id(a), id(b)] = a & b
+    return [done[id(a), id(b)] for a, b in zip(tiers, other)]
+
+def _next_anniversary(date_str, today):
+    """Next occurrence (today or later) of a yearly date, as YYYY-MM-DD."""
+    try:
+        born = date.fromisoformat(date_str)
+    except ValueError:
+        return date_str
+    for year in (today.year, today.year + 1):
+        try:
+            day = born.replace(year=year)
+        except ValueError:  # 29 February
+            day = date(year, 3, 1)
+        if day >= today:
+            return day.isoformat()
+    return date_str
+
+def _next_occurrence(anchor, reminder, today):
+    start = max(today, date.fromisoformat(anchor))
+    day = next(reminder.rule.occurrences(date.fromisoformat(anchor), start), None)
+    return day.isoformat() if day else anchor
+
+_EMPTY = frozenset()
+
+# Attributes holding indexed data, swapped in as a whole after a rebuild.
+_DATA = ("_numbers", "_docs", "_postings", "_trigrams", "_vocab", "_by_date",
+         "_by_month", "_by_kind", "_by_priority", "_by_minute", "_recurring",
+         "_counter")
+
+class SearchIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+        self._ready = False
+        self._building = False
+        self._stale = False
+        self._backlog = []
+
+        storage.subscribe(self._on_reminders)
+        storage.subscribe(self._on_notes, storage.NOTES)
+        storage.subscribe(self._on_birthdays, storage.BIRTHDAYS)
+
+    def _clear(self):
+        # Documents are numbered internally: sets of small ints are much
+        # cheaper to union and intersect than sets of key tuples.
+        self._numbers = {}    # key -> number
+        self._docs = {}       # number -> (key, date, text, words, reminder or None)
+        self._postings = {}   # word -> set of numbers
+        self._trigrams = {}   # trigram -> set of words
+        self._vocab = []      # sorted words, for prefix lookups of short terms
+        self._by_date = []    # sorted (date, number)
+        self._by_month = {}   # "YYYY-MM" -> set of numbers
+        self._by_kind = {REMINDER: set(), NOTE: set(), BIRTHDAY: set()}
+        # Reminders and notes only:
+        self._by_priority = {}  # priority value or "none" -> set of numbers
+        self._by_minute = {}    # minute of the day or None -> set of numbers
+        self._recurring = set()
+        self._counter = itertools.count()
+
+    def close(self):
+        storage.unsubscribe(self._on_reminders)
+        storage.unsubscribe(self._on_notes, storage.NOTES)
+        storage.unsubscribe(self._on_birthdays, storage.BIRTHDAYS)
+
+    # ── Building ────────────────────────────────────────
+
+    def ready(self):
+        return self._ready
+
+    def warm(self):
+        """Start a full (re)build on a background thread."""
+        with self._lock:
+            if self._building:
+                self._stale = True
+                return
+            self._building = True
+            self._stale = False
+            self._backlog = []
+        threading.Thread(target=self._build, name="search-index", daemon=True).start()
+
+    def _build(self):
+        fresh = SearchIndex.__new__(SearchIndex)
+        fresh._clear()
+        today = date.today()
+        try:
+            for date_str, items in storage.iter_reminders():
+                for r in items:
+                    fresh._add_reminder(date_str, r, today, sort=False)
+            for date_str, note in storage.load_mood_notes().items():
+                fresh._add_note(date_str, note, sort=False)
+            for name, date_str in storage.load_birthdays().items():
+                fresh._add_birthday(name, date_str, today, sort=False)
+        except Exception:
+            with self._lock:
+                self._building = False
+            return
+        fresh._vocab = sorted(fresh._postings)
+        fresh._by_date = sorted((doc[1], n) for n, doc in fresh._docs.items())
+
+        with self._lock:
+            for name in _DATA:
+                setattr(self, name, getattr(fresh, name))
+            # Changes made while building may or may not be in what was
+            # just read; every patch below is idempotent, so replay them.
+            for apply, event in self._backlog:
+                apply(event)
+            self._backlog = []
+            self._building = False
+            self._ready = True
+            again = self._stale
+        if again:
+            self.warm()
+
+    # ── Documents ───────────────────────────────────────
+
+    def _add(self, key, date_str, text, reminder=None, sort=True):
+        self._remove(key, sort)
+        n = self._numbers[key] = next(self._counter)
+        words = tokenize(text)
+        self._docs[n] = (key, date_str, text, words, reminder)
+        for word in words:
+            numbers = self._postings.get(word)
+            if numbers is None:
+                numbers = self._postings[word] = set()
+                for tri in _trigrams(word):
+                    self._trigrams.setdefault(tri, set()).add(word)
+                if sort:
+                    bisect.insort(self._vocab, word)
+            numbers.add(n)
+        self._by_kind[key[0]].add(n)
+        self._by_month.setdefault(date_str[:7], set()).add(n)
+        for numbers in self._facets(key, reminder):
+            numbers.add(n)
+        if sort:
+            bisect.insort(self._by_date, (date_str, n))
+
+    def _facets(self, key, reminder):
+        """The secondary index sets a document belongs in. Notes stand in
+        for journal reminders: no priority, no time, not repeating."""
+        if reminder is None:
+            if key[0] != NOTE:
+                return ()
+            value, minute = "none", None
+        else:
+            value = reminder.priority.value if reminder.priority else "none"
+            minute = _minute(reminder.time) if reminder.time else None
+        sets = [self._by_priority.setdefault(value, set()),
+                self._by_minute.setdefault(minute, set())]
+        if reminder is not None and reminder.rule is not None:
+            sets.append(self._recurring)
+        return sets
+
+    def _remove(self, key, sort=True):
+        n = self._numbers.pop(key, None)
+        if n is None:
+            return
+        key, date_str, _, words, reminder = self._docs.pop(n)
+        self._by_kind[key[0]].discard(n)
+        month = self._by_month[date_str[:7]]
+        month.discard(n)
+        if not month:
+            del self._by_month[date_str[:7]]
+        for numbers in self._facets(key, reminder):
+            numbers.discard(n)
+        for word in words:
+            numbers = self._postings[word]
+            numbers.discard(n)
+            if not numbers:
+                del self._postings[word]
+                for tri in _trigrams(word):
+                    words_with = self._trigrams[tri]
+                    words_with.discard(word)
+                    if not words_with:
+                        del self._trigrams[tri]
+                if sort:
+                    del self._vocab[bisect.bisect_left(self._vocab, word)]
+        if sort:
+            del self._by_date[bisect.bisect_left(self._by_date, (date_str, n))]
+
+    def _add_reminder(self, date_str, reminder, today, sort=True):
+        # Journal reminders are short copies of the mood note, which is
+        # indexed in full on its own.
+        if reminder.kind == KIND_JOURNAL:
+            return
+        if reminder.rule is not None:
+            date_str = _next_occurrence(date_str, reminder, today)
+        self._add((REMINDER, reminder.id), date_str, reminder.text, reminder, sort)
+
+    def _add_note(self, date_str, note, sort=True):
+        if note:
+            self._add((NOTE, date_str), date_str, note, sort=sort)
+        else:
+            self._remove((NOTE, date_str), sort)
+
+    def _add_birthday(self, name, date_str, today, sort=True):
+        self._add((BIRTHDAY, name), _next_anniversary(date_str, today), name, sort=sort)
+
+    # ── Storage listeners ───────────────────────────────
+
+    def _patch(self, apply, event):
+        """Apply a change now, and again after a build in progress.
+
+        A reset rebuilds in the background; until it is done, queries are
+        answered from the current (slightly stale) index.
+        """
+        if event["op"] == "reset":
+            self.warm()
+            return
+        with self._lock:
+            if self._building:
+                self._backlog.append((apply, event))
+            if self._ready:
+                apply(event)
+
+    def _on_reminders(self, event):
+        self._patch(self._apply_reminders, event)
+
+    def _apply_reminders(self, event):
+        today = date.today()
+        op = event["op"]
+        for r in event.get("reminders") or [event.get("old") or event["reminder"]]:
+            self._remove((REMINDER, r.id))
+        if op in ("add", "update"):
+            self._add_reminder(event["date"], event["reminder"], today)
+        elif op == "move":
+            self._add_reminder(event["to"], event["reminder"], today)
+
+    def _on_notes(self, event):
+        self._patch(lambda e: self._add_note(e["date"], e["note"]), event)
+
+    def _on_birthdays(self, event):
+        def apply(e):
+            if e["op"] == "set":
+                self._add_birthday(e["name"], e["date"], date.today())
+            else:
+                self._remove((BIRTHDAY, e["name"]))
+        self._patch(apply, event)
+
+    # ── Queries ─────────────────────────────────────────
+
+    def _matches(self, term):
+        """Documents matching term as a whole word, as a whole word or at
+        the start of one, and anywhere in a word: three nested sets."""
+        if len(term) >= 3:
+            tris = sorted((self._trigrams.get(t, ()) for t in _trigrams(term)), key=len)
+            words = set(tris[0]).intersection(*tris[1:]) if tris[0] else ()
+            words = [w for w in words if term in w]
+        else:
+            i = bisect.bisect_left(self._vocab, term)
+            j = bisect.bisect_left(self._vocab, term + "\U0010ffff")
+            words = self._vocab[i:j]
+        groups = ([], [], [])
+        for w in words:
+            tier = EXACT if w == term else PREFIX if w.startswith(term) else INFIX
+            groups[tier].append(self._postings[w])
+        tiers = []
+        so_far = frozenset()
+        for sets in groups:
+            if sets:
+                so_far = so_far.union(*sets) if so_far else _union(sets)
+            tiers.append(so_far)
+        return tiers
+
+    def search(self, query, limit=MAX_RESULTS):
+        """(number of matching documents, best `limit` Hits).
+
+        query is a query string (see query.py) or a Query. Every word must
+        match and every filter must pass. Returns (0, []) for an empty
+        query and None while the index is still being built.
+        """
+        if isinstance(query, str):
+            query = Query.parse(query)
+        if query.is_empty:
+            return 0, []
+        with self._lock:
+            if not self._ready:
+                return None
+            allowed = self._filter(query)
+            if query.terms:
+                tiers = self._word_tiers(query.terms)
+                if allowed is not None:
+                    tiers = _intersect_tiers(tiers, [allowed] * 3)
+            else:
+                tiers = [allowed] * 3
+            if query.start is not None or query.end is not None:
+                tiers = self._in_dates(tiers, query.start, query.end)
+            if tiers[INFIX] is None:
+                # Only dates were given: everything in the range matches.
+                total = self._count_between(query.start, query.end)
+            else:
+                total = len(tiers[INFIX])
+            if not total:
+                return 0, []
+            ranked = self._rank(tiers, limit, query.start, query.end)
+            return total, [self._hit(n) for n in ranked]
+
+    def _word_tiers(self, terms):
+        matches = sorted((self._matches(t) for t in terms), key=lambda m: len(m[INFIX]))
+        # A document's tier is the worst of its terms' tiers.
+        tiers = matches[0]
+        for other in matches[1:]:
+            if not tiers[INFIX]:
+                break
+            tiers = _intersect_tiers(tiers, other)
+        return tiers
+
+    def _filter(self, query):
+        """The documents passing query's filters other than dates, or None
+        if it has none."""
+        sets = []
+        if query.priorities is not None:
+            sets.append(_union([self._by_priority.get(p, _EMPTY) for p in query.priorities]))
+        if query.untimed:
+            sets.append(self._by_minute.get(None, _EMPTY))
+        if query.times is not None:
+            sets.append(self._in_times(*query.times))
+        if query.repeat is True:
+            sets.append(self._recurring)
+        elif query.repeat is False:
+            once = self._of_kinds(REMINDER, NOTE)
+            sets.append(once - self._recurring if self._recurring else once)
+        if query.journal is True:
+            sets.append(self._by_kind[NOTE])
+        if query.journal is False:
+            if not sets:
+                return self._of_kinds(REMINDER, BIRTHDAY)
+            sets.sort(key=len)
+            return sets[0].intersection(*sets[1:]) - self._by_kind[NOTE]
+        if not sets:
+            return None
+        sets.sort(key=len)
+        return sets[0].intersection(*sets[1:]) if len(sets) > 1 else sets[0]
+
+    def _of_kinds(self, *kinds):
+        return _union([self._by_kind[k] for k in kinds if self._by_kind[k]] or [_EMPTY])
+
+    def _in_dates(self, tiers, start, end):
+        """Restrict tiers to dates in [start, end). None stays None
+        ("everything in the range"), to be walked rather than built.
+
+        Sets much smaller than the range are filtered by looking at each
+        document's date; bigger ones are intersected month by month with
+        the month buckets, so only the smaller side is ever iterated.
+        """
+        size = self._count_between(start, end)
+        done = {None: None}
+        for numbers in tiers:
+            if id(numbers) in done or numbers is None:
+                continue
+            if len(numbers) * _SORT_RATIO < size:
+                done[id(numbers)] = self._dated(numbers, start, end)
+            else:
+                whole, edges = self._months_between(start, end)
+                inside = set().union(*(month & numbers for month in whole))
+                for month in edges:
+                    inside |= self._dated(month & numbers, start, end)
+                done[id(numbers)] = inside
+        return [None if numbers is None else done[id(numbers)] for numbers in tiers]
+
+    def _count_between(self, start, end):
+        by_date = self._by_date
+        i = bisect.bisect_left(by_date, (start,)) if start else 0
+        j = bisect.bisect_left(by_date, (end,)) if end else len(by_date)
+        return j - i
+
+    def _dated(self, numbers, start, end):
+        docs = self._docs
+        return {
+            n for n in numbers
+            if (not start or docs[n][1] >= start) and (not end or docs[n][1] < end)
+        }
+
+    def _months_between(self, start, end):
+        """Month buckets wholly inside [start, end), and the ones it only
+        partly covers."""
+        first, last = (start or "")[:7], (end or "9999-99")[:7]
+        first_whole = not start or start.endswith("-01")
+        last_empty = end is not None and end.endswith("-01")
+        whole, edges = [], []
+        for month, numbers in self._by_month.items():
+            if first < month < last or (month == first and first_whole and month != last):
+                whole.append(numbers)
+            elif month == first or (month == last and not last_empty):
+                edges.append(numbers)
+        return whole, edges
+
+    def _in_times(self, first, last):
+        """Reminders with a time in [first, last], from the minute buckets."""
+        return set().union(*(
+            self._by_minute.get(m, _EMPTY) for m in range(_minute(first), _minute(last) + 1)
+        ))
+
+    def _rank(self, tiers, limit, start=None, end=None):
+        """Numbers of the best `limit` documents; tiers are nested sets,
+        all dated within [start, end)."""
+        today = date.today().isoformat()
+        i = bisect.bisect_left(self._by_date, (start,)) if start else 0
+        j = bisect.bisect_left(self._by_date, (end,)) if end else len(self._by_date)
+        ranked = []
+        better = frozenset()
+        for numbers in tiers:
+            want = limit - len(ranked)
+            if want <= 0:
+                break
+            if numbers is better:
+                continue
+            if numbers is not None and len(numbers) * _SORT_RATIO < j - i:
+                dated = [(self._docs[n][1], n) for n in numbers - better]
+                upcoming = sorted(d for d in dated if d[0] >= today)[:want]
+                past = sorted((d for d in dated if d[0] < today), reverse=True)
+                ranked.extend(n for _, n in (upcoming + past)[:want])
+            else:
+                ranked.extend(self._walk(today, numbers, better, want, i, j))
+            better = numbers
+        return ranked
+
+    def _walk(self, today, numbers, exclude, want, lo, hi):
+        """Up to `want` of numbers (None: any) - exclude, upcoming then
+        past, looking only at positions lo to hi of the date order."""
+        by_date = self._by_date
+        pivot = min(max(bisect.bisect_left(by_date, (today,)), lo), hi)
+        found = []
+        for k in itertools.chain(range(pivot, hi), range(pivot - 1, lo - 1, -1)):
+            n = by_date[k][1]
+            if (numbers is None or n in numbers) and n not in exclude:
+                found.append(n)
+                if len(found) == want:
+                    break
+        return found
+
+    def _hit(self, n):
+        key, date_str, text, _, reminder = self._docs[n]
+        kind = key[0]
+        if kind == REMINDER:
+            text = reminder.display()
+            if reminder.rule is not None:
+                text = "🔁 " + text
+        elif kind == NOTE:
+            text = "📓 " + (text[:60] + "..." if len(text) > 60 else text)
+        else:
+            text = f"🎂 {text}'s birthday"
+        return Hit(date_str, text, kind, key)
+
+    def stats(self):
+        with self._lock:
+            return {"documents": len(self._docs), "words": len(self._postings),
+                    "trigrams": len(self._trigrams), "ready": self._ready}
+
+_index = None
+
+def get_index():
+    """The shared index, built in the background on first use."""
+    global _index
+    if _index is None:
+        _index = SearchIndex()
+        _index.warm()
+    return _index
+
+def search(query, limit=MAX_RESULTS):
+    return get_index().search(query, limit)
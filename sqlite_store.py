@@ -0,0 +1,429 @@
+"""SQLite storage backend: reminders, moods, mood notes and birthdays in
+one database file, with indexed lookups by date, month and priority."""
+
+import itertools
+import json
+import os
+import sqlite3
+import threading
+from operator import itemgetter
+from models import Priority, Reminder, legacy_id, parse_time
+from recurrence import Recurrence
+from rollups import tally
+
+DB_FILE = os.environ.get("CALENDAR_DB", "calendar.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reminders (
+    id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid      TEXT,
+    date     TEXT NOT NULL,
+    month    TEXT NOT NULL,
+    time     TEXT,
+    priority TEXT,
+    kind     TEXT NOT NULL DEFAULT 'regular',
+    text     TEXT NOT NULL,
+    rule     TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_reminders_date     ON reminders(date);
+CREATE INDEX IF NOT EXISTS idx_reminders_month    ON reminders(month);
+CREATE INDEX IF NOT EXISTS idx_reminders_priority ON reminders(priority);
+CREATE TABLE IF NOT EXISTS moods (
+    date  TEXT PRIMARY KEY,
+    emoji TEXT NOT NULL,
+    label TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS mood_notes (
+    date TEXT PRIMARY KEY,
+    note TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS birthdays (
+    name TEXT PRIMARY KEY,
+    date TEXT NOT NULL
+);
+"""
+
+SCHEMA_VERSION = 4
+
+# Per-day counts by priority and kind, kept in step with the reminders
+# table by triggers so month and total statistics never scan reminders.
+ROLLUP_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS reminder_rollups (
+        date     TEXT NOT NULL,
+        month    TEXT NOT NULL,
+        priority TEXT NOT NULL,
+        kind     TEXT NOT NULL,
+        count    INTEGER NOT NULL,
+        PRIMARY KEY (date, priority, kind)
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_rollups_month ON reminder_rollups(month)",
+    """CREATE TRIGGER IF NOT EXISTS reminders_rollup_insert AFTER INSERT ON reminders
+    BEGIN
+        INSERT INTO reminder_rollups (date, month, priority, kind, count)
+        VALUES (NEW.date, NEW.month, COALESCE(NEW.priority, ''), NEW.kind, 1)
+        ON CONFLICT (date, priority, kind) DO UPDATE SET count = count + 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS reminders_rollup_delete AFTER DELETE ON reminders
+    BEGIN
+        UPDATE reminder_rollups SET count = count - 1
+        WHERE date = OLD.date AND priority = COALESCE(OLD.priority, '') AND kind = OLD.kind;
+        DELETE FROM reminder_rollups WHERE date = OLD.date AND count <= 0;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS reminders_rollup_update
+    AFTER UPDATE OF date, priority, kind ON reminders
+    BEGIN
+        UPDATE reminder_rollups SET count = count - 1
+        WHERE date = OLD.date AND priority = COALESCE(OLD.priority, '') AND kind = OLD.kind;
+        DELETE FROM reminder_rollups WHERE date = OLD.date AND count <= 0;
+        INSERT INTO reminder_rollups (date, month, priority, kind, count)
+        VALUES (NEW.date, NEW.month, COALESCE(NEW.priority, ''), NEW.kind, 1)
+        ON CONFLICT (date, priority, kind) DO UPDATE SET count = count + 1;
+    END""",
+)
+
+INSERT_REMINDER = (
+    "INSERT INTO reminders (uid, date, month, time, priority, kind, text, rule) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+REMINDER_COLUMNS = "uid, time, priority, kind, text, rule"
+
+# One connection per thread (the notifier runs in its own thread and
+# Streamlit serves sessions from a pool). sqlite3 keeps a per-connection
+# cache of prepared statements, so the fixed SQL strings below are only
+# compiled once per thread.
+_local = threading.local()
+
+def _connect():
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != DB_FILE:
+        conn = sqlite3.connect(DB_FILE, cached_statements=128)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        _upgrade(conn)
+        _local.conn = conn
+        _local.path = DB_FILE
+        _local.data_version = None
+    return conn
+
+def _upgrade(conn):
+    """Bring a database created by an older version up to SCHEMA_VERSION.
+
+    Version 1 stored each reminder as one legacy "HH:MM | priority | text"
+    string; those rows are parsed into separate columns and given ids.
+    Version 3 added the recurrence rule column, version 4 the
+    trigger-maintained rollups table.
+    """
+    (version,) = conn.execute("PRAGMA user_version").fetchone()
+    if version >= SCHEMA_VERSION:
+        return
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(reminders)")}
+    with conn:
+        if "uid" not in columns:
+            conn.execute("ALTER TABLE reminders ADD COLUMN uid TEXT")
+            conn.execute(
+                "ALTER TABLE reminders ADD COLUMN kind TEXT NOT NULL DEFAULT 'regular'"
+            )
+            updates = []
+            for rowid, d, text in conn.execute("SELECT id, date, text FROM reminders").fetchall():
+                r = Reminder.parse(text, id=legacy_id(d, rowid, text))
+                uid, _, _, time_str, priority, kind, body, _ = _columns(d, r)
+                updates.append((uid, time_str, priority, kind, body, rowid))
+            conn.executemany(
+                "UPDATE reminders SET uid = ?, time = ?, priority = ?, kind = ?, text = ? "
+                "WHERE id = ?",
+                updates,
+            )
+        if "rule" not in columns:
+            conn.execute("ALTER TABLE reminders ADD COLUMN rule TEXT")
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_reminders_uid ON reminders(uid)")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_reminders_recurring ON reminders(date) "
+            "WHERE rule IS NOT NULL"
+        )
+        if version < 4:
+            for statement in ROLLUP_SCHEMA:
+                conn.execute(statement)
+            conn.execute("DELETE FROM reminder_rollups")
+            conn.execute(
+                "INSERT INTO reminder_rollups (date, month, priority, kind, count) "
+                "SELECT date, month, COALESCE(priority, ''), kind, COUNT(*) FROM reminders "
+                "GROUP BY date, COALESCE(priority, ''), kind"
+            )
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+def _columns(date_str, r):
+    return (
+        r.id, date_str, date_str[:7], r.time_str or None,
+        r.priority.value if r.priority else None, r.kind, r.text,
+        json.dumps(r.rule.to_dict()) if r.rule else None,
+    )
+
+def _reminder(uid, time_str, priority, kind, text, rule):
+    return Reminder(
+        text,
+        time=parse_time(time_str) if time_str else None,
+        priority=Priority(priority) if priority else None,
+        kind=kind,
+        id=uid,
+        rule=Recurrence.from_dict(json.loads(rule)) if rule else None,
+    )
+
+def load_reminders():
+    data = {}
+    rows = _connect().execute(
+        f"SELECT date, {REMINDER_COLUMNS} FROM reminders ORDER BY date, id"
+    )
+    for date_str, *row in rows:
+        data.setdefault(date_str, []).append(_reminder(*row))
+    return data
+
+def save_reminders(data):
+    conn = _connect()
+    with conn:
+        conn.execute("DELETE FROM reminders")
+        conn.executemany(
+            INSERT_REMINDER,
+            (_columns(d, r) for d, items in data.items() for r in items),
+        )
+
+def add_reminder(date_str, reminder):
+    conn = _connect()
+    with conn:
+        conn.execute(INSERT_REMINDER, _columns(date_str, reminder))
+
+def add_reminders(items):
+    """Insert many (date, Reminder) pairs in one transaction; returns the count."""
+    conn = _connect()
+    with conn:
+        cur = conn.executemany(INSERT_REMINDER, (_columns(d, r) for d, r in items))
+    return max(cur.rowcount, 0)
+
+def find_reminder(reminder_id):
+    row = _connect().execute(
+        f"SELECT date, {REMINDER_COLUMNS} FROM reminders WHERE uid = ?",
+        (reminder_id,),
+    ).fetchone()
+    return (row[0], _reminder(*row[1:])) if row else None
+
+def delete_reminder(reminder_id):
+    conn = _connect()
+    with conn:
+        cur = conn.execute("DELETE FROM reminders WHERE uid = ?", (reminder_id,))
+    return cur.rowcount > 0
+
+def delete_reminders(reminder_ids):
+    """Delete every listed reminder in one transaction; returns the count."""
+    conn = _connect()
+    with conn:
+        cur = conn.executemany(
+            "DELETE FROM reminders WHERE uid = ?", ((i,) for i in reminder_ids)
+        )
+    return cur.rowcount
+
+def update_reminder(reminder):
+    _, _, _, time_str, priority, kind, text, rule = _columns("", reminder)
+    conn = _connect()
+    with conn:
+        cur = conn.execute(
+            "UPDATE reminders SET time = ?, priority = ?, kind = ?, text = ?, rule = ? "
+            "WHERE uid = ?",
+            (time_str, priority, kind, text, rule, reminder.id),
+        )
+    return cur.rowcount > 0
+
+def move_reminder(reminder_id, new_date):
+    conn = _connect()
+    with conn:
+        cur = conn.execute(
+            "UPDATE reminders SET date = ?, month = ? WHERE uid = ?",
+            (new_date, new_date[:7], reminder_id),
+        )
+    return cur.rowcount > 0
+
+def clear_day(date_str, reminder_ids):
+    """Delete the listed reminders from date_str; returns the count.
+
+    A reminder added since the caller read the day is kept, as in json_store.
+    """
+    conn = _connect()
+    with conn:
+        cur = conn.executemany(
+            "DELETE FROM reminders WHERE date = ? AND uid = ?",
+            ((date_str, i) for i in reminder_ids),
+        )
+    return cur.rowcount
+
+def get_reminders(date_str):
+    rows = _connect().execute(
+        f"SELECT {REMINDER_COLUMNS} FROM reminders WHERE date = ? ORDER BY id",
+        (date_str,),
+    )
+    return [_reminder(*row) for row in rows]
+
+def get_reminders_between(start, end=None):
+    """Yield (date, [Reminder]) for stored dates in [start, end), in order."""
+    rows = _connect().execute(
+        f"SELECT date, {REMINDER_COLUMNS} FROM reminders "
+        "WHERE date >= ? AND (? IS NULL OR date < ?) ORDER BY date, id",
+        (start, end, end),
+    )
+    for date_str, group in itertools.groupby(rows, key=itemgetter(0)):
+        yield date_str, [_reminder(*row[1:]) for row in group]
+
+def get_recurring():
+    """Return (anchor date, Reminder) for every repeating reminder."""
+    rows = _connect().execute(
+        f"SELECT date, {REMINDER_COLUMNS} FROM reminders WHERE rule IS NOT NULL"
+    )
+    return [(row[0], _reminder(*row[1:])) for row in rows]
+
+def get_all_dates_with_reminders():
+    rows = _connect().execute("SELECT DISTINCT date FROM reminders")
+    return [date_str for (date_str,) in rows]
+
+def count_reminders_in_month(month):
+    (count,) = _connect().execute(
+        "SELECT COALESCE(SUM(count), 0) FROM reminder_rollups WHERE month = ?", (month,)
+    ).fetchone()
+    return count
+
+def get_month_stats(month):
+    return tally(_connect().execute(
+        "SELECT priority, kind, SUM(count) FROM reminder_rollups WHERE month = ? "
+        "GROUP BY priority, kind",
+        (month,),
+    ))
+
+def get_total_stats():
+    return tally(_connect().execute(
+        "SELECT priority, kind, SUM(count) FROM reminder_rollups GROUP BY priority, kind"
+    ))
+
+def get_day_counts(month=None):
+    if month is None:
+        rows = _connect().execute(
+            "SELECT date, SUM(count) FROM reminder_rollups GROUP BY date"
+        )
+    else:
+        rows = _connect().execute(
+            "SELECT date, SUM(count) FROM reminder_rollups WHERE month = ? GROUP BY date",
+            (month,),
+        )
+    return dict(rows)
+
+def load_mood_notes():
+    return dict(_connect().execute("SELECT date, note FROM mood_notes"))
+
+def set_mood_note(date_str, note):
+    conn = _connect()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO mood_notes (date, note) VALUES (?, ?)",
+            (date_str, note),
+        )
+
+def get_mood_note(date_str):
+    row = _connect().execute(
+        "SELECT note FROM mood_notes WHERE date = ?", (date_str,)
+    ).fetchone()
+    return row[0] if row else ""
+
+def load_moods():
+    rows = _connect().execute("SELECT date, emoji, label FROM moods")
+    return {d: {"emoji": emoji, "label": label} for d, emoji, label in rows}
+
+def save_mood(date_str, mood_emoji, mood_label):
+    conn = _connect()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO moods (date, emoji, label) VALUES (?, ?, ?)",
+            (date_str, mood_emoji, mood_label),
+        )
+
+def get_mood(date_str):
+    row = _connect().execute(
+        "SELECT emoji, label FROM moods WHERE date = ?", (date_str,)
+    ).fetchone()
+    return {"emoji": row[0], "label": row[1]} if row else None
+
+def load_birthdays():
+    return dict(_connect().execute("SELECT name, date FROM birthdays"))
+
+def save_birthday(name, date_str):
+    conn = _connect()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO birthdays (name, date) VALUES (?, ?)",
+            (name, date_str),
+        )
+
+def delete_birthday(name):
+    conn = _connect()
+    with conn:
+        conn.execute("DELETE FROM birthdays WHERE name = ?", (name,))
+
+def has_external_changes():
+    """True if another connection committed since this thread last asked."""
+    (version,) = _connect().execute("PRAGMA data_version").fetchone()
+    last = getattr(_local, "data_version", None)
+    _local.data_version = version
+    return last is not None and version != last
+
+def signature(topic=None):
+    """Changes whenever a transaction is committed to the database file
+    (whatever the topic: every store shares it)."""
+    sigs = []
+    for path in (DB_FILE, DB_FILE + "-wal"):
+        try:
+            st = os.stat(path)
+            sigs.append((st.st_mtime_ns, st.st_size, st.st_ino))
+        except FileNotFoundError:
+            sigs.append(None)
+    return repr(sigs)
+
+def invalidate(path=None):
+    """Nothing is cached outside SQLite itself."""
+
+def get_stats():
+    conn = _connect()
+    (count,) = conn.execute("SELECT COUNT(*) FROM reminders").fetchone()
+    return {"backend": "sqlite", "db": DB_FILE, "reminders": count}
+
+def compact(background=False):
+    _connect().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+def migrate_from_json(source):
+    """Import every store from the JSON backend module into the database.
+
+    Existing rows are replaced, so running it twice is harmless.
+    """
+    reminders = source.load_reminders()
+    moods = source.load_moods()
+    notes = source.load_mood_notes()
+    birthdays = source.load_birthdays()
+    conn = _connect()
+    with conn:
+        conn.execute("DELETE FROM reminders")
+        conn.executemany(
+            INSERT_REMINDER,
+            (_columns(d, r) for d, items in reminders.items() for r in items),
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO moods (date, emoji, label) VALUES (?, ?, ?)",
+            ((d, m["emoji"], m["label"]) for d, m in moods.items()),
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO mood_notes (date, note) VALUES (?, ?)",
+            notes.items(),
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO birthdays (name, date) VALUES (?, ?)",
+            birthdays.items(),
+        )
+    return {
+        "reminders": sum(len(v) for v in reminders.values()),
+        "moods": len(moods),
+        "mood_notes": len(notes),
+        "birthdays": len(birthdays),
+    }
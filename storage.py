@@ -1,73 +1,391 @@
-import json
+"""Storage API used by the Tk and Streamlit apps.
+
+The actual persistence is delegated to a backend module: json_store (the
+default, plain JSON files) or sqlite_store (one SQLite database). Pick one
+with the CALENDAR_STORAGE environment variable or set_backend().
+"""
+
+import heapq
 import os
+from datetime import date, timedelta
+from operator import itemgetter
+import json_store
+import sqlite_store
+from models import KIND_JOURNAL, Reminder, coerce
+from query import Query, QueryError
+
+BACKENDS = {
+    "json": json_store,
+    "sqlite": sqlite_store,
+}
+
+STORAGE_BACKEND = os.environ.get("CALENDAR_STORAGE", "json")
+
+# Callbacks told about every reminder change, e.g. the notifier's scheduler.
+# Each gets an event dict shaped like an op-log entry:
+#   {"op": "add" | "delete" | "update", "date": ..., "reminder": Reminder}
+#   {"op": "move", "date": old_date, "to": new_date, "reminder": Reminder}
+#   {"op": "clear", "date": ..., "reminders": [Reminder, ...]}
+#   {"op": "delete", "date": ..., "reminders": [Reminder, ...]}  (bulk delete)
+#   {"op": "reset"}   (everything may have changed)
+# Mood notes, moods and birthdays have their own topics, so reminder
+# listeners are not woken by them:
+#   "notes":     {"op": "set", "date": ..., "note": ...}
+#   "moods":     {"op": "set", "date": ..., "emoji": ..., "label": ...}
+#   "birthdays": {"op": "set", "name": ..., "date": ...}
+#                {"op": "delete", "name": ...}
+# and all get {"op": "reset"} when the backend is switched.
+REMINDERS = "reminders"
+NOTES = "notes"
+MOODS = "moods"
+BIRTHDAYS = "birthdays"
+
+_listeners = {REMINDERS: [], NOTES: [], MOODS: [], BIRTHDAYS: []}
+_changes = dict.fromkeys(_listeners, 0)
+
+def _backend():
+    return BACKENDS[STORAGE_BACKEND]
 
-FILE = "reminders.json"
-MOOD_NOTES_FILE = "mood_notes.json"
+def set_backend(name):
+    """Switch the backend used by every storage function."""
+    global STORAGE_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown storage backend: {name!r}")
+    STORAGE_BACKEND = name
+    for topic in _listeners:
+        _notify({"op": "reset"}, topic)
+
+def subscribe(callback, topic=REMINDERS):
+    """Call callback(event) after every change of topic (reminders by default)."""
+    _listeners[topic].append(callback)
+    return callback
+
+def unsubscribe(callback, topic=REMINDERS):
+    if callback in _listeners[topic]:
+        _listeners[topic].remove(callback)
+
+def _notify(event, topic=REMINDERS):
+    _changes[topic] += 1
+    for callback in list(_listeners[topic]):
+        try:
+            callback(event)
+        except Exception:
+            pass
+
+def poll_changes():
+    """Check whether another process changed the reminders; if so, tell
+    subscribers with a "reset" event. Costs a stat() (or one PRAGMA)."""
+    if _backend().has_external_changes():
+        _notify({"op": "reset"})
+        return True
+    return False
 
 def load_reminders():
-    if not os.path.exists(FILE):
-        return {}
-    with open(FILE, "r") as f:
-        return json.load(f)
+    """Return all reminders as {date: [Reminder, ...]}. Treat it as read-only."""
+    return _backend().load_reminders()
 
 def save_reminders(data):
-    with open(FILE, "w") as f:
-        json.dump(data, f, indent=2)
-
-def add_reminder(date_str, reminder_text):
-    data = load_reminders()
-    if date_str not in data:
-        data[date_str] = []
-    data[date_str].append(reminder_text)
-    save_reminders(data)
-
-def delete_reminder(date_str, reminder_text):
-    data = load_reminders()
-    if date_str in data:
-        data[date_str] = [r for r in data[date_str] if r != reminder_text]
-        if not data[date_str]:
-            del data[date_str]
-        save_reminders(data)
+    """Replace everything with data; entries may be Reminders or legacy strings."""
+    _backend().save_reminders(
+        {d: [coerce(r) for r in items] for d, items in data.items()}
+    )
+    _notify({"op": "reset"})
+
+def add_reminder(date_str, reminder):
+    """Add a Reminder (a legacy "HH:MM | priority | text" string also works)."""
+    reminder = coerce(reminder)
+    _backend().add_reminder(date_str, reminder)
+    _notify({"op": "add", "date": date_str, "reminder": reminder})
+    return reminder
+
+def add_reminders(items):
+    """Add many (date, Reminder) pairs in one backend write; returns the
+    count. Subscribers get a single "reset" rather than an event each."""
+    count = _backend().add_reminders(items)
+    if count:
+        _notify({"op": "reset"})
+    return count
+
+def delete_reminder(date_str, reminder):
+    """Delete a Reminder, or every reminder on date_str that displays as the
+    given legacy string."""
+    if isinstance(reminder, str):
+        matches = [r for r in get_reminders(date_str) if r.display() == reminder]
+        if matches and _backend().delete_reminders([r.id for r in matches]):
+            _notify({"op": "delete", "date": date_str, "reminders": matches})
+        return
+    if _backend().delete_reminder(reminder.id):
+        _notify({"op": "delete", "date": date_str, "reminder": reminder})
+
+def find_reminder(reminder_id):
+    """Return (date, Reminder) for reminder_id, or None."""
+    return _backend().find_reminder(reminder_id)
+
+def delete_reminder_by_id(reminder_id):
+    """Delete one reminder by id. Returns False if it doesn't exist."""
+    found = find_reminder(reminder_id)
+    if found is None or not _backend().delete_reminder(reminder_id):
+        return False
+    _notify({"op": "delete", "date": found[0], "reminder": found[1]})
+    return True
+
+def update_reminder(reminder):
+    """Replace the stored reminder that has reminder's id."""
+    found = find_reminder(reminder.id)
+    if found is None or not _backend().update_reminder(reminder):
+        return False
+    _notify({"op": "update", "date": found[0], "reminder": reminder, "old": found[1]})
+    return True
+
+def move_reminder(reminder_id, new_date):
+    """Move a reminder to another date, keeping its id."""
+    found = find_reminder(reminder_id)
+    if found is None or not _backend().move_reminder(reminder_id, new_date):
+        return False
+    _notify({"op": "move", "date": found[0], "to": new_date, "reminder": found[1]})
+    return True
+
+def clear_day(date_str, series=True):
+    """Delete every reminder on date_str in one operation; returns the count.
+
+    With series=False, repeating reminders that start on date_str are kept
+    (only the one-off reminders go).
+    """
+    reminders = get_reminders(date_str)
+    if not series:
+        reminders = [r for r in reminders if r.rule is None]
+    # Only the reminders read above go, so listeners hear about exactly
+    # what was deleted even if another process adds one meanwhile.
+    count = _backend().clear_day(date_str, [r.id for r in reminders]) if reminders else 0
+    if count:
+        _notify({"op": "clear", "date": date_str, "reminders": reminders})
+    return count
 
 def get_reminders(date_str):
-    data = load_reminders()
-    return data.get(date_str, [])
+    return _backend().get_reminders(date_str)
+
+def iter_reminders():
+    """Yield (date, [Reminder]) for every stored date, in date order."""
+    return _backend().get_reminders_between("")
+
+def iter_matching(query=None):
+    """Yield (date, Reminder) for stored reminders matching a query string
+    or Query (see query.py; None matches everything), in date order.
+
+    Only the query's date range is read from the backend (an index range
+    scan in SQLite, a bisect over the sorted dates in JSON). Repeating
+    reminders are matched on the date they are stored under, their first.
+    """
+    if query is None:
+        query = Query()
+    elif isinstance(query, str):
+        query = Query.parse(query)
+    for date_str, items in _backend().get_reminders_between(query.start or "", query.end):
+        for r in items:
+            if query.matches(date_str, r):
+                yield date_str, r
+
+def find_reminders(query):
+    """iter_matching() as a list."""
+    return list(iter_matching(query))
+
+def delete_matching(query):
+    """Delete every reminder find_reminders(query) returns, in one batch.
+    Returns the deleted (date, Reminder) pairs."""
+    if isinstance(query, str):
+        query = Query.parse(query)
+    if query.is_empty:
+        raise QueryError("An empty query would delete everything")
+    found = find_reminders(query)
+    if not found:
+        return []
+    _backend().delete_reminders([r.id for _, r in found])
+    by_date = {}
+    for date_str, r in found:
+        by_date.setdefault(date_str, []).append(r)
+    for date_str, reminders in by_date.items():
+        _notify({"op": "delete", "date": date_str, "reminders": reminders})
+    return found
 
 def get_all_dates_with_reminders():
-    data = load_reminders()
-    return list(data.keys())
+    return _backend().get_all_dates_with_reminders()
+
+def _expand(anchor, reminder, start, end):
+    for day in reminder.rule.occurrences(anchor, start, end):
+        yield day, reminder
+
+def occurrences(start, end=None, where=None):
+    """Yield (date, Reminder) for every reminder falling in [start, end).
+
+    start and end are dates; end=None means open-ended, so consume the
+    generator lazily. One-off reminders come from the backend's date
+    index; repeating reminders are expanded on the fly, never stored per
+    occurrence. The streams are merged in date order. where(reminder), if
+    given, filters reminders before they are expanded.
+    """
+    singles = (
+        (day, r)
+        for day, r in _single_occurrences(start, end)
+        if where is None or where(r)
+    )
+    series = [
+        _expand(anchor, r, start, end)
+        for anchor, r in _series()
+        if where is None or where(r)
+    ]
+    return heapq.merge(singles, *series, key=itemgetter(0))
+
+def series_occurrences(start, end):
+    """Like occurrences(), but only for repeating reminders, so the one-off
+    reminders in the range are never read."""
+    return heapq.merge(
+        *(_expand(anchor, r, start, end) for anchor, r in _series()),
+        key=itemgetter(0),
+    )
+
+def _single_occurrences(start, end):
+    end_str = end.isoformat() if end else None
+    for date_str, items in _backend().get_reminders_between(start.isoformat(), end_str):
+        try:
+            day = date.fromisoformat(date_str)
+        except ValueError:
+            continue
+        for r in items:
+            if r.rule is None:
+                yield day, r
+
+def _series():
+    for date_str, r in _backend().get_recurring():
+        try:
+            yield date.fromisoformat(date_str), r
+        except ValueError:
+            pass
+
+def get_occurrences(date_str):
+    """Reminders happening on date_str, including repeats of earlier ones."""
+    day = date.fromisoformat(date_str)
+    return [r for _, r in occurrences(day, day + timedelta(days=1))]
+
+def occurrence_dates(start, end):
+    """Set of "YYYY-MM-DD" strings in [start, end) with at least one reminder."""
+    return {day.isoformat() for day, _ in occurrences(start, end)}
+
+def day_summaries(start, end):
+    """{"YYYY-MM-DD": (count, highest priority rank)} for days in [start, end).
+
+    The rank is Priority.rank (3 = high) or 0 if no reminder that day has
+    a priority.
+    """
+    summary = {}
+    for day, r in occurrences(start, end):
+        key = day.isoformat()
+        count, rank = summary.get(key, (0, 0))
+        summary[key] = (count + 1, max(rank, r.priority.rank if r.priority else 0))
+    return summary
+
+def skip_occurrence(reminder_id, date_str):
+    """Drop one date from a repeating reminder, or delete a one-off reminder."""
+    found = find_reminder(reminder_id)
+    if found is None:
+        return False
+    reminder = found[1]
+    if reminder.rule is None:
+        return delete_reminder_by_id(reminder_id)
+    return update_reminder(Reminder(
+        reminder.text, time=reminder.time, priority=reminder.priority,
+        kind=reminder.kind, id=reminder.id,
+        rule=reminder.rule.skipping(date.fromisoformat(date_str)),
+    ))
+
+def count_reminders_in_month(month):
+    """Number of reminders whose date starts with month (YYYY-MM)."""
+    return _backend().count_reminders_in_month(month)
+
+# The stats below come from rollups the backend keeps up to date on every
+# change, so they cost a lookup rather than a scan. Each is a dict with the
+# keys in rollups.FIELDS: total, journal, regular, high, medium, low, none.
+# Repeating reminders are counted once, on their first date.
+
+def get_month_stats(month):
+    """Reminder counts for one month (YYYY-MM)."""
+    return _backend().get_month_stats(month)
+
+def get_total_stats():
+    """Reminder counts over all dates."""
+    return _backend().get_total_stats()
+
+def get_day_counts(month=None):
+    """{date: number of reminders stored on it}, for one month or all."""
+    return _backend().get_day_counts(month)
 
 def load_mood_notes():
-    if not os.path.exists(MOOD_NOTES_FILE):
-        return {}
-    with open(MOOD_NOTES_FILE, "r") as f:
-        return json.load(f)
+    return _backend().load_mood_notes()
 
 def save_mood_note(date_str, note):
     """Save mood journal and also reflect it in reminders."""
-    # Save to mood notes file
-    data = load_mood_notes()
-    data[date_str] = note
-    with open(MOOD_NOTES_FILE, "w") as f:
-        json.dump(data, f, indent=2)
-
-    # Also reflect in reminders list
-    reminders = load_reminders()
-    if date_str not in reminders:
-        reminders[date_str] = []
+    _backend().set_mood_note(date_str, note)
+    _notify({"op": "set", "date": date_str, "note": note}, NOTES)
 
     # Remove old journal entry if exists
-    reminders[date_str] = [
-        r for r in reminders[date_str]
-        if not r.startswith("📓 Journal:")
-    ]
+    for r in get_reminders(date_str):
+        if r.kind == KIND_JOURNAL:
+            delete_reminder(date_str, r)
 
     # Add new journal entry
     # Truncate long notes for display
     short_note = note[:60] + "..." if len(note) > 60 else note
-    reminders[date_str].append(f"📓 Journal: {short_note}")
-    save_reminders(reminders)
+    add_reminder(date_str, Reminder(short_note, kind=KIND_JOURNAL))
 
 def get_mood_note(date_str):
-    data = load_mood_notes()
-    return data.get(date_str, "")
\ No newline at end of file
+    return _backend().get_mood_note(date_str)
+
+def load_moods():
+    return _backend().load_moods()
+
+def save_mood(date_str, mood_emoji, mood_label):
+    _backend().save_mood(date_str, mood_emoji, mood_label)
+    _notify({"op": "set", "date": date_str, "emoji": mood_emoji, "label": mood_label}, MOODS)
+
+def get_mood(date_str):
+    return _backend().get_mood(date_str)
+
+def load_birthdays():
+    return _backend().load_birthdays()
+
+def save_birthday(name, date_str):
+    _backend().save_birthday(name, date_str)
+    _notify({"op": "set", "name": name, "date": date_str}, BIRTHDAYS)
+
+def delete_birthday(name):
+    _backend().delete_birthday(name)
+    _notify({"op": "delete", "name": name}, BIRTHDAYS)
+
+def data_signature(topic=None):
+    """A string that changes whenever the stored data of topic (or of any
+    topic) changes, also from another process, judged by file stats; for
+    caches kept outside the backend. Cheap: it never forces buffered
+    writes to disk."""
+    return f"{STORAGE_BACKEND}:{_backend().signature(topic)}"
+
+def changes(topic=None):
+    """Number of changes this process has made to topic (or to anything),
+    counted as they are notified. Unlike data_signature() it can't miss
+    two saves within one file timestamp, so in-process caches key on both."""
+    if topic is None:
+        return sum(_changes.values())
+    return _changes[topic]
+
+def compact(background=False):
+    """Fold pending changes into the backend's main file."""
+    _backend().compact(background=background)
+
+def invalidate_cache(path=None):
+    _backend().invalidate(path)
+
+def get_cache_stats():
+    """Backend counters for monitoring (cache hits/misses, row counts)."""
+    return _backend().get_stats()
+
+def migrate_to_sqlite():
+    """Copy every JSON store into the SQLite database."""
+    return sqlite_store.migrate_from_json(json_store)
@@ -1,10 +1,60 @@
 import streamlit as st
-import json
-import os
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 import calendar
 import io
 import csv
+import gzip
+from html import escape
+from types import MappingProxyType
+import numpy as np
+import analytics
+import exporter
+import importer
+from storage import (add_reminder, delete_reminder_by_id,
+                     get_occurrences, day_summaries, skip_occurrence,
+                     load_mood_notes, save_mood_note,
+                     load_moods, save_mood, load_birthdays, save_birthday,
+                     delete_birthday, get_total_stats, find_reminders,
+                     delete_matching)
+import storage
+from query import QueryError
+from models import Priority, Reminder, parse_time
+from recurrence import DAILY, MONTHLY, WEEKLY, YEARLY, Recurrence
+
+SEARCH_SHOWN = 100
+
+# Results kept per cached view (one per key and arguments).
+CACHE_ENTRIES = 16
+
+EXPORT_FORMATS = {
+    exporter.CSV: "CSV",
+    exporter.JSONL: "JSON Lines",
+    exporter.ICS: "iCalendar (.ics)",
+}
+REPEAT_CHOICES = {
+    "Never": None,
+    "Daily": DAILY,
+    "Weekly": WEEKLY,
+    "Monthly": MONTHLY,
+    "Yearly": YEARLY,
+}
+
+MOODS = [
+    ("😄","Happy","#f9ca24"),("😊","Good","#6ab04c"),
+    ("😐","Neutral","#95afc0"),("😔","Sad","#778ca3"),
+    ("😤","Stressed","#e55039"),("😴","Tired","#a29bfe"),
+    ("🤩","Excited","#fd79a8"),
+]
+MOOD_STYLES = {label: (emoji, color) for emoji, label, color in MOODS}
+MOOD_MESSAGES = {
+    "Happy":"Amazing! Happiness is contagious — share it! 💛",
+    "Good":"Great! A good day is a gift 🌈",
+    "Neutral":"That's okay 🌥️ Be kind to yourself.",
+    "Sad":"It's okay 💙 Tough times don't last.",
+    "Stressed":"One thing at a time 🧘 You've got this!",
+    "Tired":"Rest is productive too 😴",
+    "Excited":"Woohoo! 🎉 Channel that energy!",
+}
 
 st.set_page_config(
     page_title="📅 Calendar & Reminder App",
@@ -13,21 +63,6 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-REMINDERS_FILE = "reminders.json"
-MOODS_FILE = "moods.json"
-BIRTHDAYS_FILE = "birthdays.json"
-MOOD_NOTES_FILE = "mood_notes.json"
-
-def load_json(file):
-    if not os.path.exists(file):
-        return {}
-    with open(file, "r") as f:
-        return json.load(f)
-
-def save_json(file, data):
-    with open(file, "w") as f:
-        json.dump(data, f, indent=2)
-
 QUOTES = [
     ("The secret of getting ahead is getting started.", "Mark Twain"),
     ("It always seems impossible until it's done.", "Nelson Mandela"),
@@ -45,82 +80,357 @@ def get_quote():
     day = datetime.now().timetuple().tm_yday
     return QUOTES[day % len(QUOTES)]
 
-def build_calendar_html(selected_date, reminders_data):
-    cal = calendar.monthcalendar(selected_date.year, selected_date.month)
-    html = """
-    <style>
-    .cal-wrap { width:100%; overflow-x:auto; margin:10px 0; }
-    .cal-table {
-        width:100%; border-collapse:separate;
-        border-spacing:3px; table-layout:fixed;
-    }
-    .cal-table th {
-        text-align:center; padding:10px 2px;
-        color:#4a9eff; font-size:12px; font-weight:700;
-        letter-spacing:1px; text-transform:uppercase;
-        background:#1a2744; border-radius:6px;
-    }
-    .cal-table td {
-        text-align:center; padding:8px 2px;
-        font-size:14px; color:#c8d8e8;
-        background:#16213e; border-radius:8px;
-        height:38px; vertical-align:middle;
-    }
-    .day-today {
-        background:#4a9eff!important; color:white!important;
-        border-radius:50%; width:30px; height:30px;
-        display:inline-flex; align-items:center;
-        justify-content:center; font-weight:bold;
-        box-shadow:0 0 10px #4a9eff88;
-    }
-    .day-selected {
-        background:#1dd1a1!important; color:white!important;
-        border-radius:50%; width:30px; height:30px;
-        display:inline-flex; align-items:center;
-        justify-content:center; font-weight:bold;
-    }
-    .day-reminder { color:#ff9f43!important; font-weight:bold; }
-    .day-weekend  { color:#ff6b6b!important; }
-    .day-empty    { color:transparent!important; background:transparent!important; }
-    @media(max-width:600px){
-        .cal-table th { font-size:10px; padding:6px 1px; }
-        .cal-table td { font-size:12px; padding:5px 1px; height:30px; }
-        .day-today,.day-selected { width:24px; height:24px; font-size:11px; }
-    }
-    </style>
-    <div class="cal-wrap">
-    <table class="cal-table"><tr>
-        <th>MON</th><th>TUE</th><th>WED</th><th>THU</th><th>FRI</th>
-        <th style="color:#ff6b6b">SAT</th>
-        <th style="color:#ff6b6b">SUN</th>
-    </tr>
-    """
-    for week in cal:
-        html += "<tr>"
+def month_bounds(day):
+    """First day of day's month and first day of the next month."""
+    first = day.replace(day=1)
+    days = calendar.monthrange(day.year, day.month)[1]
+    return first, first + timedelta(days=days)
+
+# ── Cached views ────────────────────────────────────────
+# Every click reruns this script. Results below are kept across reruns
+# and sessions, keyed on the store's data_signature() (file stats, so
+# other processes' saves count) and changes() (this process's saves), so
+# a rerun after a save reloads and any other rerun is a lookup. They are
+# shared, so they come back as read-only views (mappings, tuples); the
+# reminder lists hold mutable Reminder objects, so those use cache_data,
+# which hands each caller its own unpickled copy.
+
+def _key(topic=None):
+    return storage.data_signature(topic), storage.changes(topic)
+
+@st.cache_resource(max_entries=CACHE_ENTRIES, show_spinner=False)
+def _moods(key):
+    return MappingProxyType(dict(load_moods()))
+
+@st.cache_resource(max_entries=CACHE_ENTRIES, show_spinner=False)
+def _mood_notes(key):
+    return MappingProxyType(dict(load_mood_notes()))
+
+@st.cache_resource(max_entries=CACHE_ENTRIES, show_spinner=False)
+def _birthdays(key):
+    return MappingProxyType(dict(load_birthdays()))
+
+@st.cache_resource(max_entries=CACHE_ENTRIES, show_spinner=False)
+def _day_summaries(key, start, end):
+    return MappingProxyType(day_summaries(start, end))
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def _occurrences(key, date_str):
+    return tuple(get_occurrences(date_str))
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def _search(key, query):
+    return tuple(find_reminders(query))
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _tables(key):
+    return MappingProxyType(analytics.load())
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _activity(key):
+    tables = _tables(key)
+    return analytics.day_activity(tables["reminders"], tables["moods"])
+
+@st.cache_resource(max_entries=CACHE_ENTRIES, show_spinner=False)
+def _year_overview(key, year):
+    activity = _activity(key)
+    counts, moods = analytics.year_activity(activity, year)
+    return (year_summary(year, counts, moods, activity["labels"]),
+            _heatmap_svg(year, counts, moods, activity["labels"]))
+
+def cached_moods():
+    return _moods(_key(storage.MOODS))
+
+def cached_mood_notes():
+    return _mood_notes(_key(storage.NOTES))
+
+def cached_birthdays():
+    return _birthdays(_key(storage.BIRTHDAYS))
+
+def cached_day_summaries(start, end):
+    return _day_summaries(_key(storage.REMINDERS), start, end)
+
+def cached_occurrences(date_str):
+    return _occurrences(_key(storage.REMINDERS), date_str)
+
+def cached_search(query):
+    return _search(_key(storage.REMINDERS), query)
+
+def cached_tables():
+    """analytics.load(), which stats and reads the snapshot files."""
+    return _tables(_key())
+
+def cached_years():
+    """Years with any data, newest first, always including this one."""
+    activity = _activity(_key())
+    this_year = date.today().year
+    if not len(activity["counts"]):
+        return [this_year]
+    first = analytics.EPOCH + timedelta(days=activity["origin"])
+    last = first + timedelta(days=len(activity["counts"]) - 1)
+    return list(range(max(last.year, this_year), first.year - 1, -1))
+
+def cached_year_overview(year):
+    """(year_summary(), heatmap SVG) for one year."""
+    return _year_overview(_key(), year)
+
+WEEKDAY_HEADER = (
+    "<tr><th>MON</th><th>TUE</th><th>WED</th><th>THU</th><th>FRI</th>"
+    '<th style="color:#ff6b6b">SAT</th><th style="color:#ff6b6b">SUN</th></tr>'
+)
+
+def _calendar_html(year, month, selected_day, today_day, counts):
+    """The month grid; counts is ((day, reminders), ...) for the days that
+    have any, today_day None unless today is in this month. The styles
+    live in the page stylesheet."""
+    counts = dict(counts)
+    rows = ['<div class="cal-wrap"><table class="cal-table">', WEEKDAY_HEADER]
+    for week in calendar.monthcalendar(year, month):
+        cells = []
         for i, day in enumerate(week):
             if day == 0:
-                html += '<td class="day-empty">·</td>'
+                cells.append('<td class="day-empty">·</td>')
+                continue
+            n = counts.get(day, 0)
+            if day == today_day:
+                label = f'<span class="day-today">{day}</span>'
+            elif day == selected_day:
+                label = f'<span class="day-selected">{day}</span>'
+            elif n:
+                label = f'<span class="day-reminder">●{day}</span>'
+            elif i >= 5:
+                label = f'<span class="day-weekend">{day}</span>'
             else:
-                day_date     = date(selected_date.year, selected_date.month, day)
-                day_str      = day_date.strftime("%Y-%m-%d")
-                has_reminder = day_str in reminders_data
-                is_today     = day_date == date.today()
-                is_selected  = day_date == selected_date
-                is_weekend   = i >= 5
-                if is_today:
-                    html += f'<td><span class="day-today">{day}</span></td>'
-                elif is_selected:
-                    html += f'<td><span class="day-selected">{day}</span></td>'
-                elif has_reminder:
-                    html += f'<td><span class="day-reminder">●{day}</span></td>'
-                elif is_weekend:
-                    html += f'<td><span class="day-weekend">{day}</span></td>'
-                else:
-                    html += f'<td>{day}</td>'
-        html += "</tr>"
-    html += "</table></div>"
+                label = str(day)
+            if n:
+                title = f"{n} reminder" + ("s" if n > 1 else "")
+                cells.append(f'<td title="{title}">{label}<span class="day-count">{n}</span></td>')
+            else:
+                cells.append(f"<td>{label}</td>")
+        rows.append("<tr>" + "".join(cells) + "</tr>")
+    rows.append("</table></div>")
+    return "".join(rows)
+
+def build_calendar_html(selected_date, summaries):
+    """Calendar grid for selected_date's month; summaries is
+    cached_day_summaries() for that month.
+
+    The selected day gets no count (the list below it has one), so changes
+    to that day alone, made in the day_reminders fragment, don't leave
+    the grid out of date.
+    """
+    today = date.today()
+    counts = tuple(sorted(
+        (int(day[8:]), count) for day, (count, _) in summaries.items()
+        if int(day[8:]) != selected_date.day
+    ))
+    key = (
+        selected_date.year, selected_date.month, selected_date.day,
+        today.day if (today.year, today.month) == (selected_date.year, selected_date.month) else None,
+        counts,
+    )
+    # Kept per session: a dict lookup is far cheaper than st.cache_*'s
+    # argument hashing, which would cost more than building the grid.
+    rendered = st.session_state.setdefault("calendar_html", {})
+    html = rendered.get(key)
+    if html is None:
+        if len(rendered) >= CACHE_ENTRIES:
+            rendered.clear()
+        html = rendered[key] = _calendar_html(*key)
     return html
 
+# ── Year heatmap ────────────────────────────────────────
+
+HEAT_COLORS = ("#1a2744", "#1d3f73", "#2563a8", "#3683d8", "#4a9eff")
+HEAT_CELL, HEAT_STEP = 11, 14            # square size, square + gap
+HEAT_LEFT, HEAT_TOP = 30, 18             # room for weekday / month labels
+
+def _mood_of(code, labels):
+    """(emoji, label, color) for a mood index, or None."""
+    if code < 0:
+        return None
+    label = labels[code]
+    emoji, color = MOOD_STYLES.get(label, ("", "#8899aa"))
+    return emoji, label, color
+
+def year_summary(year, counts, moods, labels):
+    """Headline figures for the year's metrics row."""
+    busiest = int(counts.argmax())
+    logged = moods[moods >= 0]
+    top_mood = _mood_of(int(np.bincount(logged).argmax()), labels) if len(logged) else None
+    return {
+        "total": int(counts.sum()),
+        "active": int(np.count_nonzero(counts)),
+        "busiest": (date(year, 1, 1) + timedelta(days=busiest), int(counts[busiest])),
+        "moods": len(logged),
+        "top_mood": top_mood,
+    }
+
+def _heatmap_svg(year, counts, moods, labels):
+    """One SVG for the whole year: a column per week, Monday on top,
+    shaded by reminder count and outlined in the day's mood colour."""
+    first = date(year, 1, 1)
+    slots = np.arange(len(counts)) + first.weekday()
+    xs = HEAT_LEFT + slots // 7 * HEAT_STEP
+    ys = HEAT_TOP + slots % 7 * HEAT_STEP
+    levels = np.ceil(counts * (len(HEAT_COLORS) - 1) / max(int(counts.max()), 1)).astype(int)
+    days = np.arange(np.datetime64(first), np.datetime64(date(year + 1, 1, 1))).astype(str)
+
+    width = HEAT_LEFT + (int(slots[-1]) // 7 + 1) * HEAT_STEP
+    height = HEAT_TOP + 7 * HEAT_STEP
+    parts = [f'<svg class="heatmap" viewBox="0 0 {width} {height}" '
+             f'xmlns="http://www.w3.org/2000/svg">']
+    for month in range(1, 13):
+        slot = (date(year, month, 1) - first).days + first.weekday()
+        parts.append(f'<text x="{HEAT_LEFT + slot // 7 * HEAT_STEP}" y="11">'
+                     f'{calendar.month_abbr[month]}</text>')
+    for row, name in ((0, "Mon"), (2, "Wed"), (4, "Fri")):
+        parts.append(f'<text x="0" y="{HEAT_TOP + row * HEAT_STEP + 9}">{name}</text>')
+    for x, y, level, count, code, day in zip(xs.tolist(), ys.tolist(), levels.tolist(),
+                                            counts.tolist(), moods.tolist(), days):
+        mood = _mood_of(code, labels)
+        title = f"{day}: {count} reminder{'' if count == 1 else 's'}"
+        outline = ""
+        if mood:
+            title += f" · {mood[0]} {mood[1]}"
+            outline = f' stroke="{mood[2]}" stroke-width="2"'
+        parts.append(f'<rect x="{x}" y="{y}" width="{HEAT_CELL}" height="{HEAT_CELL}" rx="2" '
+                     f'fill="{HEAT_COLORS[level]}"{outline}><title>{escape(title)}</title></rect>')
+    parts.append("</svg>")
+    return "".join(parts)
+
+# ── Fragments ───────────────────────────────────────────
+# Clicking a button inside a fragment reruns only that fragment. Buttons
+# that change data do it in an on_click callback, which runs before the
+# rerun, so the section redraws with fresh data from the cached views
+# above. A change that other parts of the page show asks for a full rerun
+# through the "rerun_app" flag.
+
+def _delete_clicked(reminder):
+    delete_reminder_by_id(reminder.id)
+    if reminder.is_recurring:
+        st.session_state["rerun_app"] = True  # other days in the grid change
+
+def _add_clicked(date_str):
+    state = st.session_state
+    time_val, note = state["add_time"].strip(), state["add_note"]
+    reminder_time = parse_time(time_val) if time_val else None
+    if not note.strip():
+        state["add_message"] = ("error", "Please enter a note!")
+    elif time_val and reminder_time is None:
+        state["add_message"] = ("error", "Time must be in HH:MM format!")
+    else:
+        freq = REPEAT_CHOICES[state["add_repeat"]]
+        add_reminder(date_str, Reminder(note, time=reminder_time,
+                                        priority=Priority.from_label(state["add_priority"]),
+                                        rule=Recurrence(freq) if freq else None))
+        state["add_message"] = ("success", "✅ Reminder added!")
+        state["add_note"] = ""
+        if freq:
+            state["rerun_app"] = True
+
+@st.fragment
+def day_reminders(date_str):
+    """Reminder cards and the add form for one day."""
+    if st.session_state.pop("rerun_app", False):
+        st.rerun()
+    reminders = cached_occurrences(date_str)
+    count = f" ({len(reminders)})" if reminders else ""
+    st.markdown(f'<div class="section-title">📝 Reminders — {date_str}{count}</div>', unsafe_allow_html=True)
+
+    if reminders:
+        for r in reminders:
+            cls = "reminder-card"
+            if r.priority:     cls += f" {r.priority.value}"
+            elif r.is_journal: cls += " journal"
+            c1, c2 = st.columns([5, 1])
+            with c1:
+                if r.is_recurring:
+                    st.markdown(f'<div class="{cls}">🔁 {escape(r.display())}'
+                                f'<br><small>{r.rule.describe()}</small></div>',
+                                unsafe_allow_html=True)
+                else:
+                    st.markdown(f'<div class="{cls}">{escape(r.display())}</div>', unsafe_allow_html=True)
+            with c2:
+                if r.is_recurring:
+                    st.button("⏭", key=f"skip_{r.id}", help="Skip this day only",
+                              on_click=skip_occurrence, args=(r.id, date_str))
+                st.button("🗑", key=f"del_{r.id}", on_click=_delete_clicked, args=(r,))
+    else:
+        st.info("📭 No reminders for this day")
+
+    st.divider()
+    st.markdown('<div class="section-title">➕ Add Reminder</div>', unsafe_allow_html=True)
+    st.selectbox("Priority", ["🟡 Medium", "🔴 High", "🟢 Low"], key="add_priority")
+    st.text_input("⏰ Time (HH:MM)", placeholder="e.g. 14:30", key="add_time")
+    st.text_input("📌 Note", placeholder="e.g. Team Meeting", key="add_note")
+    st.selectbox("🔁 Repeat", list(REPEAT_CHOICES), key="add_repeat")
+    st.button("➕ Add Reminder", type="primary", use_container_width=True,
+              on_click=_add_clicked, args=(date_str,))
+    message = st.session_state.pop("add_message", None)
+    if message:
+        getattr(st, message[0])(message[1])
+
+@st.fragment
+def mood_picker(today_str):
+    """Today's mood buttons. Saving reruns only this section; the header
+    and sidebar catch up on the next full run."""
+    st.markdown('<div class="section-title">😊 How are you feeling today?</div>', unsafe_allow_html=True)
+    existing = cached_moods().get(today_str)
+    if existing:
+        st.success(f"{existing['emoji']} **{existing['label']}** — {MOOD_MESSAGES.get(existing['label'],'')}")
+
+    cols = st.columns(4)
+    for i, (emoji, label, color) in enumerate(MOODS):
+        with cols[i % 4]:
+            st.markdown(f"""
+            <div class="mood-btn">
+                <div style="font-size:1.8rem">{emoji}</div>
+                <div style="font-size:0.7rem;color:#8899aa!important">{label}</div>
+            </div>""", unsafe_allow_html=True)
+            st.button("✓", key=f"mood_{label}", use_container_width=True,
+                      on_click=save_mood, args=(today_str, emoji, label))
+
+@st.fragment
+def year_overview():
+    """Year selector and heatmap; switching years reruns only this."""
+    years = cached_years()
+    year = st.selectbox("Year", years, key="overview_year")
+    summary, svg = cached_year_overview(year)
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("📝 Reminders", summary["total"])
+    c2.metric("📅 Active Days", summary["active"])
+    busiest, most = summary["busiest"]
+    c3.metric("🔥 Busiest Day", busiest.strftime("%d %b") if most else "—",
+              f"{most} reminders" if most else None, delta_color="off")
+    top_mood = summary["top_mood"]
+    c4.metric("😊 Top Mood", f"{top_mood[0]} {top_mood[1]}" if top_mood else "—",
+              f"{summary['moods']} days logged" if summary["moods"] else None,
+              delta_color="off")
+    st.markdown(f'<div class="heatmap-wrap">{svg}</div>', unsafe_allow_html=True)
+    legend = "".join(f'<span class="heat-swatch" style="background:{c}"></span>'
+                     for c in HEAT_COLORS)
+    moods = " ".join(f'<span style="color:{color}!important">{emoji} {label}</span>'
+                     for emoji, label, color in MOODS)
+    st.markdown(f'<div class="heat-legend">Less {legend} More'
+                f'<span style="float:right">Outline: {moods}</span></div>',
+                unsafe_allow_html=True)
+
+@st.fragment
+def journal_editor(today_str):
+    st.markdown('<div class="section-title">📓 Journal</div>', unsafe_allow_html=True)
+    st.caption("💡 Your journal will appear in today's reminder list!")
+    existing_note = cached_mood_notes().get(today_str, "")
+    journal_text  = st.text_area("j", value=existing_note, height=200,
+                                  label_visibility="collapsed",
+                                  placeholder="Write about your day here...")
+    if st.button("💾 Save Journal", type="primary", use_container_width=True):
+        if journal_text.strip():
+            save_mood_note(today_str, journal_text)
+            st.success("✅ Journal saved!")
+        else:
+            st.error("Please write something first!")
+
 st.markdown("""
 <style>
 @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
@@ -248,6 +558,54 @@ hr { border-color:#4a9eff22 !important; margin:20px 0 !important; }
     padding:12px 15px; margin:5px 0; border:1px solid #4a9eff22;
 }
 
+.cal-wrap { width:100%; overflow-x:auto; margin:10px 0; }
+.cal-table {
+    width:100%; border-collapse:separate;
+    border-spacing:3px; table-layout:fixed;
+}
+.cal-table th {
+    text-align:center; padding:10px 2px;
+    color:#4a9eff; font-size:12px; font-weight:700;
+    letter-spacing:1px; text-transform:uppercase;
+    background:#1a2744; border-radius:6px;
+}
+.cal-table td {
+    text-align:center; padding:8px 2px;
+    font-size:14px; color:#c8d8e8;
+    background:#16213e; border-radius:8px;
+    height:38px; vertical-align:middle;
+}
+.day-today {
+    background:#4a9eff!important; color:white!important;
+    border-radius:50%; width:30px; height:30px;
+    display:inline-flex; align-items:center;
+    justify-content:center; font-weight:bold;
+    box-shadow:0 0 10px #4a9eff88;
+}
+.day-selected {
+    background:#1dd1a1!important; color:white!important;
+    border-radius:50%; width:30px; height:30px;
+    display:inline-flex; align-items:center;
+    justify-content:center; font-weight:bold;
+}
+.day-reminder { color:#ff9f43!important; font-weight:bold; }
+.day-weekend  { color:#ff6b6b!important; }
+.day-empty    { color:transparent!important; background:transparent!important; }
+.day-count    { font-size:9px; color:#ff9f43!important; vertical-align:super; margin-left:1px; }
+.heatmap-wrap { width:100%; overflow-x:auto; margin:10px 0; }
+.heatmap      { width:100%; min-width:640px; }
+.heatmap text { fill:#8899aa; font-size:9px; font-family:Inter,sans-serif; }
+.heat-legend  { font-size:11px; color:#8899aa!important; }
+.heat-swatch  {
+    display:inline-block; width:10px; height:10px;
+    border-radius:2px; margin:0 1px; vertical-align:middle;
+}
+@media(max-width:600px){
+    .cal-table th { font-size:10px; padding:6px 1px; }
+    .cal-table td { font-size:12px; padding:5px 1px; height:30px; }
+    .day-today,.day-selected { width:24px; height:24px; font-size:11px; }
+}
+
 ::-webkit-scrollbar { width:5px; }
 ::-webkit-scrollbar-track { background:#0d1117; }
 ::-webkit-scrollbar-thumb { background:#4a9eff66; border-radius:3px; }
@@ -289,7 +647,7 @@ window.addEventListener('load', function() {
 
 now        = datetime.now()
 today_str  = datetime.today().strftime("%Y-%m-%d")
-moods_all  = load_json(MOODS_FILE)
+moods_all  = cached_moods()
 mood_today = moods_all.get(today_str)
 
 st.markdown(f"""
@@ -326,7 +684,9 @@ with st.sidebar:
         ["📅 Calendar & Reminders",
          "😊 Mood Tracker",
          "🎂 Birthday Manager",
+         "🔍 Search",
          "📊 Stats & Analytics",
+         "🗓️ Year Overview",
          "📤 Export Data"],
         label_visibility="collapsed"
     )
@@ -357,121 +717,26 @@ if page == "📅 Calendar & Reminders":
     st.markdown('<div class="section-title">📅 Select Date</div>', unsafe_allow_html=True)
     selected_date  = st.date_input("d", value=date.today(), label_visibility="collapsed")
     date_str       = selected_date.strftime("%Y-%m-%d")
-    reminders_data = load_json(REMINDERS_FILE)
+    day_summary    = cached_day_summaries(*month_bounds(selected_date))
 
     st.markdown(f'<div class="section-title">📆 {selected_date.strftime("%B %Y")}</div>', unsafe_allow_html=True)
-    st.markdown(build_calendar_html(selected_date, reminders_data), unsafe_allow_html=True)
+    st.markdown(build_calendar_html(selected_date, day_summary), unsafe_allow_html=True)
     st.markdown("""
     <div style="font-size:11px;color:#8899aa!important;margin:5px 0 15px">
         🔵 Today &nbsp; 🟢 Selected &nbsp; 🟠 Reminder &nbsp; 🔴 Weekend
     </div>""", unsafe_allow_html=True)
 
     st.divider()
-    st.markdown(f'<div class="section-title">📝 Reminders — {date_str}</div>', unsafe_allow_html=True)
-    reminders     = load_json(REMINDERS_FILE)
-    day_reminders = reminders.get(date_str, [])
-
-    if day_reminders:
-        for i, r in enumerate(day_reminders):
-            cls = "reminder-card"
-            if "🔴 High"     in r: cls += " high"
-            elif "🟡 Medium"  in r: cls += " medium"
-            elif "🟢 Low"     in r: cls += " low"
-            elif "📓 Journal" in r: cls += " journal"
-            c1, c2 = st.columns([5, 1])
-            with c1:
-                st.markdown(f'<div class="{cls}">{r}</div>', unsafe_allow_html=True)
-            with c2:
-                if st.button("🗑", key=f"del_{i}_{date_str}"):
-                    reminders[date_str].remove(r)
-                    if not reminders[date_str]:
-                        del reminders[date_str]
-                    save_json(REMINDERS_FILE, reminders)
-                    st.rerun()
-    else:
-        st.info("📭 No reminders for this day")
-
-    st.divider()
-    st.markdown('<div class="section-title">➕ Add Reminder</div>', unsafe_allow_html=True)
-    priority = st.selectbox("Priority", ["🟡 Medium", "🔴 High", "🟢 Low"])
-    time_val = st.text_input("⏰ Time (HH:MM)", placeholder="e.g. 14:30")
-    note     = st.text_input("📌 Note", placeholder="e.g. Team Meeting")
-
-    if st.button("➕ Add Reminder", type="primary", use_container_width=True):
-        if note.strip():
-            rt = (f"{time_val} | {priority} | {note}" if time_val.strip() else f"{priority} | {note}")
-            if date_str not in reminders:
-                reminders[date_str] = []
-            reminders[date_str].append(rt)
-            save_json(REMINDERS_FILE, reminders)
-            st.success("✅ Reminder added!")
-            st.rerun()
-        else:
-            st.error("Please enter a note!")
+    day_reminders(date_str)
 
 elif page == "😊 Mood Tracker":
-    st.markdown('<div class="section-title">😊 How are you feeling today?</div>', unsafe_allow_html=True)
-    MOODS = [
-        ("😄","Happy","#f9ca24"),("😊","Good","#6ab04c"),
-        ("😐","Neutral","#95afc0"),("😔","Sad","#778ca3"),
-        ("😤","Stressed","#e55039"),("😴","Tired","#a29bfe"),
-        ("🤩","Excited","#fd79a8"),
-    ]
-    MOOD_MESSAGES = {
-        "Happy":"Amazing! Happiness is contagious — share it! 💛",
-        "Good":"Great! A good day is a gift 🌈",
-        "Neutral":"That's okay 🌥️ Be kind to yourself.",
-        "Sad":"It's okay 💙 Tough times don't last.",
-        "Stressed":"One thing at a time 🧘 You've got this!",
-        "Tired":"Rest is productive too 😴",
-        "Excited":"Woohoo! 🎉 Channel that energy!",
-    }
-    moods_data = load_json(MOODS_FILE)
-    existing   = moods_data.get(today_str)
-    if existing:
-        st.success(f"{existing['emoji']} **{existing['label']}** — {MOOD_MESSAGES.get(existing['label'],'')}")
-
-    cols = st.columns(4)
-    for i, (emoji, label, color) in enumerate(MOODS):
-        with cols[i % 4]:
-            st.markdown(f"""
-            <div class="mood-btn">
-                <div style="font-size:1.8rem">{emoji}</div>
-                <div style="font-size:0.7rem;color:#8899aa!important">{label}</div>
-            </div>""", unsafe_allow_html=True)
-            if st.button("✓", key=f"mood_{label}", use_container_width=True):
-                moods_data[today_str] = {"emoji":emoji,"label":label}
-                save_json(MOODS_FILE, moods_data)
-                st.success(f"✅ {emoji} {label} saved!")
-                st.rerun()
-
+    mood_picker(today_str)
     st.divider()
-    st.markdown('<div class="section-title">📓 Journal</div>', unsafe_allow_html=True)
-    st.caption("💡 Your journal will appear in today's reminder list!")
-    mood_notes    = load_json(MOOD_NOTES_FILE)
-    existing_note = mood_notes.get(today_str,"")
-    journal_text  = st.text_area("j", value=existing_note, height=200,
-                                  label_visibility="collapsed",
-                                  placeholder="Write about your day here...")
-    if st.button("💾 Save Journal", type="primary", use_container_width=True):
-        if journal_text.strip():
-            mood_notes[today_str] = journal_text
-            save_json(MOOD_NOTES_FILE, mood_notes)
-            reminders = load_json(REMINDERS_FILE)
-            if today_str not in reminders:
-                reminders[today_str] = []
-            reminders[today_str] = [r for r in reminders[today_str]
-                                     if not r.startswith("📓 Journal:")]
-            short = journal_text[:60]+"..." if len(journal_text)>60 else journal_text
-            reminders[today_str].append(f"📓 Journal: {short}")
-            save_json(REMINDERS_FILE, reminders)
-            st.success("✅ Journal saved!")
-        else:
-            st.error("Please write something first!")
+    journal_editor(today_str)
 
 elif page == "🎂 Birthday Manager":
     st.markdown('<div class="section-title">🎂 Birthday Manager</div>', unsafe_allow_html=True)
-    birthdays = load_json(BIRTHDAYS_FILE)
+    birthdays = cached_birthdays()
     today_dt  = datetime.today()
 
     st.markdown('<div class="section-title">🔔 Upcoming (30 days)</div>', unsafe_allow_html=True)
@@ -495,7 +760,7 @@ elif page == "🎂 Birthday Manager":
             else:
                 st.markdown(f"""
                 <div class="birthday-card">
-                    🎂 <b style="color:white!important">{name}</b>
+                    🎂 <b style="color:white!important">{escape(name)}</b>
                     <span style="color:#8899aa!important"> — {ds}</span><br>
                     <small style="color:#fd79a8!important">In {days_left} days · Turns {age}</small>
                 </div>""", unsafe_allow_html=True)
@@ -508,8 +773,7 @@ elif page == "🎂 Birthday Manager":
     new_date = st.date_input("🎂 Date", value=date.today())
     if st.button("🎂 Save Birthday", type="primary", use_container_width=True):
         if new_name.strip():
-            birthdays[new_name] = new_date.strftime("%Y-%m-%d")
-            save_json(BIRTHDAYS_FILE, birthdays)
+            save_birthday(new_name, new_date.strftime("%Y-%m-%d"))
             st.success(f"✅ {new_name}'s birthday saved!")
             st.rerun()
         else:
@@ -523,40 +787,80 @@ elif page == "🎂 Birthday Manager":
             with c1:
                 st.markdown(f"""
                 <div class="birthday-card">
-                    🎂 <b style="color:white!important">{name}</b>
+                    🎂 <b style="color:white!important">{escape(name)}</b>
                     <span style="color:#8899aa!important"> — {ds}</span>
                 </div>""", unsafe_allow_html=True)
             with c2:
                 if st.button("🗑", key=f"del_b_{name}"):
-                    del birthdays[name]
-                    save_json(BIRTHDAYS_FILE, birthdays)
+                    delete_birthday(name)
                     st.rerun()
     else:
         st.info("No birthdays saved yet")
 
+elif page == "🔍 Search":
+    st.markdown('<div class="section-title">🔍 Search Reminders</div>', unsafe_allow_html=True)
+    query = st.text_input("q", placeholder="e.g. priority:high after:2026-01-01 time:09:00-12:00 meeting",
+                          label_visibility="collapsed")
+    st.caption("Filters: priority:high|medium|low|none · after:/before:/on: YYYY[-MM[-DD]] · "
+               "time:HH:MM[-HH:MM]|none · journal:yes|no · repeat:yes|no")
+    if query.strip():
+        try:
+            found = cached_search(query)
+        except QueryError as e:
+            st.error(str(e))
+            found = None
+        if found:
+            st.markdown(f"**{len(found)}** reminder(s) found")
+            for ds, r in found[:SEARCH_SHOWN]:
+                cls = "reminder-card"
+                if r.priority:     cls += f" {r.priority.value}"
+                elif r.is_journal: cls += " journal"
+                st.markdown(f'<div class="{cls}"><small>{ds}</small> &nbsp;'
+                            f'{"🔁 " if r.is_recurring else ""}{escape(r.display())}</div>',
+                            unsafe_allow_html=True)
+            if len(found) > SEARCH_SHOWN:
+                st.caption(f"... and {len(found) - SEARCH_SHOWN} more")
+            confirm = st.checkbox(f"Yes, delete all {len(found)} matching reminders")
+            if st.button("🗑 Delete all matches", disabled=not confirm):
+                deleted = delete_matching(query)
+                st.success(f"Deleted {len(deleted)} reminder(s)")
+                st.rerun()
+        elif found is not None:
+            st.info("No reminders match")
+
 elif page == "📊 Stats & Analytics":
     st.markdown('<div class="section-title">📊 Stats & Analytics</div>', unsafe_allow_html=True)
-    reminders = load_json(REMINDERS_FILE)
-    moods     = load_json(MOODS_FILE)
-    birthdays = load_json(BIRTHDAYS_FILE)
-    total       = sum(len(v) for v in reminders.values())
+    tables    = cached_tables()
+    reminders = tables["reminders"]
+    moods     = tables["moods"]
+    totals    = analytics.counts(reminders)
     this_month  = datetime.today().strftime("%Y-%m")
-    month_total = sum(len(v) for k,v in reminders.items() if k.startswith(this_month))
+    month_stats = analytics.counts(reminders, this_month)
 
     c1,c2 = st.columns(2)
-    c1.metric("📝 Total Reminders", total)
-    c2.metric("📅 This Month", month_total)
+    c1.metric("📝 Total Reminders", totals["total"])
+    c2.metric("📅 This Month", month_stats["total"])
     c3,c4 = st.columns(2)
-    c3.metric("🎂 Birthdays", len(birthdays))
-    c4.metric("😊 Moods", len(moods))
+    c3.metric("🎂 Birthdays", tables["birthdays"].num_rows)
+    c4.metric("😊 Moods", moods.num_rows)
+    c5,c6,c7,c8 = st.columns(4)
+    c5.metric("🔴 High", totals["high"])
+    c6.metric("🟡 Medium", totals["medium"])
+    c7.metric("🟢 Low", totals["low"])
+    c8.metric("📓 Journal", totals["journal"])
+
+    if reminders.num_rows:
+        st.divider()
+        st.markdown('<div class="section-title">📈 Reminders per Month</div>', unsafe_allow_html=True)
+        st.bar_chart(analytics.per_month(reminders))
 
     st.divider()
     st.markdown('<div class="section-title">😊 Mood History</div>', unsafe_allow_html=True)
-    if moods:
-        for ds,mood in sorted(moods.items(),reverse=True)[:10]:
+    if moods.num_rows:
+        for mood in analytics.latest(moods, 10).to_pylist():
             st.markdown(f"""
             <div class="stats-box">
-                <span style="color:#8899aa!important;font-size:12px">{ds}</span>
+                <span style="color:#8899aa!important;font-size:12px">{mood['date']}</span>
                 &nbsp;{mood['emoji']}
                 <b style="color:white!important">{mood['label']}</b>
             </div>""", unsafe_allow_html=True)
@@ -565,35 +869,56 @@ elif page == "📊 Stats & Analytics":
 
     st.divider()
     st.markdown('<div class="section-title">📝 Recent Reminders</div>', unsafe_allow_html=True)
-    if reminders:
-        for ds,rems in sorted(reminders.items(),reverse=True)[:5]:
+    recent_days = analytics.recent_reminders(reminders, 5)
+    if recent_days:
+        for ds, rems in recent_days:
             st.markdown(f"""
             <div class="stats-box">
                 <div style="color:#4a9eff!important;font-size:12px;font-weight:600">{ds}</div>
-                {"".join(f'<div style="color:#c8d8e8!important;font-size:13px">• {r}</div>' for r in rems)}
+                {"".join(f'<div style="color:#c8d8e8!important;font-size:13px">• {escape(r.display())}</div>' for r in rems)}
             </div>""", unsafe_allow_html=True)
     else:
         st.info("No reminders yet")
 
+elif page == "🗓️ Year Overview":
+    st.markdown('<div class="section-title">🗓️ Year at a Glance</div>', unsafe_allow_html=True)
+    year_overview()
+
 elif page == "📤 Export Data":
     st.markdown('<div class="section-title">📤 Export Your Data</div>', unsafe_allow_html=True)
-    reminders = load_json(REMINDERS_FILE)
-    if reminders:
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["Date","Reminder"])
-        for ds,rems in sorted(reminders.items()):
-            for r in rems: writer.writerow([ds,r])
-        st.download_button("📥 Download Reminders CSV",
-                           data=output.getvalue(),
-                           file_name="reminders_export.csv",
-                           mime="text/csv", type="primary",
+    if get_total_stats()["total"]:
+        c1, c2 = st.columns(2)
+        with c1:
+            fmt = st.selectbox("Format", list(EXPORT_FORMATS),
+                               format_func=EXPORT_FORMATS.get)
+            priorities = st.multiselect("Priority", ["high", "medium", "low", "none"])
+        with c2:
+            after = st.date_input("From", value=None)
+            before = st.date_input("Until", value=None)
+        gz = st.checkbox("Compress (gzip)")
+        filters = []
+        if priorities:
+            filters.append("priority:" + ",".join(priorities))
+        if after:
+            filters.append(f"after:{after.isoformat()}")
+        if before:
+            filters.append(f"before:{before + timedelta(days=1)}")
+        query = " ".join(filters)
+
+        def build_export():
+            # Runs only when the button is clicked, not on every rerun.
+            return b"".join(exporter.iter_bytes(fmt, query, gz))
+
+        st.download_button("📥 Download Reminders",
+                           data=build_export,
+                           file_name=exporter.file_name(fmt, gz),
+                           mime=exporter.mime_type(fmt, gz), type="primary",
                            use_container_width=True)
     else:
         st.info("No reminders to export yet")
 
     st.divider()
-    moods = load_json(MOODS_FILE)
+    moods = cached_moods()
     if moods:
         mood_out = io.StringIO()
         mw = csv.writer(mood_out)
@@ -608,6 +933,20 @@ elif page == "📤 Export Data":
     else:
         st.info("No mood entries to export yet")
 
+    st.divider()
+    st.markdown('<div class="section-title">📥 Import Reminders</div>', unsafe_allow_html=True)
+    upload = st.file_uploader("Calendar (.ics), CSV or JSON Lines file, optionally .gz",
+                              type=["ics", "csv", "jsonl", "gz"])
+    if upload is not None and st.button("📥 Import", type="primary", use_container_width=True):
+        try:
+            fmt, compressed = exporter.format_for(upload.name)
+            stream = gzip.GzipFile(fileobj=upload) if compressed else upload
+            report = importer.import_stream(stream, fmt)
+        except (ValueError, OSError) as e:
+            st.error(f"❌ {e}")
+        else:
+            st.success(f"✅ {importer.summary(report)}")
+
 st.markdown(f"""
 <div class="footer-bar">
     <span style="color:#8899aa!important">🔔 Notifications active &nbsp;|&nbsp; 📁 Auto-saved</span>
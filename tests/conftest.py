@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import json_store
+import storage
+from rollups import Rollups
+
+def reset_json_store():
+    """Forget everything json_store has cached, as a fresh process would."""
+    json_store.flush()
+    json_store._wait_for_compaction()
+    with json_store._cache_lock:
+        json_store._cache.clear()
+        json_store._op_buffer.clear()
+        json_store._edits.clear()
+        json_store._bases.clear()
+        json_store._versions.clear()
+        json_store._file_locks.clear()
+        json_store._ids = {}
+        json_store._rollups = Rollups()
+        json_store._oplog.update(base=None, ops=0, size=0, fresh=False, merged=False)
+        json_store._compaction.update(thread=None, **{"from": None})
+        json_store._series.update(built=None, items=[])
+        json_store._dates.update(built=None, items=[])
+        json_store._commit_stats.update(merges=0, conflicts=0)
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """The storage module on an empty JSON store in tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    storage.set_backend("json")
+    reset_json_store()
+    yield storage
+    reset_json_store()
+
+def other_process(code):
+    """Run code in a separate Python process sharing the current directory
+    (the store), as another app instance would; returns its stdout."""
+    script = "import sys\nsys.path.insert(0, %r)\n" % ROOT + textwrap.dedent(code)
+    done = subprocess.run([sys.executable, "-c", script], capture_output=True,
+                          text=True, timeout=60)
+    assert done.returncode == 0, done.stderr
+    return done.stdout
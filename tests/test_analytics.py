@@ -0,0 +1,50 @@
+import os
+import threading
+
+import pytest
+
+pytest.importorskip("pyarrow.parquet")
+
+import analytics
+import json_store
+from models import Reminder
+
+def _inode(name):
+    return os.stat(analytics.path(name)).st_ino
+
+def test_only_changed_tables_are_rebuilt(store):
+    store.add_reminder("2026-04-01", Reminder("Dentist"))
+    store.save_mood("2026-04-01", "😄", "Happy")
+    json_store.flush()
+    tables = analytics.load()
+    assert tables["reminders"].num_rows == 1
+    assert analytics.stale() == []
+    before = {name: _inode(name) for name in analytics.SCHEMAS}
+
+    store.save_mood("2026-04-02", "😴", "Tired")
+    json_store.flush()
+    assert analytics.stale() == ["moods"]
+    tables = analytics.load()
+    assert tables["moods"].num_rows == 2
+    assert _inode("reminders") == before["reminders"]
+    assert _inode("moods") != before["moods"]
+
+def test_concurrent_snapshots_never_leave_partial_files(store):
+    store.add_reminders([(f"2026-01-{d:02d}", Reminder(f"r{d}")) for d in range(1, 29)])
+    errors = []
+
+    def run():
+        try:
+            for _ in range(5):
+                analytics.snapshot()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert analytics.load(rebuild=False)["reminders"].num_rows == 28
+    assert not [n for n in os.listdir(analytics.SNAPSHOT_DIR) if n.startswith(".tmp-")]
@@ -0,0 +1,51 @@
+import os
+import stat
+import threading
+
+import pytest
+
+import atomic_writer
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+def test_replace_keeps_the_target_mode(tmp_path):
+    path = str(tmp_path / "moods.json")
+    atomic_writer.atomic_write(path, b"{}")
+    os.chmod(path, 0o664)
+    atomic_writer.atomic_write(path, b'{"a": 1}')
+    assert _mode(path) == 0o664
+    assert open(path, "rb").read() == b'{"a": 1}'
+
+def test_new_file_follows_the_umask(tmp_path):
+    path = str(tmp_path / "birthdays.json")
+    atomic_writer.atomic_write_chunks(path, [b"{", b"}"])
+    assert _mode(path) == 0o666 & ~atomic_writer._UMASK
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".tmp-")]
+
+def test_timer_flush_retries_a_failed_write(caplog):
+    committer = atomic_writer.GroupCommitter(window=0.01)
+    attempts = []
+    done = threading.Event()
+
+    def write():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("disk full")
+        done.set()
+
+    committer.submit("reminders.json", write)
+    assert done.wait(2)
+    assert len(attempts) == 2
+    assert committer.stats()["pending"] == 0
+    assert "delayed write of reminders.json failed" in caplog.text
+
+def test_explicit_flush_raises_a_failed_write():
+    committer = atomic_writer.GroupCommitter(window=60)
+
+    def write():
+        raise OSError("disk full")
+
+    committer.submit("reminders.json", write)
+    with pytest.raises(OSError):
+        committer.flush()
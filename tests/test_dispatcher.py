@@ -0,0 +1,66 @@
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+import dispatcher
+
+@pytest.fixture
+def linux(monkeypatch):
+    monkeypatch.delenv("CALENDAR_NOTIFIERS", raising=False)
+    monkeypatch.setattr(dispatcher.sys, "platform", "linux")
+
+def _names(backends):
+    return [b.name for b in backends]
+
+def test_linux_prefers_notify_send(linux, monkeypatch):
+    monkeypatch.setattr(dispatcher.shutil, "which", lambda name: "/usr/bin/" + name)
+    assert _names(dispatcher.default_backends()) == ["linux"]
+
+def test_linux_without_notify_send_uses_plyer(linux, monkeypatch):
+    monkeypatch.setattr(dispatcher.shutil, "which", lambda name: None)
+    monkeypatch.setattr(dispatcher.PlyerBackend, "available", lambda self: True)
+    assert _names(dispatcher.default_backends()) == ["plyer"]
+
+def test_last_fallback_prints(linux, monkeypatch, capsys):
+    monkeypatch.setattr(dispatcher.shutil, "which", lambda name: None)
+    monkeypatch.setattr(dispatcher.PlyerBackend, "available", lambda self: False)
+    d = dispatcher.Dispatcher().start()
+    assert _names(d.backends) == ["file"]
+    d.submit("🔔 Reminder!", "Dentist", datetime(2026, 3, 2, 9, 30))
+    assert d.join(timeout=5)
+    assert "2026-03-02 09:30\t🔔 Reminder!\tDentist" in capsys.readouterr().out
+    assert d.stats()["delivered"] == 1
+
+class _Stuck(dispatcher.Backend):
+    name = "stuck"
+    timeout = 0.05
+    retries = 2
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = 0
+
+    def deliver(self, note):
+        self.calls += 1
+        self.release.wait(5)
+
+def test_hung_backend_is_skipped_until_its_call_returns():
+    stuck = _Stuck()
+    d = dispatcher.Dispatcher([stuck], workers=1).start()
+    for i in range(3):
+        d.submit("🔔 Reminder!", f"note {i}", datetime(2026, 3, 2, 9, 30))
+    assert d.join(timeout=5)
+    assert stuck.calls == 1
+    stats = d.stats()
+    assert stats["hung"] == 1 and stats["timeouts"] == 1 and stats["retries"] == 0
+    assert stats["backends"]["stuck"]["skipped"] == 2
+
+    stuck.release.set()
+    stuck.timeout = 1.0
+    time.sleep(0.1)
+    d.submit("🔔 Reminder!", "note 3", datetime(2026, 3, 2, 9, 30))
+    assert d.join(timeout=5)
+    assert stuck.calls == 2
+    assert d.stats()["hung"] == 0 and d.stats()["delivered"] == 1
@@ -0,0 +1,57 @@
+from datetime import date, time
+
+import pytest
+
+import exporter
+import importer
+from models import KIND_JOURNAL, Priority, Reminder
+from recurrence import DAILY, MONTHLY, WEEKLY, Recurrence
+
+FILES = ["out.csv", "out.jsonl", "out.ics", "out.csv.gz", "out.jsonl.gz", "out.ics.gz"]
+
+def _sample(store):
+    store.add_reminder("2026-03-02", Reminder("Standup", time=time(9, 30), priority=Priority.HIGH))
+    store.add_reminder("2026-03-03", Reminder("Pay rent, \"flat 2\"; on time \\ ok"))
+    store.add_reminder("2026-03-03", Reminder("Long day ✍️", kind=KIND_JOURNAL))
+    store.add_reminder("2026-03-04", Reminder("Gym", time=time(18, 0), rule=Recurrence(
+        WEEKLY, weekdays=(2, 4), exceptions=[date(2026, 3, 11), date(2026, 3, 20)])))
+    store.add_reminder("2026-01-31", Reminder("Invoice", priority=Priority.LOW, rule=Recurrence(
+        MONTHLY, count=12, exceptions=[date(2026, 5, 31)])))
+    store.add_reminder("2026-02-01", Reminder("Vitamins", priority=Priority.MEDIUM, rule=Recurrence(
+        DAILY, interval=2, until=date(2026, 6, 30))))
+
+def _contents(store):
+    return sorted(importer.content_key(d, r) for d, items in store.iter_reminders() for r in items)
+
+@pytest.mark.parametrize("name", FILES)
+def test_round_trip(store, tmp_path, name):
+    _sample(store)
+    before = _contents(store)
+    path = str(tmp_path / name)
+    assert exporter.export_to(path) == 6
+
+    # Everything in the file is already in the calendar.
+    report = importer.import_file(path, workers=1)
+    assert (report["read"], report["duplicates"], report["added"]) == (6, 6, 0)
+    assert report["skipped"] == report["rules_dropped"] == 0
+
+    store.save_reminders({})
+    assert importer.import_file(path, workers=1)["added"] == 6
+    assert _contents(store) == before
+    gym = next(r for _, items in store.iter_reminders() for r in items if r.text == "Gym")
+    assert gym.rule.exceptions == {date(2026, 3, 11), date(2026, 3, 20)}
+
+def test_filtered_export(store, tmp_path):
+    _sample(store)
+    path = str(tmp_path / "high.jsonl")
+    assert exporter.export_to(path, "priority:high") == 1
+
+def test_parallel_import_matches_serial(store, tmp_path, monkeypatch):
+    store.add_reminders([(f"2026-{m:02d}-{d:02d}", Reminder(f"r{m}-{d}"))
+                         for m in range(1, 13) for d in range(1, 29)])
+    path = str(tmp_path / "all.csv")
+    exporter.export_to(path)
+    store.save_reminders({})
+    monkeypatch.setattr(importer, "BATCH_RECORDS", 50)
+    report = importer.import_file(path, workers=2)
+    assert (report["added"], report["workers"]) == (12 * 28, 2)
@@ -0,0 +1,249 @@
+import json
+import os
+
+import pytest
+
+import json_store
+from conftest import other_process, reset_json_store
+from models import Priority, Reminder
+
+def test_rollups_are_saved_with_snapshots_only(store):
+    store.add_reminders([("2026-05-01", Reminder("a")), ("2026-05-02", Reminder("b"))])
+    json_store.flush()
+    stamp = os.stat(json_store.ROLLUP_FILE).st_mtime_ns
+    saved = json.load(open(json_store.ROLLUP_FILE))
+    assert saved["ops"] == 0
+
+    first = store.add_reminder("2026-05-02", Reminder("c", priority=Priority.HIGH))
+    store.delete_reminder_by_id(first.id)
+    store.add_reminder("2026-06-01", Reminder("d", priority=Priority.LOW))
+    json_store.flush()
+    assert os.stat(json_store.ROLLUP_FILE).st_mtime_ns == stamp
+    assert json.load(open(json_store.ROLLUP_FILE)) == saved
+
+    # A fresh process counts the saved rollups plus the log tail.
+    reset_json_store()
+    assert store.get_total_stats()["total"] == 3
+    assert store.get_total_stats()["low"] == 1
+    assert store.get_month_stats("2026-05")["total"] == 2
+    assert os.stat(json_store.ROLLUP_FILE).st_mtime_ns == stamp
+
+    store.compact()
+    json_store.flush()
+    assert json.load(open(json_store.ROLLUP_FILE))["ops"] == 0
+    reset_json_store()
+    assert store.get_day_counts("2026-06") == {"2026-06-01": 1}
+
+def test_signature_does_not_flush(store):
+    store.add_reminder("2026-05-01", Reminder("a"))
+    json_store.flush()
+    before = {topic: store.data_signature(topic) for topic in (store.REMINDERS, store.MOODS)}
+    size = os.path.getsize(json_store.OPLOG_FILE)
+
+    store.add_reminder("2026-05-02", Reminder("b"))
+    store.save_mood("2026-05-02", "😄", "Happy")
+    after = {topic: store.data_signature(topic) for topic in (store.REMINDERS, store.MOODS)}
+    assert after[store.REMINDERS] != before[store.REMINDERS]
+    assert after[store.MOODS] != before[store.MOODS]
+    assert os.path.getsize(json_store.OPLOG_FILE) == size
+    assert not os.path.exists(json_store.MOOD_FILE)
+
+    # Once written, another process sees the same signature.
+    json_store.flush()
+    written = store.data_signature()
+    reset_json_store()
+    assert store.data_signature() == written
+
+def _log_lines():
+    return open(json_store.OPLOG_FILE, "rb").read().count(b"\n")
+
+def test_bulk_delete_is_one_logged_op(store):
+    store.add_reminders([(f"2026-07-{d:02d}", Reminder(f"call {d}")) for d in range(1, 11)])
+    keep = store.add_reminder("2026-07-05", Reminder("keep me"))
+    json_store.flush()
+    lines = _log_lines()
+
+    deleted = store.delete_matching("call")
+    json_store.flush()
+    assert len(deleted) == 10
+    assert _log_lines() == lines + 1
+
+    reset_json_store()
+    assert [r.id for _, items in store.iter_reminders() for r in items] == [keep.id]
+    assert store.get_total_stats()["total"] == 1
+
+def _state(store):
+    return {d: [r.to_dict() for r in items] for d, items in store.iter_reminders()}
+
+def _busy_day(store):
+    from datetime import time
+    from recurrence import WEEKLY, Recurrence
+    a = store.add_reminder("2026-08-03", Reminder("a", time=time(8, 0)))
+    b = store.add_reminder("2026-08-03", Reminder("b", priority=Priority.MEDIUM))
+    c = store.add_reminder("2026-08-04", Reminder("c", rule=Recurrence(WEEKLY)))
+    store.add_reminder("2026-08-05", Reminder("d"))
+    store.update_reminder(Reminder("b2", priority=Priority.HIGH, id=b.id))
+    store.move_reminder(a.id, "2026-08-06")
+    store.skip_occurrence(c.id, "2026-08-11")
+    store.clear_day("2026-08-05")
+    store.add_reminder("2026-08-07", Reminder("e"))
+    store.delete_reminder_by_id(a.id)
+
+# ── Operation log ───────────────────────────────────────
+
+def test_log_replay_rebuilds_the_same_state(store):
+    _busy_day(store)
+    before, stats = _state(store), store.get_total_stats()
+    json_store.flush()
+    assert not os.path.exists(json_store.FILE)  # everything is in the log
+    reset_json_store()
+    assert _state(store) == before
+    assert store.get_total_stats() == stats
+
+def test_torn_last_line_is_cut_off(store):
+    _busy_day(store)
+    before = _state(store)
+    json_store.flush()
+    good = os.path.getsize(json_store.OPLOG_FILE)
+    with open(json_store.OPLOG_FILE, "ab") as f:
+        f.write(b'{"op": "add", "date": "2026-08-0')  # crash mid-append
+    reset_json_store()
+    assert _state(store) == before
+    assert os.path.getsize(json_store.OPLOG_FILE) == good
+
+    store.add_reminder("2026-08-08", Reminder("after the crash"))
+    json_store.flush()
+    reset_json_store()
+    assert store.get_reminders("2026-08-08")[0].text == "after the crash"
+
+def test_stale_log_is_ignored(store):
+    store.add_reminder("2026-08-01", Reminder("old"))
+    json_store.flush()
+    stale = open(json_store.OPLOG_FILE, "rb").read()
+    store.save_reminders({"2026-08-02": [Reminder("new")]})
+    with open(json_store.OPLOG_FILE, "wb") as f:
+        f.write(stale)  # a log that belongs to an older snapshot
+    reset_json_store()
+    assert [r.text for _, items in store.iter_reminders() for r in items] == ["new"]
+
+# ── Compaction ──────────────────────────────────────────
+
+def test_compaction_folds_the_log_into_the_snapshot(store):
+    _busy_day(store)
+    before = _state(store)
+    store.compact()
+    assert _log_lines() == 1  # just the header
+    assert _state(store) == before
+    reset_json_store()
+    assert _state(store) == before
+
+def test_ops_made_during_compaction_are_carried_over(store, monkeypatch):
+    _busy_day(store)
+    write_temp = json_store.write_temp
+
+    def slow_write(path, raw):
+        # Another change lands while the snapshot is being written.
+        store.add_reminder("2026-08-09", Reminder("meanwhile"))
+        return write_temp(path, raw)
+
+    with monkeypatch.context() as m:
+        m.setattr(json_store, "write_temp", slow_write)
+        store.compact()
+    expected = _state(store)
+    assert "2026-08-09" in expected
+    assert _log_lines() == 2
+    reset_json_store()
+    assert _state(store) == expected
+
+def test_compaction_runs_every_compact_every_ops(store, monkeypatch):
+    monkeypatch.setattr(json_store, "COMPACT_EVERY", 5)
+    for i in range(7):
+        store.add_reminder("2026-09-01", Reminder(f"r{i}"))
+    json_store._wait_for_compaction()
+    json_store.flush()
+    assert _log_lines() < 7
+    reset_json_store()
+    assert len(store.get_reminders("2026-09-01")) == 7
+
+def test_crash_between_compaction_renames_is_recovered(store, monkeypatch):
+    _busy_day(store)
+    before = _state(store)
+    replace = os.replace
+
+    def crash(src, dst):
+        if src == json_store.OPLOG_FILE + ".next":
+            raise OSError("power cut")
+        replace(src, dst)
+
+    with monkeypatch.context() as m:
+        m.setattr(json_store.os, "replace", crash)
+        with pytest.raises(OSError):
+            store.compact()
+    assert os.path.exists(json_store.OPLOG_FILE + ".next")
+    reset_json_store()
+    assert _state(store) == before
+    assert not os.path.exists(json_store.OPLOG_FILE + ".next")
+
+# ── Other processes ─────────────────────────────────────
+
+def test_small_files_merge_commits_from_other_processes(store, monkeypatch):
+    store.save_mood("2026-10-01", "😄", "Happy")
+    store.save_birthday("Ada", "1815-12-10")
+    json_store.flush()
+    monkeypatch.setattr(json_store.committer, "window", 60)  # keep ours pending
+
+    store.save_mood("2026-10-02", "😊", "Good")
+    store.delete_birthday("Ada")
+    other_process("""
+        import json_store, storage
+        storage.save_mood("2026-10-03", "😴", "Tired")
+        storage.save_birthday("Alan", "1912-06-23")
+        json_store.flush()
+    """)
+    json_store.flush()
+    assert json_store._commit_stats == {"merges": 2, "conflicts": 0}
+    reset_json_store()
+    assert sorted(store.load_moods()) == ["2026-10-01", "2026-10-02", "2026-10-03"]
+    assert store.load_birthdays() == {"Alan": "1912-06-23"}
+
+def test_small_file_conflict_is_counted_and_later_commit_wins(store, monkeypatch):
+    store.save_mood("2026-10-01", "😄", "Happy")
+    json_store.flush()
+    monkeypatch.setattr(json_store.committer, "window", 60)
+    store.save_mood("2026-10-01", "😔", "Sad")
+    other_process("""
+        import json_store, storage
+        storage.save_mood("2026-10-01", "😤", "Stressed")
+        json_store.flush()
+    """)
+    json_store.flush()
+    assert json_store._commit_stats == {"merges": 1, "conflicts": 1}
+    reset_json_store()
+    assert store.get_mood("2026-10-01")["label"] == "Sad"
+
+def test_reminder_log_merges_other_processes(store, monkeypatch):
+    shared = store.add_reminder("2026-11-01", Reminder("shared"))
+    gone = store.add_reminder("2026-11-01", Reminder("gone"))
+    json_store.flush()
+    monkeypatch.setattr(json_store.committer, "window", 60)
+
+    ours = store.add_reminder("2026-11-02", Reminder("ours"))
+    store.update_reminder(Reminder("shared, ours", id=shared.id))
+    out = other_process(f"""
+        import json_store, storage
+        from models import Reminder
+        print(storage.add_reminder("2026-11-03", Reminder("theirs")).id)
+        storage.delete_reminder_by_id({gone.id!r})
+        storage.update_reminder(Reminder("shared, theirs", id={shared.id!r}))
+        json_store.flush()
+    """)
+    theirs = out.strip()
+    json_store.flush()
+    assert json_store._commit_stats["merges"] == 1
+    assert json_store._commit_stats["conflicts"] == 1
+
+    expected = {ours.id: "ours", theirs: "theirs", shared.id: "shared, ours"}
+    seen = {r.id: r.text for _, items in store.iter_reminders() for r in items}
+    assert seen == expected
+    reset_json_store()
+    assert {r.id: r.text for _, items in store.iter_reminders() for r in items} == expected
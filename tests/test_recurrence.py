@@ -0,0 +1,70 @@
+from datetime import date, timedelta
+from itertools import islice
+
+import pytest
+
+from recurrence import DAILY, MONTHLY, WEEKLY, YEARLY, Recurrence
+
+def _brute(rule, anchor, start, end):
+    """Occurrences in [start, end) by walking the series from the anchor."""
+    out = []
+    for day in rule.occurrences(anchor):
+        if day >= end:
+            break
+        if day >= start:
+            out.append(day)
+    return out
+
+RULES = [
+    Recurrence(DAILY, interval=3),
+    Recurrence(WEEKLY, interval=2, weekdays=(0, 3, 6)),
+    Recurrence(MONTHLY),
+    Recurrence(MONTHLY, interval=5),
+    Recurrence(YEARLY, interval=2),
+    Recurrence(WEEKLY, until=date(2031, 6, 30), exceptions=[date(2029, 1, 4)]),
+]
+ANCHORS = [date(2024, 1, 31), date(2024, 2, 29), date(2025, 3, 30), date(2026, 12, 31)]
+
+@pytest.mark.parametrize("rule", RULES, ids=Recurrence.describe)
+@pytest.mark.parametrize("anchor", ANCHORS, ids=str)
+def test_window_matches_walking_the_series(rule, anchor):
+    for start, days in [(date(2020, 1, 1), 400), (date(2028, 2, 25), 10),
+                        (date(2029, 1, 1), 62), (date(2030, 11, 15), 500)]:
+        end = start + timedelta(days=days)
+        assert list(rule.occurrences(anchor, start, end)) == _brute(rule, anchor, start, end)
+
+def test_monthly_on_the_31st_skips_short_months():
+    days = list(Recurrence(MONTHLY).occurrences(date(2026, 1, 31), end=date(2027, 1, 1)))
+    assert [d.month for d in days] == [1, 3, 5, 7, 8, 10, 12]
+    assert all(d.day == 31 for d in days)
+
+def test_yearly_on_feb_29_only_in_leap_years():
+    rule = Recurrence(YEARLY)
+    days = list(rule.occurrences(date(2024, 2, 29), date(2025, 1, 1), date(2041, 1, 1)))
+    assert days == [date(y, 2, 29) for y in (2028, 2032, 2036, 2040)]
+    assert list(rule.occurrences(date(2024, 2, 29), date(2100, 1, 1), date(2101, 1, 1))) == []
+
+def test_count_includes_skipped_dates():
+    rule = Recurrence(DAILY, count=5, exceptions=[date(2026, 1, 2)])
+    assert list(rule.occurrences(date(2026, 1, 1), date(2026, 1, 3))) == [
+        date(2026, 1, 3), date(2026, 1, 4), date(2026, 1, 5)]
+
+def test_far_window_starts_at_the_window():
+    rule = Recurrence(DAILY)
+    first = next(rule.occurrences(date(1900, 1, 1), date(2026, 5, 1)))
+    assert first == date(2026, 5, 1)
+    assert list(islice(rule.occurrences(date(9999, 12, 30)), 5)) == [
+        date(9999, 12, 30), date(9999, 12, 31)]
+
+@pytest.mark.parametrize("rule", RULES + [Recurrence(DAILY, count=3)], ids=Recurrence.describe)
+def test_rrule_and_dict_round_trip(rule):
+    assert Recurrence.from_dict(rule.to_dict()) == rule
+    for timed in (False, True):
+        parsed = Recurrence.from_rrule(rule.to_rrule(timed), rule.exceptions)
+        assert parsed == rule
+
+def test_unsupported_rrule_is_rejected():
+    with pytest.raises(ValueError):
+        Recurrence.from_rrule("FREQ=MONTHLY;BYDAY=1MO")
+    with pytest.raises(ValueError):
+        Recurrence.from_rrule("FREQ=HOURLY")
@@ -0,0 +1,55 @@
+from datetime import date
+
+import pytest
+
+import sqlite_store
+from models import Reminder
+from recurrence import WEEKLY, Recurrence
+
+def test_clear_day_can_keep_series(store):
+    store.add_reminder("2026-03-02", Reminder("one-off"))
+    weekly = store.add_reminder("2026-03-02", Reminder("standup", rule=Recurrence(WEEKLY)))
+    store.skip_occurrence(weekly.id, "2026-03-02")
+    assert [r.text for r in store.get_occurrences("2026-03-02")] == ["one-off"]
+
+    assert store.clear_day("2026-03-02", series=False) == 1
+    assert store.get_occurrences("2026-03-02") == []
+    assert [r.text for r in store.get_occurrences("2026-03-09")] == ["standup"]
+    assert store.find_reminder(weekly.id)[1].rule.exceptions == {date(2026, 3, 2)}
+
+    assert store.clear_day("2026-03-02") == 1
+    assert store.find_reminder(weekly.id) is None
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_clear_day_keeps_a_reminder_added_after_the_read(store, backend, tmp_path, monkeypatch):
+    monkeypatch.setattr(sqlite_store, "DB_FILE", str(tmp_path / "calendar.db"))
+    store.set_backend(backend)
+    try:
+        store.add_reminder("2026-03-04", Reminder("read"))
+        read = store.get_reminders("2026-03-04")
+        # Another writer adds a reminder between clear_day's read and delete.
+        late = store.add_reminder("2026-03-04", Reminder("late"))
+        events = []
+        store.subscribe(events.append)
+        with monkeypatch.context() as m:
+            m.setattr(store, "get_reminders", lambda date_str: read)
+            assert store.clear_day("2026-03-04") == 1
+        store.unsubscribe(events.append)
+        assert [r.id for r in store.get_reminders("2026-03-04")] == [late.id]
+        assert [r.text for r in events[0]["reminders"]] == ["read"]
+    finally:
+        store.set_backend("json")
+
+def test_delete_by_display_string_is_one_batch(store, monkeypatch):
+    for _ in range(3):
+        store.add_reminder("2026-03-05", Reminder("water plants"))
+    store.add_reminder("2026-03-05", Reminder("call mum"))
+    events = []
+    store.subscribe(events.append)
+    with monkeypatch.context() as m:
+        m.setattr(store._backend(), "delete_reminder", None)
+        store.delete_reminder("2026-03-05", "water plants")
+    store.unsubscribe(events.append)
+    assert [r.text for r in store.get_reminders("2026-03-05")] == ["call mum"]
+    assert len(events) == 1
+    assert [r.text for r in events[0]["reminders"]] == ["water plants"] * 3
@@ -0,0 +1,189 @@
+"""A scrollable list that only draws the rows in view.
+
+tk.Listbox creates an item per row and has to be cleared and refilled on
+every change. VirtualList keeps its items in a sorted Python list and
+reuses a small pool of canvas rows, one per visible line, so adding,
+removing or scrolling costs the same for 5 rows or 5000.
+"""
+
+import bisect
+import itertools
+import tkinter as tk
+import tkinter.font as tkfont
+from operator import itemgetter
+
+class VirtualList(tk.Frame):
+    """Items stay sorted by key(item); each is drawn as text(item) in
+    color(item) (or the list's fg when color returns None) and is
+    identified by item_id(item) for remove() and selection."""
+
+    def __init__(self, parent, key, text=str, color=None, item_id=id,
+                 width=38, height=8, font=("Helvetica", 11),
+                 bg="#1e1e1e", fg="white", selectbackground="#4a9eff",
+                 placeholder=""):
+        super().__init__(parent, bg=bg)
+        self.key = key
+        self.text = text
+        self.color = color or (lambda item: None)
+        self.item_id = item_id
+        self.placeholder = placeholder
+        self.colors = {"bg": bg, "fg": fg, "selectbackground": selectbackground}
+
+        self._items = []
+        # (key, sequence) per item, parallel to _items, for bisect.
+        self._keys = []
+        self._key_of = {}
+        self._seq = itertools.count()
+        self._selected = None
+        self._pool = []
+
+        self.font = tkfont.Font(font=font)
+        self.row_height = self.font.metrics("linespace") + 6
+
+        self.canvas = tk.Canvas(
+            self,
+            width=self.font.measure("0") * width,
+            height=self.row_height * height,
+            bg=bg,
+            highlightthickness=0,
+            borderwidth=0
+        )
+        self.scrollbar = tk.Scrollbar(self, command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.canvas.bind("<Configure>", lambda e: self._resize_pool())
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
+        self._resize_pool()
+
+    # ── Items ───────────────────────────────────────────
+
+    def set_items(self, items):
+        """Replace every item; the only operation that sorts."""
+        decorated = sorted(
+            (((self.key(item), next(self._seq)), item) for item in items),
+            key=itemgetter(0)
+        )
+        self._keys = [k for k, _ in decorated]
+        self._items = [item for _, item in decorated]
+        self._key_of = {self.item_id(item): k for k, item in decorated}
+        self._selected = None
+        self.canvas.yview_moveto(0)
+        self._update_scrollregion()
+        self._render()
+
+    def insert(self, item):
+        """Add one item at its sorted position."""
+        k = (self.key(item), next(self._seq))
+        i = bisect.bisect(self._keys, k)
+        self._keys.insert(i, k)
+        self._items.insert(i, item)
+        self._key_of[self.item_id(item)] = k
+        self._update_scrollregion()
+        self._render()
+
+    def remove(self, item_id):
+        """Remove the item with this id, if present."""
+        k = self._key_of.pop(item_id, None)
+        if k is None:
+            return
+        i = bisect.bisect_left(self._keys, k)
+        del self._keys[i]
+        del self._items[i]
+        if self._selected == item_id:
+            self._selected = None
+        self._update_scrollregion()
+        self._render()
+
+    def items(self):
+        return list(self._items)
+
+    def selected(self):
+        """The selected item, or None."""
+        k = self._key_of.get(self._selected)
+        if k is None:
+            return None
+        return self._items[bisect.bisect_left(self._keys, k)]
+
+    def __len__(self):
+        return len(self._items)
+
+    # ── Drawing ─────────────────────────────────────────
+
+    def configure(self, cnf=None, **kw):
+        changed = False
+        for option in ("bg", "fg", "selectbackground"):
+            if option in kw:
+                self.colors[option] = kw.pop(option)
+                changed = True
+        if changed:
+            self.canvas.configure(bg=self.colors["bg"])
+            kw["bg"] = self.colors["bg"]
+            self._render()
+        return super().configure(cnf, **kw)
+
+    config = configure
+
+    def _resize_pool(self):
+        """Keep one canvas row (background + text) per visible line."""
+        visible = self.canvas.winfo_height()
+        if visible <= 1:
+            visible = int(self.canvas.cget("height"))
+        needed = visible // self.row_height + 2
+        while len(self._pool) < needed:
+            rect = self.canvas.create_rectangle(0, 0, 0, 0, width=0)
+            text = self.canvas.create_text(0, 0, anchor="w", font=self.font)
+            self._pool.append((rect, text))
+        self._render()
+
+    def _update_scrollregion(self):
+        height = max(len(self._items), 1) * self.row_height
+        self.canvas.configure(scrollregion=(0, 0, 0, height))
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._render()
+
+    def _on_wheel(self, event):
+        self.canvas.yview_scroll(-1 if event.delta > 0 else 1, "units")
+
+    def _on_click(self, event):
+        i = int(self.canvas.canvasy(event.y) // self.row_height)
+        if 0 <= i < len(self._items):
+            self._selected = self.item_id(self._items[i])
+            self._render()
+
+    def _render(self):
+        """Point the pooled rows at the items currently in view."""
+        rh = self.row_height
+        width = max(self.canvas.winfo_width(), int(self.canvas.cget("width")))
+        first = max(int(self.canvas.canvasy(0) // rh), 0)
+        for n, (rect, text) in enumerate(self._pool):
+            i = first + n
+            y = i * rh
+            if i < len(self._items):
+                item = self._items[i]
+                selected = self.item_id(item) == self._selected
+                self.canvas.coords(rect, 0, y, width, y + rh)
+                self.canvas.itemconfigure(
+                    rect, state="normal",
+                    fill=self.colors["selectbackground"] if selected else self.colors["bg"]
+                )
+                self.canvas.coords(text, 6, y + rh / 2)
+                self.canvas.itemconfigure(
+                    text, state="normal", text=self.text(item),
+                    fill="white" if selected else self.color(item) or self.colors["fg"]
+                )
+            elif i == 0 and self.placeholder:
+                self.canvas.itemconfigure(rect, state="hidden")
+                self.canvas.coords(text, 6, rh / 2)
+                self.canvas.itemconfigure(
+                    text, state="normal", text=self.placeholder, fill=self.colors["fg"]
+                )
+            else:
+                self.canvas.itemconfigure(rect, state="hidden")
+                self.canvas.itemconfigure(text, state="hidden")